@@ -35,9 +35,107 @@
 class Config:
     # Compilation
     CompilationConfiguration = "Shipping"
+    CompilationTargets = "Editor" # Comma separated. Editor | Game | Client | Server, or a full target name.
+    CompileTimingArgs = ["-Timing"] # UBT arguments enabling compiler timing output (MSVC /Bt+ and /d1reportTime, clang -ftime-trace).
+    CompileRegressionThreshold = 1.25 # Module compile time above median of comparable previous compiles * threshold is flagged.
+    CompileRegressionMinSeconds = 5.0 # Smaller slowdowns are not flagged.
     # Build
     BuildStagingDir = "E:/_Builds" # / ProjectName / ConfigurationName
     BuildConfiguration = "Development" # Development | Test | Shipping | Release 
+    BuildMaxJobs = 3 # Concurrent build steps when building multiple configurations.
+    # Estimated share of CPU cores (0-1) and memory (MB) used by a single build step. Limits how many steps overlap.
+    BuildStepResources = {
+        "compile": (0.5, 8000),
+        "cook": (0.5, 16000),
+        "stage": (0.125, 4000),
+    }
+    # Cook
+    CookPlatform = "Windows" # Cook target platform, cooked content is merged into Saved/Cooked/<CookPlatform>.
+    CookShards = 1 # Cook worker processes. Maps are split between workers by their historical cook time.
+    # Cooked files describing the whole cook (relative path patterns). Every shard writes its own copy covering only its maps.
+    CookBuildWideFiles = ["*AssetRegistry.bin", "*/Metadata/*", "*.ushaderbytecode", "*.upipelinecache"]
+    # After merging shards, cook all maps iteratively into the cooked tree to write build-wide files.
+    # Shards always write differing asset registries, so the final pass recooks every changed package a second time and
+    # a first cook is a full cook. Sharded cooks are not faster than a single cook with it, it is off until measured otherwise.
+    # False - shards whose build-wide files differ are not merged, the cook fails.
+    CookShardFinalPass = False
+    # Staging store
+    StoreDir = "" # Content-addressed store of staged files. Empty - <BuildStagingDir>/.uedt-store, must be on the same drive as staged builds.
+    StoreLinkMode = "auto" # hardlink | reflink | auto - reflink where the file system supports it, hardlink otherwise.
+    StoreAutoIngest = False # Ingest every successfully staged build into the store.
+    # Launch
+    TraceServerHost = "127.0.0.1"
+    TraceServerPort = 1981 # Unreal Trace Server port, trace launches wait until it accepts connections.
+    TraceServerTimeout = 15 # Seconds.
+    LaunchHitchPattern = r"[Hh]itch" # Lines highlighted as hitches in attached mode.
+    # Daemon
+    DaemonAutoStart = False # Start a daemon on the first command when none is running. Commands are sent to a running daemon regardless.
+    DaemonIdleTimeout = 600 # Seconds without commands after which the daemon exits.
+    # CSV profiling
+    CsvHitchThresholds = [33.3, 50.0, 100.0] # Frame times in ms counted as hitches.
+    CsvChunkRows = 10000 # Rows parsed at once, bounds memory used by the analysis of large captures.
+    # Assets
+    AssetRoots = [] # Package name prefixes cooked regardless of references from Config.Maps, eg. "/Game/UI/". Not reported as unreferenced.
+    # Data validation
+    ValidationPackagesArg = "-Packages=" # Commandlet argument taking '+' separated packages to validate in incremental runs.
+    ValidationMaxCommandLine = 8000 # Characters. Incremental runs split packages into commandlet runs with command lines below this length.
+    ValidationMaxBatches = 4 # Incremental runs needing more commandlet runs validate the whole project instead.
+    # Summary line of the commandlet with the number of validated packages. Incremental runs fail when a run validated more
+    # packages than it was given, ie. the commandlet ignored Config.ValidationPackagesArg.
+    ValidationCheckedPattern = r"Files Checked: (\d+)"
+    # Gauntlet
+    GauntletConfiguration = "Development"
+    GauntletMaxJobs = 2 # Test targets running at once, each starts its own game instance. Ignored without Config.GauntletParallelUAT, targets then run one at a time.
+    # AutomationTool instances hold a global mutex, by default test targets run one at a time and wait for other UAT runs.
+    # True - instances skip the mutex (uebp_UATMutexNoWait=1) and run side by side, AutomationTool scripts have to be compiled
+    # already (eg. by the build step), concurrent instances would compile them at the same time.
+    GauntletParallelUAT = False
+    # Benchmark
+    BenchmarkRuns = 5 # Game launches per benchmark.
+    BenchmarkMap = "" # Empty - first of Config.Maps.
+    BenchmarkFrames = 1000 # Frames captured per run, the game exits when the capture completes.
+    BenchmarkResolution = (1920, 1080)
+    BenchmarkConfidence = 0.95 # Confidence level of intervals and of the regression test.
+    BenchmarkMinRegression = 2.0 # Percent. Smaller slowdowns are not reported as regressions even if significant.
+    # Patches
+    PatchChunkSize = 1024 * 1024 # Bytes. Files are compared and patched in chunks of this size.
+    # Clean
+    CleanMode = "parallel" # serial | parallel | trash
+    CleanJobs = 0 # Worker threads used for deletion. 0 - number of CPU cores.
+    # Prune
+    # Tree (relative to the project dir, may contain wildcards) -> (budget in bytes, entry depth). Trees matching the same pattern share the budget.
+    # Entry depth 0 - every file is evicted separately, N - directories N levels below the tree root are evicted as a whole.
+    PruneTrees = {
+        "DerivedDataCache": (40 * 2**30, 0),
+        "Intermediate": (20 * 2**30, 4), # Intermediate/Build/<Platform>/<Target>/<Configuration>
+        "Plugins/*/Intermediate": (5 * 2**30, 4),
+    }
+    PruneJobs = 0 # Worker threads scanning and deleting. 0 - number of CPU cores.
+    # Perforce
+    P4Executable = "p4"
+    P4ServerAddress = "" # Empty values are taken from the P4 environment (P4PORT, P4USER, P4CLIENT...).
+    P4ServerPort = 1666
+    P4User = ""
+    P4Ticket = ""
+    P4Workspace = ""
+    P4BatchSize = 500 # Files passed to a single 'p4 -x -' call.
+    P4Jobs = 4 # Number of concurrent p4 calls.
+    P4Timeout = 300 # Seconds.
+    P4UseMarshal = False # Run p4 with '-G' and read typed records instead of parsing text output.
+    P4OpenedCacheTTL = 60 # Seconds opened-file state is trusted without asking the server. 0 - disabled.
+    # Processes
+    ProcessTailLines = 50 # Last lines of child output kept for error reporting.
+    # Per command timeouts in seconds, (idle - no output, total). 0 - no timeout.
+    CommandTimeouts = {
+        # "cook": (1800, 4 * 3600),
+    }
+    # History
+    HistoryEnabled = True # Record every command run in Saved/UEDT/History.db.
+    HistoryRecordChangelist = False # Query p4 for the synced changelist on every run.
+    HistorySampleInterval = 0.5 # Seconds between process tree memory samples.
+    StatsSlowThreshold = 1.25 # Runs slower than historical median * threshold are flagged by 'stats'.
+    # Engine
+    EngineDir = "" # Overrides engine association lookup when set. Eg. "C:/Program Files/Epic Games/UE_5.3"
     
     # Whitelist maps that will be added to the build.
     # If, array is empty, map parameter during cooking process will be ignored.
@@ -52,13 +150,28 @@ import os
 import re
 import sys
 import glob
+import json
+import fnmatch
+import stat
+import time
+import select
+import socket
+import signal
+import marshal
+import threading
 import shutil
+import hashlib
+import mmap
+import zlib
+import struct
 import logging
 import argparse
 import platform
 import subprocess
 
 from abc import ABC
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from pathlib import Path
 from enum import IntFlag, auto
@@ -67,8 +180,107 @@ c = Config
 
 
 #region Classes
+# Single record of 'p4 -G' output.
+class P4Record:
+    def __init__(self, Fields):
+        self.Fields = Fields
+        self.Code = Fields.get("code", "")
+        self.Action = Fields.get("action")
+        self.Change = Fields.get("change")
+        self.DepotFile = Fields.get("depotFile")
+        self.ClientFile = Fields.get("clientFile")
+        self.Data = str(Fields.get("data", "")).strip()
+
+    @property
+    def Error(self):
+        return self.Data if self.Code == "error" else None
+
+    # Path the record refers to. Messages start with the path, eg. "//depot/File.uasset#1 - can't change from default change - use 'reopen'"
+    @property
+    def Path(self):
+        return self.ClientFile or self.Data.split(" - ", 1)[0] or self.DepotFile
+
+class P4FileResult:
+    def __init__(self, Path, OK=True, Message="", Record=None):
+        self.Path = Path
+        self.OK = OK
+        self.Message = Message
+        self.Record = Record
+
+# Per file results of a batched p4 operation.
+class P4BatchResult:
+    def __init__(self):
+        self.Files = {}
+
+    @property
+    def OK(self):
+        return all(x.OK for x in self.Files.values())
+
+    def __bool__(self):
+        return self.OK
+
+    def GetFailed(self):
+        return [x for x in self.Files.values() if not x.OK]
+
+    def Merge(self, Other):
+        self.Files.update(Other.Files)
+
+# Local state of files opened in the workspace, built from a single 'p4 fstat -Ro' query.
+# Kept up to date by UEDT's own edit/reopen/revert calls and re-queried once TTL expires.
+class P4OpenedFileCache:
+    CacheFileName = "P4Opened.json"
+
+    def __init__(self, Workspace, Files=None, Time=0.0):
+        self.Workspace = Workspace
+        self.Files = Files if Files is not None else {} # Normalized path -> {"Change": "123" | "default", "Action": "edit"}
+        self.Time = Time
+
+    @staticmethod
+    def GetKey(filePath):
+        return os.path.normcase(os.path.abspath(str(filePath)))
+
+    def IsValid(self):
+        return time.time() - self.Time < c.P4OpenedCacheTTL
+
+    def Get(self, filePath):
+        return self.Files.get(self.GetKey(filePath))
+
+    def Set(self, filePath, Change, Action):
+        self.Files[self.GetKey(filePath)] = {"Change": Change, "Action": Action}
+
+    def Remove(self, filePath):
+        self.Files.pop(self.GetKey(filePath), None)
+
+    @classmethod
+    def GetCachePath(cls):
+        return GetUEDTCacheDir() / cls.CacheFileName
+
+    @classmethod
+    def Load(cls, Workspace):
+        try:
+            with open(cls.GetCachePath(), 'r') as f:
+                Data = json.load(f)
+            if Data['Workspace'] == Workspace:
+                return cls(Workspace, Data['Files'], Data['Time'])
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def Save(self):
+        try:
+            CachePath = self.GetCachePath()
+            CachePath.parent.mkdir(parents=True, exist_ok=True)
+            with open(CachePath, 'w') as f:
+                json.dump({'Workspace': self.Workspace, 'Time': self.Time, 'Files': self.Files}, f)
+        except OSError as e:
+            logging.getLogger().info(f"Cannot write opened files cache. {e}")
+
 class PerforceHandler:
 
+    def __init__(self):
+        self.OpenedFiles = None
+        self.OpenedFilesLock = threading.Lock()
+
     def GetDefaultCharSet(self):
         return "latin-1"
 
@@ -76,9 +288,15 @@ class PerforceHandler:
         if targetChangelist == -1:
             return
         
-        Args = f"{self.__GetPreliminaryCommandArgs()} submit -c {targetChangelist}"
+        Args = self.__GetPreliminaryCommandArgs() + ["submit", "-c", str(targetChangelist)]
+
+        if c.P4UseMarshal:
+            Records, OK = self.__HandleMarshalCommand(Args)
+            if OK and not any(x.Error for x in Records):
+                return OK
+            raise ConnectionError
 
-        Response, OK = HandleCommand(Args.split())
+        Response, OK = HandleCommand(Args, Timeout=c.P4Timeout)
 
         if OK and self.__GetResponseReturnCode(Response) == 0:              
             return OK
@@ -87,10 +305,13 @@ class PerforceHandler:
 
     # @ret - New changelist number.
     def CreateNewChangelist(self, description) -> int:
-        Args = f"{self.__GetPreliminaryCommandArgs()} --field \"Description={description}\" --field \"Files=\" change -o"
+        Args = self.__GetPreliminaryCommandArgs() + ["--field", f"Description={description}", "--field", "Files=", "change", "-o"]
+
+        if c.P4UseMarshal:
+            return self.__CreateNewChangelistMarshal(Args)
 
         ps = subprocess.Popen(Args, stdout=subprocess.PIPE)
-        output = subprocess.check_output(f"{self.__GetPreliminaryCommandArgs()} change -i", stdin=ps.stdout)
+        output = subprocess.check_output(self.__GetPreliminaryCommandArgs() + ["change", "-i"], stdin=ps.stdout)
         ps.wait()
 
         Regex = re.compile(r"^Change (\d+)")
@@ -99,68 +320,336 @@ class PerforceHandler:
 
         changelistNumber = -1
 
-        if len(found.groups()) > 0:
+        if found is not None:
             changelistNumber = int(found.group(1))
         else:
             raise ConnectionError
 
         return changelistNumber
 
+    def __CreateNewChangelistMarshal(self, SpecArgs):
+        Records, OK = self.__HandleMarshalCommand(SpecArgs)
+        if not OK or len(Records) != 1 or Records[0].Error:
+            raise ConnectionError
+
+        Spec = {k.encode(self.GetDefaultCharSet()): str(v).encode(self.GetDefaultCharSet()) for k, v in Records[0].Fields.items() if k != "code"}
+        Records, OK = self.__HandleMarshalCommand(self.__GetPreliminaryCommandArgs() + ["change", "-i"], marshal.dumps(Spec, 0))
+
+        # Eg. "Change 1234 created."
+        Words = Records[0].Data.split() if OK and len(Records) == 1 else []
+        if len(Words) < 2 or not Words[1].isdigit():
+            raise ConnectionError
+
+        return int(Words[1])
+
     # Checkout files.
     def EditFiles(self, targetChangeList = -1, filePaths=[]):
-        filePathsChecked = self.__RetrieveExistingFiles(filePaths)
+        Result = P4BatchResult()
+        Opened = self.GetOpenedFiles()
+        TargetChange = self.__GetChangeName(targetChangeList)
+        ToEdit = []
+        ToReopen = []
+
+        # Split files by opened state, so the server is only asked about files that need it.
+        for filePath in self.__RetrieveExistingFiles(filePaths):
+            State = Opened.Get(filePath) if Opened is not None else None
+            if State is None:
+                ToEdit.append(filePath)
+            elif State["Change"] == TargetChange:
+                Result.Files[filePath] = P4FileResult(filePath, True, f"Already opened in change {TargetChange}.")
+            else:
+                ToReopen.append(filePath)
+
+        # Files already opened in another changelist have to be moved with 'reopen'.
+        for ChunkResult, ChunkToReopen in self.__RunFileCommand("edit", self.__GetChangelistArgs(targetChangeList), ToEdit):
+            for filePath, FileResult in ChunkResult.Files.items():
+                if filePath not in ChunkToReopen:
+                    Result.Files[filePath] = FileResult
+            ToReopen += ChunkToReopen
+
+        self.__UpdateOpenedFiles(Result, TargetChange, "edit")
+
+        if len(ToReopen) > 0:
+            Result.Merge(self.ReopenFiles(targetChangeList, ToReopen))
 
-        Args = self.__GetPreliminaryCommandArgs() + "edit" 
+        return Result
 
-        if targetChangeList != -1:
-            Args += f" -c {targetChangeList}"
+    # Process files that are already checked out.
+    def ReopenFiles(self, targetChangeList = -1, filePaths = []):
+        Result = self.__RunBatch("reopen", self.__GetChangelistArgs(targetChangeList), self.__RetrieveExistingFiles(filePaths))
+        self.__UpdateOpenedFiles(Result, self.__GetChangeName(targetChangeList), None)
+        if Result.OK:
+            return Result
 
-        Args += f" " + ' '.join(str(x) for x in filePathsChecked)
+        raise ConnectionError
 
-        Response, OK = HandleCommand(Args.split())
+    def RevertFiles(self, filePaths):
+        Result = self.__RunBatch("revert", ["-a"], self.__RetrieveExistingFiles(filePaths))
+        # 'revert -a' keeps modified files opened, reverted files are forgotten and re-checked on next edit.
+        self.__UpdateOpenedFiles(Result, None, None)
+        if Result.OK:
+            return Result
+        raise ConnectionError
 
-        if OK and Response is not None:
-            shouldUseReopen = Response.stdout.decode(self.GetDefaultCharSet()).find('reopen') != -1
-            if shouldUseReopen:
-                return self.ReopenFiles(targetChangeList, filePaths)
+    # @ret - Newest changelist synced to the workspace, None if unknown.
+    def GetHaveChangelist(self):
+        Args = self.__GetPreliminaryCommandArgs() + ["changes", "-m", "1", "-s", "submitted", "//...#have"]
 
-        return OK
+        if c.P4UseMarshal:
+            Records, OK = self.__HandleMarshalCommand(Args)
+            return Records[0].Change if OK and len(Records) > 0 else None
 
-    # Process files that are already checked out.
-    def ReopenFiles(self, targetChangeList = -1, filePaths = []):
-        filePathsChecked = self.__RetrieveExistingFiles(filePaths)
+        Response, OK = HandleCommand(Args, Timeout=10)
+        # Eg. "Change 1234 on 2024/01/01 by user@workspace 'Description'"
+        Words = Response.stdout.decode(self.GetDefaultCharSet()).split() if OK and Response is not None else []
+        return Words[1] if len(Words) > 1 else None
 
-        Args = self.__GetPreliminaryCommandArgs() + "reopen" 
+    # Returns opened-file state of the workspace, queried from the server once Config.P4OpenedCacheTTL expires.
+    def GetOpenedFiles(self):
+        if c.P4OpenedCacheTTL <= 0:
+            return None
 
-        if targetChangeList != -1:
-            Args += f" -c {targetChangeList}"
+        with self.OpenedFilesLock:
+            Workspace = c.P4Workspace or os.environ.get("P4CLIENT", "")
+            if self.OpenedFiles is None or self.OpenedFiles.Workspace != Workspace:
+                self.OpenedFiles = P4OpenedFileCache.Load(Workspace)
 
-        Args += f" " + ' '.join(str(x) for x in filePathsChecked)
+            if self.OpenedFiles is None or not self.OpenedFiles.IsValid():
+                Files = self.QueryOpenedFiles()
+                if Files is None:
+                    self.OpenedFiles = None
+                    return None
+                self.OpenedFiles = P4OpenedFileCache(Workspace, Files, time.time())
+                self.OpenedFiles.Save()
 
-        Response, OK = HandleCommand(Args.split())
-        if OK and self.__GetResponseReturnCode(Response) == 0:
-            return OK
+            return self.OpenedFiles
 
-        raise ConnectionError
+    def InvalidateOpenedFiles(self):
+        with self.OpenedFilesLock:
+            self.OpenedFiles = None
+            try:
+                P4OpenedFileCache.GetCachePath().unlink()
+            except OSError:
+                pass
 
-    def RevertFiles(self, filePaths):
-        filePathsChecked = self.__RetrieveExistingFiles(filePaths)
+    # @ret - Normalized local path -> {"Change", "Action", "Path"} of every file opened in the workspace, None on failure.
+    # Path is the local path as spelled by the server, normalized paths are lowercase on Windows.
+    def QueryOpenedFiles(self):
+        Args = self.__GetPreliminaryCommandArgs() + ["fstat", "-Ro", "-T", "clientFile,action,change", "//..."]
+        Files = {}
+
+        if c.P4UseMarshal:
+            Records, OK = self.__HandleMarshalCommand(Args)
+            Entries = [x.Fields for x in Records if x.Code == "stat"]
+            ErrorText = "\n".join(x.Data for x in Records if x.Error)
+        else:
+            Response, OK = HandleCommand(Args[:1] + ["-ztag"] + Args[1:], Timeout=c.P4Timeout)
+            ErrorText = Response.stderr.decode(self.GetDefaultCharSet()) if Response is not None else ""
+            Entries = []
+            # Tagged output, one "... field value" line per field and an empty line between files.
+            for Block in Response.stdout.decode(self.GetDefaultCharSet()).split("\n\n") if Response is not None else []:
+                Fields = dict(Line[4:].rstrip("\r").split(" ", 1) for Line in Block.splitlines() if Line.startswith("... ") and " " in Line[4:])
+                Entries.append(Fields)
+
+        # Empty workspace is reported as "//... - file(s) not opened on this client."
+        if not OK and ErrorText.find("not opened") == -1:
+            return None
 
-        Args = f"{self.__GetPreliminaryCommandArgs()} revert -a " + ' '.join(str(x) for x in filePathsChecked)
+        for Fields in Entries:
+            if "clientFile" in Fields:
+                Files[P4OpenedFileCache.GetKey(Fields["clientFile"])] = {"Change": Fields.get("change", "default"), "Action": Fields.get("action", "edit"), "Path": Fields["clientFile"]}
 
-        Response, OK = HandleCommand(Args.split())
-        if OK and self.__GetResponseReturnCode(Response) == 0:
-            return OK
-        raise ConnectionError
+        return Files
+
+    def __UpdateOpenedFiles(self, Result, Change, Action):
+        Opened = self.OpenedFiles
+        if Opened is None:
+            return
+
+        with self.OpenedFilesLock:
+            for filePath, FileResult in Result.Files.items():
+                if not FileResult.OK:
+                    continue
+                if Change is None:
+                    Opened.Remove(filePath)
+                else:
+                    State = Opened.Get(filePath)
+                    Opened.Set(filePath, Change, Action or (State["Action"] if State is not None else "edit"))
+            Opened.Save()
+
+    def __GetChangeName(self, targetChangeList):
+        return str(targetChangeList) if targetChangeList != -1 else "default"
 
     def __GetPreliminaryCommandArgs(self):
-        return f"p4 -p {c.P4ServerAddress}:{str(c.P4ServerPort)} -u {c.P4User} -P {c.P4Ticket} -c {c.P4Workspace} "
+        Args = [c.P4Executable]
+        if c.P4ServerAddress:
+            Args += ["-p", f"{c.P4ServerAddress}:{str(c.P4ServerPort)}"]
+        if c.P4User:
+            Args += ["-u", c.P4User]
+        if c.P4Ticket:
+            Args += ["-P", c.P4Ticket]
+        if c.P4Workspace:
+            Args += ["-c", c.P4Workspace]
+        return Args
+
+    def __GetChangelistArgs(self, targetChangeList):
+        return ["-c", str(targetChangeList)] if targetChangeList != -1 else []
+
+    def __RunBatch(self, Command, CommandArgs, filePaths):
+        Result = P4BatchResult()
+        for ChunkResult, ChunkToReopen in self.__RunFileCommand(Command, CommandArgs, filePaths):
+            Result.Merge(ChunkResult)
+        return Result
+
+    # File lists are streamed through 'p4 -x -' in chunks of Config.P4BatchSize, Config.P4Jobs chunks at a time.
+    # Yields (P4BatchResult, files that have to be reopened) per chunk.
+    def __RunFileCommand(self, Command, CommandArgs, filePathsChecked):
+        Chunks = [filePathsChecked[i:i + c.P4BatchSize] for i in range(0, len(filePathsChecked), max(1, c.P4BatchSize))]
+
+        with ThreadPoolExecutor(max_workers=max(1, c.P4Jobs)) as Executor:
+            yield from Executor.map(lambda x: self.__RunFileChunk(Command, CommandArgs, x), Chunks)
+
+    def __RunFileChunk(self, Command, CommandArgs, Chunk):
+        Args = self.__GetPreliminaryCommandArgs() + ["-x", "-", Command] + CommandArgs
+        Input = "\n".join(Chunk).encode(self.GetDefaultCharSet(), errors="replace")
+
+        if c.P4UseMarshal:
+            return self.__RunFileChunkMarshal(Args, Input, Chunk, Command, CommandArgs)
+
+        Response, OK = HandleCommand(Args, Input=Input, Timeout=c.P4Timeout)
+
+        Output = ""
+        Errors = []
+        if Response is not None:
+            Output = Response.stdout.decode(self.GetDefaultCharSet())
+            Errors = Response.stderr.decode(self.GetDefaultCharSet()).splitlines()
+
+        # p4 reports failing files by the path it was given, eg. "C:\\File.uasset - file(s) not on client."
+        FileErrors = {}
+        for Line in Errors:
+            Name = Line.split(" - ", 1)[0]
+            FileErrors[Name] = Line
+
+        Attributed = any(x in FileErrors for x in Chunk)
+
+        Result = P4BatchResult()
+        for filePath in Chunk:
+            if filePath in FileErrors:
+                Result.Files[filePath] = P4FileResult(filePath, False, FileErrors[filePath])
+            elif not OK and not Attributed:
+                Result.Files[filePath] = P4FileResult(filePath, False, "\n".join(Errors) or "p4 command failed.")
+            else:
+                Result.Files[filePath] = P4FileResult(filePath)
+
+        # Text output cannot be mapped to local paths reliably, the whole chunk is reopened.
+        # Only the message is matched, paths may contain the word as well.
+        return Result, (Chunk if Output.find("use 'reopen'") != -1 else [])
+
+    def __RunFileChunkMarshal(self, Args, Input, Chunk, Command, CommandArgs):
+        Records, OK = self.__HandleMarshalCommand(Args, Input)
+        Matched = self.__MatchRecords(Records, Chunk)
+        TargetChange = CommandArgs[CommandArgs.index("-c") + 1] if "-c" in CommandArgs else None
+
+        Result = P4BatchResult()
+        ToReopen = []
+        for filePath in Chunk:
+            Record = Matched.get(filePath)
+            if Record is None:
+                Result.Files[filePath] = P4FileResult(filePath, OK, "" if OK else "p4 command failed.")
+            elif Command == "edit" and self.__NeedsReopen(Record, TargetChange):
+                Result.Files[filePath] = P4FileResult(filePath, False, Record.Data, Record)
+                ToReopen.append(filePath)
+            else:
+                Result.Files[filePath] = P4FileResult(filePath, Record.Error is None, Record.Data, Record)
+
+        return Result, ToReopen
+
+    def __NeedsReopen(self, Record, TargetChange):
+        if "use 'reopen'" in Record.Data:
+            return True
+        return Record.Code == "stat" and TargetChange is not None and Record.Change is not None and Record.Change != TargetChange
+
+    # Maps records to the files they refer to. Records that name a depot path only are matched by order.
+    def __MatchRecords(self, Records, Chunk):
+        Normalized = {os.path.normcase(os.path.abspath(x)): x for x in Chunk}
+        Matched = {}
+        Unmatched = []
+
+        for Record in Records:
+            Key = Record.Path
+            filePath = Normalized.get(os.path.normcase(os.path.abspath(Key))) if Key and not Key.startswith("//") else None
+            if filePath is not None and filePath not in Matched:
+                Matched[filePath] = Record
+            else:
+                Unmatched.append(Record)
+
+        Remaining = [x for x in Chunk if x not in Matched]
+        if len(Unmatched) == len(Remaining):
+            Matched.update(zip(Remaining, Unmatched))
+
+        return Matched
+
+    # Runs p4 with '-G' and decodes the marshalled record stream as it arrives.
+    # @ret - (list of P4Record, OK)
+    def __HandleMarshalCommand(self, Args, Input=None):
+        if "-G" not in Args:
+            Args = Args[:1] + ["-G"] + Args[1:]
+
+        CharSet = self.GetDefaultCharSet()
+        Process = subprocess.Popen(Args, stdin=subprocess.PIPE if Input is not None else subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        TimedOut = threading.Event()
+        def Kill():
+            TimedOut.set()
+            Process.kill()
+
+        Timer = threading.Timer(c.P4Timeout, Kill)
+        Timer.start()
+
+        Errors = []
+        def Write():
+            try:
+                Process.stdin.write(Input)
+            except OSError:
+                pass
+            finally:
+                Process.stdin.close()
+
+        # stdin and stderr are serviced on threads, so neither pipe can fill up and stall p4.
+        Threads = [threading.Thread(target=lambda: Errors.append(Process.stderr.read()), daemon=True)]
+        if Input is not None:
+            Threads.append(threading.Thread(target=Write, daemon=True))
+        for Thread in Threads:
+            Thread.start()
+
+        Records = []
+        try:
+            while True:
+                try:
+                    Fields = marshal.load(Process.stdout)
+                except (EOFError, ValueError, TypeError):
+                    break
+                Records.append(P4Record({Key.decode(CharSet) if isinstance(Key, bytes) else Key: Value.decode(CharSet) if isinstance(Value, bytes) else Value for Key, Value in Fields.items()}))
+        finally:
+            ReturnCode = Process.wait()
+            Timer.cancel()
+            for Thread in Threads:
+                Thread.join()
+
+        if TimedOut.is_set():
+            logging.getLogger().error(f"Command {Args} timeout expired.")
+        elif len(Errors) > 0 and len(Errors[0]) > 0:
+            logging.getLogger().error(Errors[0].decode(CharSet))
+
+        return Records, ReturnCode == 0 and not TimedOut.is_set()
 
     def __RetrieveExistingFiles(self, filePaths):
+        Opened = self.OpenedFiles if c.P4OpenedCacheTTL > 0 else None
         filePathsChecked = []
         for i in filePaths:
-            if os.path.isfile(i) == True:
-                filePathsChecked.append(i)
+            # Files opened for anything but delete exist locally, no need to stat them.
+            State = Opened.Get(i) if Opened is not None else None
+            if (State is not None and not State["Action"].endswith("delete")) or os.path.isfile(i) == True:
+                filePathsChecked.append(str(i))
         
         return filePathsChecked
 
@@ -168,14 +657,2059 @@ class PerforceHandler:
             responseMsg = str(response)
             regex = re.compile(r"returncode=(\d+)")
             found = re.search(regex, responseMsg)
-            if len(found.groups()) > 0:
+            if found is not None:
                 return int(found.group(1))
             return -1
 
+# Project and engine paths resolved once per invocation.
+# Persisted in the UEDT cache dir and invalidated when the 'uproject' file changes.
+class ProjectContext:
+    CacheFileName = "ProjectContext.json"
+
+    def __init__(self, ProjectDir, UProjectPath, UProjectMTime, EngineAssociation, EngineDir=None):
+        self.ProjectDir = Path(ProjectDir)
+        self.UProjectPath = Path(UProjectPath)
+        self.UProjectMTime = UProjectMTime
+        self.EngineAssociation = EngineAssociation
+        self._EngineDir = Path(EngineDir) if EngineDir else None
+
+    @property
+    def ProjectFileName(self):
+        return self.UProjectPath.name
+
+    @property
+    def ProjectName(self):
+        return self.ProjectFileName.split(".")[0]
+
+    @property
+    def EngineDir(self):
+        if c.EngineDir:
+            return Path(c.EngineDir)
+
+        # Registry lookup is deferred, commands like 'clean' do not need the engine at all.
+        if self._EngineDir is None:
+            self._EngineDir = ResolveEngineDir(self.EngineAssociation)
+            self.Save()
+
+        return self._EngineDir
+
+    @classmethod
+    def Resolve(cls, ProjectDir, UseCache=True):
+        UProjectPath = FindUProjectFile(ProjectDir)
+        if UProjectPath is None:
+            logging.getLogger().error(f"Cannot find 'uproject' file in {ProjectDir}.")
+            sys.exit(1)
+
+        UProjectMTime = os.stat(UProjectPath).st_mtime_ns
+
+        if UseCache:
+            Cached = cls.Load(ProjectDir)
+            if Cached is not None and Cached.UProjectPath == UProjectPath and Cached.UProjectMTime == UProjectMTime:
+                return Cached
+
+        Data = ReadUProjectFile(UProjectPath)
+        Context = cls(ProjectDir, UProjectPath, UProjectMTime, Data.get('EngineAssociation', ""))
+        Context.Save()
+
+        return Context
+
+    @classmethod
+    def GetCachePath(cls, ProjectDir):
+        return GetUEDTCacheDir(ProjectDir) / cls.CacheFileName
+
+    @classmethod
+    def Load(cls, ProjectDir):
+        try:
+            with open(cls.GetCachePath(ProjectDir), 'r') as f:
+                Data = json.load(f)
+            return cls(ProjectDir, Data['UProjectPath'], Data['UProjectMTime'], Data['EngineAssociation'], Data.get('EngineDir'))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def Save(self):
+        Data = {
+            'UProjectPath': str(self.UProjectPath),
+            'UProjectMTime': self.UProjectMTime,
+            'EngineAssociation': self.EngineAssociation,
+            'EngineDir': str(self._EngineDir) if self._EngineDir is not None else None,
+        }
+
+        try:
+            CachePath = self.GetCachePath(self.ProjectDir)
+            CachePath.parent.mkdir(parents=True, exist_ok=True)
+            with open(CachePath, 'w') as f:
+                json.dump(Data, f, indent=4)
+        except OSError as e:
+            logging.getLogger().info(f"Cannot write project context cache. {e}")
+
+class RemovalStats:
+    def __init__(self):
+        self.Files = 0
+        self.Dirs = 0
+        self.Bytes = 0
+        self.Errors = 0
+        self.Seconds = 0.0
+
+    def Add(self, Other):
+        self.Files += Other.Files
+        self.Dirs += Other.Dirs
+        self.Bytes += Other.Bytes
+        self.Errors += Other.Errors
+
+    def __str__(self):
+        Seconds = max(self.Seconds, 1e-6)
+        MegaBytes = self.Bytes / (1024 * 1024)
+        return (f"{self.Files} files, {self.Dirs} dirs, {MegaBytes:.1f} MB removed in {self.Seconds:.2f}s "
+            f"({self.Files / Seconds:.0f} files/s, {MegaBytes / Seconds:.1f} MB/s, {self.Errors} errors)")
+
+class ProcessResult:
+    def __init__(self, ReturnCode, Tail, TimedOut=None, Seconds=0.0):
+        self.ReturnCode = ReturnCode
+        self.Tail = Tail # Last Config.ProcessTailLines lines of output.
+        self.TimedOut = TimedOut # None | "idle" | "total" | "cancel"
+        self.Seconds = Seconds
+
+    @property
+    def OK(self):
+        return self.ReturnCode == 0 and self.TimedOut is None
+
+# Streaming analyzer of BuildCookRun output. Detects phases, times them and collects deduplicated diagnostics.
+# Works on live output (lines timed on arrival) and on recorded logs (lines timed by their UE timestamps).
+class BuildLogAnalyzer:
+    # Phase start markers. Starting a phase ends the previous one.
+    PhasePatterns = [
+        ("compile", re.compile(r"\*+ BUILD COMMAND STARTED")),
+        ("cook", re.compile(r"\*+ COOK COMMAND STARTED")),
+        ("stage", re.compile(r"\*+ STAGE COMMAND STARTED")),
+        ("pak", re.compile(r"Creating pak using staging manifest|Running: .*UnrealPak")),
+        ("package", re.compile(r"\*+ PACKAGE COMMAND STARTED")),
+        ("archive", re.compile(r"\*+ ARCHIVE COMMAND STARTED")),
+    ]
+    PhaseEndPattern = re.compile(r"\*+ \w+ COMMAND COMPLETED")
+    TimestampPattern = re.compile(r"^\[(\d{4})\.(\d{2})\.(\d{2})-(\d{2})\.(\d{2})\.(\d{2}):(\d{3})\]")
+    # Tried in order, first match wins. Diagnostics without a category are attributed to the current phase.
+    DiagnosticPatterns = [
+        re.compile(r"^.+?\(\d+(?:,\d+)?\)\s*: (?P<Severity>warning|error|fatal error) (?P<Category>[A-Z]+\d+)\s*: (?P<Message>.*)$"), # MSVC
+        re.compile(r"^.+?:\d+:\d+: (?P<Severity>warning|error|fatal error): (?P<Message>.*?)(?: \[(?P<Category>-W[\w\-]+)\])?$"), # Clang
+        re.compile(r"(?P<Category>Log\w+): (?P<Severity>Warning|Error): (?P<Message>.*)$"), # UE log
+        re.compile(r"^(?:[\w\.]+: )?(?P<Severity>Warning|Error|ERROR|WARNING): (?P<Message>.*)$"), # UAT
+    ]
+    MaxMessagesPerCategory = 100
+
+    def __init__(self, Live=False):
+        self.Live = Live
+        self.Phases = []
+        self.CurrentPhase = None
+        self.FirstTime = None
+        self.LastTime = None
+        self.LineCount = 0
+        self.Diagnostics = {"Warning": {}, "Error": {}} # Severity -> Category -> {"Count", "Messages": {Message: Count}}
+
+    def AnalyzeLine(self, Line):
+        Time = self.GetLineTime(Line)
+        if Time is not None:
+            self.FirstTime = Time if self.FirstTime is None else self.FirstTime
+            self.LastTime = Time
+
+        self.LineCount += 1
+
+        if self.PhaseEndPattern.search(Line):
+            self.EndPhase()
+        else:
+            for Name, Pattern in self.PhasePatterns:
+                if Pattern.search(Line):
+                    self.BeginPhase(Name)
+                    break
+
+        if self.CurrentPhase is not None:
+            self.CurrentPhase["Lines"] += 1
+
+        if "arning" in Line or "rror" in Line or "ARNING" in Line or "RROR" in Line:
+            self.AnalyzeDiagnostic(self.TimestampPattern.sub("", Line).strip())
+
+    def AnalyzeDiagnostic(self, Line):
+        for Pattern in self.DiagnosticPatterns:
+            Found = Pattern.search(Line)
+            if Found is None:
+                continue
+
+            Severity = "Error" if Found.group("Severity").lower().endswith("error") else "Warning"
+            Category = Found.groupdict().get("Category") or (self.CurrentPhase["Name"] if self.CurrentPhase is not None else "UAT")
+            Entry = self.Diagnostics[Severity].setdefault(Category, {"Count": 0, "Messages": {}})
+            Entry["Count"] += 1
+
+            Message = Found.group("Message").strip()
+            if Message in Entry["Messages"] or len(Entry["Messages"]) < self.MaxMessagesPerCategory:
+                Entry["Messages"][Message] = Entry["Messages"].get(Message, 0) + 1
+
+            if self.CurrentPhase is not None:
+                self.CurrentPhase[Severity + "s"] += 1
+            return
+
+    def GetLineTime(self, Line):
+        Found = self.TimestampPattern.match(Line)
+        if Found is not None:
+            import datetime
+            Year, Month, Day, Hour, Minute, Second, Millisecond = (int(x) for x in Found.groups())
+            return datetime.datetime(Year, Month, Day, Hour, Minute, Second, Millisecond * 1000).timestamp()
+        return time.time() if self.Live else self.LastTime
+
+    # Also used to time phases run outside of BuildCookRun, eg. sharded cook.
+    def BeginPhase(self, Name):
+        self.EndPhase()
+        if self.Live:
+            self.LastTime = time.time()
+            self.FirstTime = self.LastTime if self.FirstTime is None else self.FirstTime
+        self.CurrentPhase = {"Name": Name, "Start": self.LastTime, "End": None, "Lines": 0, "Warnings": 0, "Errors": 0}
+
+    def EndPhase(self):
+        if self.Live and self.CurrentPhase is not None:
+            self.LastTime = time.time()
+        if self.CurrentPhase is not None:
+            self.CurrentPhase["End"] = self.LastTime
+            self.Phases.append(self.CurrentPhase)
+            self.CurrentPhase = None
+
+    # Adds phases and diagnostics of another analyzer, used to report builds split into several processes.
+    def Merge(self, Other):
+        Other.EndPhase()
+        self.EndPhase()
+        self.Phases = sorted(self.Phases + Other.Phases, key=lambda x: x["Start"] or 0)
+        self.LineCount += Other.LineCount
+        Times = [x for x in (self.FirstTime, Other.FirstTime) if x is not None]
+        self.FirstTime = min(Times) if len(Times) > 0 else None
+        Times = [x for x in (self.LastTime, Other.LastTime) if x is not None]
+        self.LastTime = max(Times) if len(Times) > 0 else None
+
+        for Severity, Categories in Other.Diagnostics.items():
+            for Category, Entry in Categories.items():
+                Target = self.Diagnostics[Severity].setdefault(Category, {"Count": 0, "Messages": {}})
+                Target["Count"] += Entry["Count"]
+                for Message, Count in Entry["Messages"].items():
+                    if Message in Target["Messages"] or len(Target["Messages"]) < self.MaxMessagesPerCategory:
+                        Target["Messages"][Message] = Target["Messages"].get(Message, 0) + Count
+
+    def GetReport(self, ReturnCode=None, **kwargs):
+        self.EndPhase()
+
+        def Seconds(Start, End):
+            return round(End - Start, 3) if Start is not None and End is not None else None
+
+        def Summary(Severity):
+            Categories = self.Diagnostics[Severity]
+            return {
+                "Count": sum(x["Count"] for x in Categories.values()),
+                "Unique": sum(len(x["Messages"]) for x in Categories.values()),
+                "ByCategory": {
+                    Name: {
+                        "Count": Entry["Count"],
+                        "Messages": [{"Message": k, "Count": v} for k, v in sorted(Entry["Messages"].items(), key=lambda x: -x[1])],
+                    } for Name, Entry in sorted(Categories.items(), key=lambda x: -x[1]["Count"])
+                },
+            }
+
+        Report = dict(kwargs)
+        Report.update({
+            "ReturnCode": ReturnCode,
+            "TotalSeconds": Seconds(self.FirstTime, self.LastTime),
+            "Lines": self.LineCount,
+            "Phases": [{"Name": x["Name"], "Seconds": Seconds(x["Start"], x["End"]), "Lines": x["Lines"], "Warnings": x["Warnings"], "Errors": x["Errors"]} for x in self.Phases],
+            "Warnings": Summary("Warning"),
+            "Errors": Summary("Error"),
+        })
+        return Report
+
+    @staticmethod
+    def WriteReport(Report, ReportPath):
+        ReportPath = Path(ReportPath)
+        try:
+            ReportPath.parent.mkdir(parents=True, exist_ok=True)
+            with open(ReportPath, 'w') as f:
+                json.dump(Report, f, indent=4)
+        except OSError as e:
+            logging.getLogger().error(f"Cannot write build report {ReportPath}. {e}")
+            return
+
+        logging.getLogger().info("--------------------------------")
+        for Phase in Report["Phases"]:
+            Seconds = f"{Phase['Seconds']:.1f}s" if Phase["Seconds"] is not None else "n/a"
+            logging.getLogger().info(f"{Phase['Name']:<10} {Seconds:>10}   {Phase['Warnings']} warnings, {Phase['Errors']} errors")
+        logging.getLogger().info(f"Warnings : {Report['Warnings']['Count']} ({Report['Warnings']['Unique']} unique), Errors : {Report['Errors']['Count']} ({Report['Errors']['Unique']} unique)")
+        logging.getLogger().info(f"Build report : {ReportPath}")
+        logging.getLogger().info("--------------------------------")
+
+class ProcessInfo:
+    def __init__(self, Pid, PPid, Name, RSS=0, CPU=0.0):
+        self.Pid = Pid
+        self.PPid = PPid
+        self.Name = Name
+        self.RSS = RSS # Bytes.
+        self.CPU = CPU # User + system seconds.
+
+# Samples peak memory and CPU time of all descendants of this process on a background thread.
+class ProcessTreeSampler(threading.Thread):
+    def __init__(self, Interval):
+        super().__init__(daemon=True)
+        self.Interval = Interval
+        self.StopEvent = threading.Event()
+        self.PeakRSS = 0
+        self.CPU = {} # Pid -> last seen CPU seconds.
+
+    def run(self):
+        while not self.StopEvent.wait(self.Interval):
+            self.Sample()
+
+    def Sample(self):
+        Tree = GetProcessTree(os.getpid())
+        self.PeakRSS = max(self.PeakRSS, sum(x.RSS for x in Tree))
+        for Info in Tree:
+            self.CPU[Info.Pid] = max(self.CPU.get(Info.Pid, 0.0), Info.CPU)
+
+    def Stop(self):
+        self.StopEvent.set()
+        self.join()
+
+# Records command runs in a local SQLite database.
+class RunHistory:
+    FileName = "History.db"
+
+    def __init__(self, DatabasePath=None):
+        import sqlite3
+
+        self.DatabasePath = Path(DatabasePath or GetUEDTCacheDir() / self.FileName)
+        self.DatabasePath.parent.mkdir(parents=True, exist_ok=True)
+        self.Connection = sqlite3.connect(str(self.DatabasePath), timeout=30)
+        self.Connection.execute("""CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            command TEXT NOT NULL,
+            started REAL NOT NULL,
+            wall REAL,
+            cpu REAL,
+            peak_rss INTEGER,
+            exit_code INTEGER,
+            configuration TEXT,
+            changelist TEXT,
+            args TEXT)""")
+        self.Connection.execute("CREATE INDEX IF NOT EXISTS runs_command ON runs (command, started)")
+        # Per module compile times of 'compile --timing'.
+        self.Connection.execute("""CREATE TABLE IF NOT EXISTS module_times (
+            started REAL NOT NULL,
+            targets TEXT NOT NULL,
+            configuration TEXT,
+            module TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            units INTEGER NOT NULL)""")
+        self.Connection.execute("CREATE INDEX IF NOT EXISTS module_times_module ON module_times (module, started)")
+        self.Connection.commit()
+
+    def Add(self, Command, Started, Wall, CPU, PeakRSS, ExitCode, Configuration, Changelist, Args):
+        with self.Connection:
+            Cursor = self.Connection.execute("INSERT INTO runs (command, started, wall, cpu, peak_rss, exit_code, configuration, changelist, args) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (Command, Started, Wall, CPU, PeakRSS, ExitCode, Configuration, Changelist, json.dumps(Args, default=str)))
+        return Cursor.lastrowid
+
+    # @ret - Runs of a command, oldest first, as dicts.
+    def GetRuns(self, Command=None, Limit=None):
+        Query = "SELECT id, command, started, wall, cpu, peak_rss, exit_code, configuration, changelist FROM runs"
+        Params = []
+        if Command is not None:
+            Query += " WHERE command = ?"
+            Params.append(Command)
+        Query += " ORDER BY started DESC"
+        if Limit is not None:
+            Query += " LIMIT ?"
+            Params.append(int(Limit))
+
+        Columns = ["Id", "Command", "Started", "Wall", "CPU", "PeakRSS", "ExitCode", "Configuration", "Changelist"]
+        return [dict(zip(Columns, Row)) for Row in reversed(self.Connection.execute(Query, Params).fetchall())]
+
+    def GetCommands(self):
+        return [Row[0] for Row in self.Connection.execute("SELECT DISTINCT command FROM runs ORDER BY command")]
+
+    # Modules - module name -> {"Seconds", "Units"}
+    def AddModuleTimes(self, Started, Targets, Configuration, Modules):
+        with self.Connection:
+            self.Connection.executemany("INSERT INTO module_times (started, targets, configuration, module, seconds, units) VALUES (?, ?, ?, ?, ?, ?)",
+                [(Started, Targets, Configuration, Name, x["Seconds"], x["Units"]) for Name, x in Modules.items()])
+
+    # @ret - Compile times of a module, oldest first. Units - only compiles of the same number of translation units.
+    def GetModuleTimes(self, Module, Targets=None, Configuration=None, Units=None, Limit=None):
+        Query = "SELECT started, targets, configuration, seconds, units FROM module_times WHERE module = ?"
+        Params = [Module]
+        for Column, Value in (("targets", Targets), ("configuration", Configuration), ("units", Units)):
+            if Value is not None:
+                Query += f" AND {Column} = ?"
+                Params.append(Value)
+        Query += " ORDER BY started DESC"
+        if Limit is not None:
+            Query += " LIMIT ?"
+            Params.append(int(Limit))
+
+        Columns = ["Started", "Targets", "Configuration", "Seconds", "Units"]
+        return [dict(zip(Columns, Row)) for Row in reversed(self.Connection.execute(Query, Params).fetchall())]
+
+    def Close(self):
+        self.Connection.close()
+
+# Measures a single command run and stores it in RunHistory.
+class RunRecorder:
+    def __init__(self, CommandName, Args):
+        self.CommandName = CommandName
+        self.Args = Args
+        self.Sampler = ProcessTreeSampler(c.HistorySampleInterval)
+
+    def Start(self):
+        self.Started = time.time()
+        self.StartClock = time.perf_counter()
+        self.StartTimes = os.times()
+        self.Sampler.start()
+
+    def Finish(self, ExitCode):
+        Wall = time.perf_counter() - self.StartClock
+        self.Sampler.Stop()
+
+        # Reaped children are accounted by the OS on POSIX, elsewhere only sampled CPU time is known.
+        EndTimes = os.times()
+        CPU = (EndTimes.children_user - self.StartTimes.children_user) + (EndTimes.children_system - self.StartTimes.children_system)
+        if CPU <= 0:
+            CPU = sum(self.Sampler.CPU.values())
+
+        Configuration = self.Args.get("configuration") or self.Args.get("c")
+        if Configuration is None and self.CommandName == "build":
+            Configuration = c.BuildConfiguration
+        elif Configuration is None and self.CommandName == "compile":
+            Configuration = c.CompilationConfiguration
+
+        Changelist = perforceHandler.GetHaveChangelist() if c.HistoryRecordChangelist else None
+
+        try:
+            History = RunHistory()
+            History.Add(self.CommandName, self.Started, Wall, CPU, self.Sampler.PeakRSS or None, ExitCode, Configuration, Changelist, self.Args)
+            History.Close()
+        except Exception as e:
+            logging.getLogger().info(f"Cannot record run history. {e}")
+
+class Task:
+    def __init__(self, Name, Run, Requires=(), After=(), Locks=(), Cores=0.0, MemoryMB=0):
+        self.Name = Name
+        self.Run = Run # Callable returning exit code, None means success.
+        self.Requires = list(Requires) # Tasks that have to succeed first.
+        self.After = list(After) # Tasks that have to finish first, regardless of result.
+        self.Locks = list(Locks) # Exclusive locks held while running.
+        self.Cores = Cores # Share of CPU cores, 0-1.
+        self.MemoryMB = MemoryMB
+        self.State = "pending" # pending | running | done | failed | cancelled | skipped
+        self.ExitCode = None
+        self.Start = None
+        self.End = None
+
+    @property
+    def Seconds(self):
+        return self.End - self.Start if self.Start is not None and self.End is not None else None
+
+# Runs a DAG of tasks on a thread pool as soon as their dependencies finish.
+# Concurrency is limited by job count, estimated CPU and memory use of running tasks and exclusive locks.
+class TaskScheduler:
+    def __init__(self, MaxJobs=0, FailFast=True, MemoryMB=None):
+        self.Tasks = {}
+        self.MaxJobs = GetJobCount(MaxJobs)
+        self.FailFast = FailFast
+        self.MemoryMB = MemoryMB if MemoryMB is not None else GetAvailableMemoryMB()
+        self.Cancel = threading.Event() # Set on fail fast, processes started by running tasks are killed. See RunProcess.
+        self.Start = None
+        self.End = None
+
+    def Add(self, NewTask):
+        self.Tasks[NewTask.Name] = NewTask
+        return NewTask
+
+    def CanStart(self, NewTask, Running):
+        if len(Running) >= self.MaxJobs:
+            return False
+        if any(Lock in x.Locks for x in Running for Lock in NewTask.Locks):
+            return False
+        # A task that does not fit the budget on its own still runs, alone.
+        if len(Running) > 0 and sum(x.Cores for x in Running) + NewTask.Cores > 1.0 + 1e-6:
+            return False
+        if len(Running) > 0 and self.MemoryMB and sum(x.MemoryMB for x in Running) + NewTask.MemoryMB > self.MemoryMB:
+            return False
+        return True
+
+    # @ret - Task names ordered so that every task comes after its dependencies.
+    def GetOrder(self):
+        Order = []
+        State = {}
+
+        def Visit(Name, Chain):
+            if State.get(Name) == "done":
+                return
+            if State.get(Name) == "visiting":
+                raise ValueError(f"Dependency cycle: {' -> '.join(Chain + [Name])}")
+            State[Name] = "visiting"
+            for Dependency in self.Tasks[Name].Requires + self.Tasks[Name].After:
+                if Dependency not in self.Tasks:
+                    raise ValueError(f"Task \"{Name}\" depends on unknown task \"{Dependency}\".")
+                Visit(Dependency, Chain + [Name])
+            State[Name] = "done"
+            Order.append(Name)
+
+        for Name in self.Tasks:
+            Visit(Name, [])
+        return Order
+
+    # Chain of tasks that determined the total run time, walked back from the task that finished last
+    # through the dependency that finished last.
+    # @ret - list of tasks, first to last.
+    def GetCriticalPath(self):
+        Finished = [x for x in self.Tasks.values() if x.End is not None]
+        if len(Finished) == 0:
+            return []
+
+        Path = [max(Finished, key=lambda x: x.End)]
+        while True:
+            Dependencies = [self.Tasks[x] for x in Path[-1].Requires + Path[-1].After if self.Tasks[x].End is not None]
+            if len(Dependencies) == 0:
+                break
+            Path.append(max(Dependencies, key=lambda x: x.End))
+        return Path[::-1]
+
+    # Runs on a worker thread, processes started by the task see the scheduler's cancel event.
+    def RunTask(self, Item):
+        Previous = getattr(jobContext, "Cancel", None)
+        jobContext.Cancel = self.Cancel
+        try:
+            return Item.Run()
+        finally:
+            jobContext.Cancel = Previous
+
+    # @ret - True if every task succeeded.
+    def Run(self):
+        self.GetOrder()
+
+        self.Start = time.monotonic()
+        Running = {}
+        Stopped = False
+        # Scheduler running inside a task of another scheduler, eg. build step of a pipeline, is cancelled with it.
+        Parent = getattr(jobContext, "Cancel", None)
+
+        with ThreadPoolExecutor(max_workers=self.MaxJobs) as Executor:
+            while True:
+                Pending = [x for x in self.Tasks.values() if x.State == "pending"]
+
+                for Item in Pending:
+                    if any(self.Tasks[x].State in ("failed", "cancelled", "skipped") for x in Item.Requires):
+                        Item.State = "skipped"
+                        logging.getLogger().info(f"{Item.Name} skipped, a required task failed.")
+
+                if not Stopped:
+                    for Item in Pending:
+                        if Item.State != "pending":
+                            continue
+                        if not all(self.Tasks[x].State == "done" for x in Item.Requires):
+                            continue
+                        if not all(self.Tasks[x].State in ("done", "failed", "cancelled", "skipped") for x in Item.After):
+                            continue
+                        if not self.CanStart(Item, Running.values()):
+                            continue
+
+                        Item.State = "running"
+                        Item.Start = time.monotonic()
+                        logging.getLogger().info(f"{Item.Name} started.")
+                        Running[Executor.submit(self.RunTask, Item)] = Item
+
+                if len(Running) == 0:
+                    break
+
+                Done, _ = wait(Running.keys(), timeout=1.0 if Parent is not None else None, return_when=FIRST_COMPLETED)
+                if Parent is not None and Parent.is_set() and not self.Cancel.is_set():
+                    self.Cancel.set()
+                    Stopped = True
+                for Future in Done:
+                    Item = Running.pop(Future)
+                    Item.End = time.monotonic()
+                    try:
+                        Item.ExitCode = Future.result() or 0
+                    except Exception as e:
+                        logging.getLogger().error(f"{Item.Name} raised {type(e).__name__}: {e}")
+                        Item.ExitCode = 1
+
+                    Item.State = "done" if Item.ExitCode == 0 else "cancelled" if self.Cancel.is_set() else "failed"
+                    logging.getLogger().info(f"{Item.Name} {Item.State} in {FormatSeconds(Item.Seconds)}.")
+                    if Item.State == "failed" and self.FailFast:
+                        Stopped = True
+                        if len(Running) > 0:
+                            logging.getLogger().info(f"Fail fast, cancelling {', '.join(x.Name for x in Running.values())}.")
+                        self.Cancel.set()
+
+        # Tasks left pending are blocked by a failure with fail fast.
+        for Item in self.Tasks.values():
+            if Item.State == "pending":
+                Item.State = "skipped"
+
+        self.End = time.monotonic()
+        return all(x.State == "done" for x in self.Tasks.values())
+
+# Output of a single job written to its own log file. Safe to write from several threads.
+class JobLog:
+    def __init__(self, LogPath):
+        Path(LogPath).parent.mkdir(parents=True, exist_ok=True)
+        self.LogPath = LogPath
+        self.File = open(LogPath, 'w', encoding='utf-8')
+        self.Lock = threading.Lock()
+
+    def Write(self, Line):
+        with self.Lock:
+            self.File.write(Line + "\n")
+
+    def Close(self):
+        self.File.close()
+
+# Content-addressed store of staged build files. Files are stored once by content hash in objects/<ab>/<hash>
+# and staged builds become trees of links to them, so identical files of different configurations and builds take disk space once.
+# Every ingested tree has an index (relative path -> [size, mtime, hash]) next to it, registered in the store for garbage collection.
+class StagingStore:
+    Version = 1
+    # Linux FICLONE ioctl, clones file extents on copy-on-write file systems (Btrfs, XFS).
+    FICLONE = 0x40049409
+
+    def __init__(self, StoreDir=None):
+        self.StoreDir = Path(StoreDir or c.StoreDir or Path(c.BuildStagingDir) / ".uedt-store")
+        self.ObjectsDir = self.StoreDir / "objects"
+        self.TreesPath = self.StoreDir / "Trees.json"
+        self.LinkMode = c.StoreLinkMode if platform.uname().system == "Linux" else "hardlink" # Clones are only made on Linux.
+
+    def GetBlobPath(self, Hash):
+        return self.ObjectsDir / Hash[:2] / Hash[2:]
+
+    @staticmethod
+    def GetIndexPath(StagedDir):
+        return Path(str(StagedDir).rstrip("/\\") + ".StoreIndex.json")
+
+    @staticmethod
+    def LoadJson(JsonPath, Default):
+        try:
+            with open(JsonPath, 'r', encoding='utf-8') as File:
+                return json.load(File)
+        except (OSError, ValueError):
+            return Default
+
+    @staticmethod
+    def SaveJson(JsonPath, Data):
+        Path(JsonPath).parent.mkdir(parents=True, exist_ok=True)
+        with open(str(JsonPath) + ".tmp", 'w', encoding='utf-8') as File:
+            json.dump(Data, File)
+        os.replace(str(JsonPath) + ".tmp", JsonPath)
+
+    def CloneFile(self, Source, Target):
+        import fcntl
+        with open(Source, 'rb') as SourceFile, open(Target, 'wb') as TargetFile:
+            fcntl.ioctl(TargetFile.fileno(), self.FICLONE, SourceFile.fileno())
+
+    # Replaces Target with a link to Source, keeping Target untouched on failure.
+    # @ret - "reflink" or "hardlink", method that was used.
+    def LinkFile(self, Source, Target, KeepStat=False):
+        Temp = f"{Target}.uedt-tmp"
+        if self.LinkMode in ("reflink", "auto") and platform.uname().system == "Linux":
+            try:
+                self.CloneFile(Source, Temp)
+                if KeepStat:
+                    shutil.copystat(Target, Temp)
+                os.replace(Temp, Target)
+                return "reflink"
+            except OSError:
+                if os.path.exists(Temp):
+                    os.unlink(Temp)
+                if self.LinkMode == "reflink":
+                    raise
+                # Clones are not supported by this file system, do not try again.
+                self.LinkMode = "hardlink"
+
+        os.link(Source, Temp)
+        os.replace(Temp, Target)
+        return "hardlink"
+
+    # Blobs are read-only. Hard linked staged files share the blob's inode and are read-only as well, so tools that modify
+    # staged builds have to replace files (see BuildPatch.Apply) and staged builds are detached before staging again (see Detach).
+    # @ret - "reflink" or "hardlink", method that was used.
+    def StoreBlob(self, Source, Blob):
+        Blob.parent.mkdir(parents=True, exist_ok=True)
+        Temp = f"{Blob}.uedt-tmp"
+        if self.LinkMode in ("reflink", "auto") and platform.uname().system == "Linux":
+            try:
+                self.CloneFile(Source, Temp)
+                os.replace(Temp, Blob)
+                self.MakeReadOnly(Blob)
+                return "reflink"
+            except OSError:
+                if os.path.exists(Temp):
+                    os.unlink(Temp)
+                if self.LinkMode == "reflink":
+                    raise
+                self.LinkMode = "hardlink"
+
+        os.link(Source, Blob)
+        self.MakeReadOnly(Blob)
+        return "hardlink"
+
+    # Removes write permission, keeps other permission bits (eg. executables).
+    @staticmethod
+    def MakeReadOnly(FilePath):
+        Mode = os.stat(FilePath).st_mode
+        if Mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH):
+            os.chmod(FilePath, stat.S_IMODE(Mode) & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+    # Removes files of an ingested staged tree that are hard links to the store, before the tree is staged again.
+    # Staging writes files in place, through a hard link it would change the blob and every build linked to it.
+    # Reflinked files are copy-on-write and are kept. Removed files are dropped from the index, the next ingest links them again.
+    # @ret - (removed files, files that could not be removed)
+    def Detach(self, StagedDir):
+        StagedDir = Path(StagedDir)
+        IndexPath = self.GetIndexPath(StagedDir)
+        Index = self.LoadJson(IndexPath, None)
+        if Index is None:
+            return 0, []
+
+        Files = Index.get("Files", {})
+        Removed = 0
+        Failed = []
+        for RelPath, Entry in list(Files.items()):
+            StagedPath = StagedDir / RelPath
+            try:
+                if os.stat(StagedPath).st_nlink < 2:
+                    continue
+                ForceRemoveFile(StagedPath)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.getLogger().error(f"Cannot detach {StagedPath} from the store. {e}")
+                Failed.append(str(StagedPath))
+                continue
+            del Files[RelPath]
+            Removed += 1
+            # Read-only attribute is shared by hard links, ForceRemoveFile clears it on Windows.
+            Blob = self.GetBlobPath(Entry[2])
+            if Blob.exists():
+                self.MakeReadOnly(Blob)
+
+        if Removed > 0:
+            self.SaveJson(IndexPath, Index)
+        return Removed, Failed
+
+    # Stores files of a staged tree and links them back. Files unchanged (size, mtime) since the last ingest are skipped without hashing.
+    # @ret - (files, linked files, bytes deduplicated)
+    def Ingest(self, StagedDir, Jobs=0):
+        StagedDir = Path(StagedDir)
+        IndexPath = self.GetIndexPath(StagedDir)
+        Index = self.LoadJson(IndexPath, {})
+        Previous = Index.get("Files", {}) if Index.get("Version") == self.Version else {}
+
+        Files = HashFiles(StagedDir, [StagedDir], Previous, Jobs=Jobs)
+        Linked = 0
+        Saved = 0
+
+        for RelPath, Entry in Files.items():
+            if Previous.get(RelPath) == Entry:
+                if self.LinkMode == "hardlink":
+                    self.MakeReadOnly(StagedDir / RelPath) # Left writable by earlier versions.
+                continue
+
+            StagedPath = str(StagedDir / RelPath)
+            Blob = self.GetBlobPath(Entry[2])
+            try:
+                if not Blob.exists():
+                    self.StoreBlob(StagedPath, Blob)
+                else:
+                    BlobStat = os.stat(Blob)
+                    StagedStat = os.stat(StagedPath)
+                    if (BlobStat.st_ino, BlobStat.st_dev) != (StagedStat.st_ino, StagedStat.st_dev):
+                        self.MakeReadOnly(Blob)
+                        self.LinkFile(str(Blob), StagedPath, KeepStat=True)
+                        Linked += 1
+                        Saved += Entry[0]
+            except OSError as e:
+                logging.getLogger().error(f"Cannot store {StagedPath}. {e}")
+                continue
+
+            StagedStat = os.stat(StagedPath)
+            Entry[0], Entry[1] = StagedStat.st_size, StagedStat.st_mtime_ns
+
+        self.SaveJson(IndexPath, {"Version": self.Version, "StagedDir": str(StagedDir), "Files": Files})
+
+        Trees = self.LoadJson(self.TreesPath, [])
+        if str(IndexPath) not in Trees:
+            self.SaveJson(self.TreesPath, Trees + [str(IndexPath)])
+
+        return len(Files), Linked, Saved
+
+    # @ret - Index path -> index, of trees still present. Indexes of removed trees are dropped from the store.
+    def GetTrees(self):
+        Trees = {}
+        for IndexPath in self.LoadJson(self.TreesPath, []):
+            Index = self.LoadJson(IndexPath, None)
+            if Index is not None and os.path.isdir(Index.get("StagedDir", "")):
+                Trees[IndexPath] = Index
+        return Trees
+
+    # Hashes referenced by staged trees. Files changed since they were ingested (eg. restaged without ingesting) do not reference their old blob.
+    def GetReferencedHashes(self, Trees):
+        Referenced = set()
+        for Index in Trees.values():
+            StagedDir = Index["StagedDir"]
+            for RelPath, (Size, MTime, Hash) in Index["Files"].items():
+                try:
+                    Stat = os.stat(os.path.join(StagedDir, RelPath))
+                except OSError:
+                    continue
+                if Stat.st_size == Size and Stat.st_mtime_ns == MTime:
+                    Referenced.add(Hash)
+        return Referenced
+
+    # @ret - (Hash, path, size) of every blob in the store.
+    def GetBlobs(self):
+        Blobs = []
+        if not self.ObjectsDir.is_dir():
+            return Blobs
+        with os.scandir(self.ObjectsDir) as Dirs:
+            for Dir in Dirs:
+                if not Dir.is_dir():
+                    continue
+                with os.scandir(Dir.path) as it:
+                    for entry in it:
+                        if not entry.name.endswith(".uedt-tmp"):
+                            Blobs.append((Dir.name + entry.name, entry.path, entry.stat().st_size))
+        return Blobs
+
+    # Removes blobs no staged tree links to.
+    # @ret - (removed blobs, removed bytes)
+    def CollectGarbage(self, DryRun=False):
+        Trees = self.GetTrees()
+        if not DryRun:
+            self.SaveJson(self.TreesPath, list(Trees.keys()))
+        Referenced = self.GetReferencedHashes(Trees)
+
+        Removed = 0
+        Bytes = 0
+        for Hash, BlobPath, Size in self.GetBlobs():
+            if Hash in Referenced:
+                continue
+            if not DryRun:
+                try:
+                    ForceRemoveFile(BlobPath)
+                except OSError as e:
+                    logging.getLogger().error(f"Cannot remove {BlobPath}. {e}")
+                    continue
+            Removed += 1
+            Bytes += Size
+        return Removed, Bytes
+
+    # @ret - dict with sizes of staged trees and of the store.
+    def GetReport(self):
+        Trees = self.GetTrees()
+        Blobs = self.GetBlobs()
+        Referenced = self.GetReferencedHashes(Trees)
+        Report = {"Trees": {}, "StoreBytes": sum(x[2] for x in Blobs), "Blobs": len(Blobs)}
+        Report["UnreferencedBytes"] = sum(x[2] for x in Blobs if x[0] not in Referenced)
+        for Index in Trees.values():
+            Report["Trees"][Index["StagedDir"]] = {"Files": len(Index["Files"]), "Bytes": sum(x[0] for x in Index["Files"].values())}
+        Report["StagedBytes"] = sum(x["Bytes"] for x in Report["Trees"].values())
+        Report["SavedBytes"] = Report["StagedBytes"] - (Report["StoreBytes"] - Report["UnreferencedBytes"])
+        return Report
+
+# Binary delta between two staged builds. Files are compared in fixed size chunks, the patch holds compressed changed chunks only.
+# Layout: Magic, compressed chunks, JSON header, header offset (uint64), Magic.
+class BuildPatch:
+    Magic = b"UEDTPATCH1"
+    # Chunks hashed by a single job, large files are split between jobs.
+    SegmentChunks = 64
+
+    def __init__(self, ChunkSize=None, Jobs=0):
+        self.ChunkSize = int(ChunkSize or c.PatchChunkSize)
+        self.Jobs = GetJobCount(Jobs)
+
+    def HashSegment(self, FilePath, First, Count):
+        with open(FilePath, 'rb') as File, mmap.mmap(File.fileno(), 0, access=mmap.ACCESS_READ) as Map:
+            View = memoryview(Map)
+            try:
+                return [hashlib.blake2b(View[i * self.ChunkSize:(i + 1) * self.ChunkSize], digest_size=16).hexdigest() for i in range(First, First + Count)]
+            finally:
+                View.release()
+
+    # @ret - path -> chunk hashes, hashed on a thread pool.
+    def HashChunks(self, FilePaths, Executor):
+        Work = []
+        for FilePath in FilePaths:
+            Chunks = -(-os.path.getsize(FilePath) // self.ChunkSize)
+            Work += [(FilePath, First, min(self.SegmentChunks, Chunks - First)) for First in range(0, Chunks, self.SegmentChunks)]
+
+        Hashes = {x: [] for x in FilePaths}
+        for (FilePath, First, Count), Result in zip(Work, Executor.map(lambda x: self.HashSegment(*x), Work)):
+            Hashes[FilePath] += Result
+        return Hashes
+
+    @staticmethod
+    def GetFileHash(ChunkHashes, Size):
+        return hashlib.blake2b(f"{Size}:{''.join(ChunkHashes)}".encode(), digest_size=20).hexdigest()
+
+    def ReadChunk(self, FilePath, Index):
+        with open(FilePath, 'rb') as File:
+            File.seek(Index * self.ChunkSize)
+            return zlib.compress(File.read(self.ChunkSize), 6)
+
+    @staticmethod
+    def ListFiles(BaseDir):
+        Files = {}
+        for Root, Dirs, FileNames in os.walk(BaseDir):
+            for FileName in FileNames:
+                FilePath = os.path.join(Root, FileName)
+                Files[os.path.relpath(FilePath, BaseDir).replace(os.sep, "/")] = FilePath
+        return Files
+
+    # @ret - header of the written patch.
+    def Create(self, OldDir, NewDir, PatchPath):
+        OldFiles = self.ListFiles(OldDir)
+        NewFiles = self.ListFiles(NewDir)
+        Header = {"ChunkSize": self.ChunkSize, "Files": [], "NewBytes": 0, "Unchanged": 0}
+
+        with ThreadPoolExecutor(max_workers=self.Jobs) as Executor:
+            # Files linked to the same blob (see StagingStore) are equal without reading them.
+            ToHash = []
+            for RelPath, NewPath in NewFiles.items():
+                NewStat = os.stat(NewPath)
+                Header["NewBytes"] += NewStat.st_size
+                if RelPath in OldFiles:
+                    OldStat = os.stat(OldFiles[RelPath])
+                    if (OldStat.st_ino, OldStat.st_dev) == (NewStat.st_ino, NewStat.st_dev):
+                        Header["Unchanged"] += 1
+                        continue
+                    ToHash.append(OldFiles[RelPath])
+                ToHash.append(NewPath)
+
+            Hashes = self.HashChunks(ToHash, Executor)
+
+            with open(PatchPath, 'wb') as Patch:
+                Patch.write(self.Magic)
+
+                for RelPath, NewPath in sorted(NewFiles.items()):
+                    if NewPath not in Hashes:
+                        continue
+                    NewHashes = Hashes[NewPath]
+                    NewSize = os.path.getsize(NewPath)
+                    OldHashes = Hashes.get(OldFiles.get(RelPath), None)
+                    OldSize = os.path.getsize(OldFiles[RelPath]) if OldHashes is not None else None
+
+                    if OldHashes == NewHashes and OldSize == NewSize:
+                        Header["Unchanged"] += 1
+                        continue
+
+                    Changed = [i for i, Hash in enumerate(NewHashes) if OldHashes is None or i >= len(OldHashes) or OldHashes[i] != Hash]
+                    Entry = {
+                        "Path": RelPath,
+                        "OldHash": self.GetFileHash(OldHashes, OldSize) if OldHashes is not None else None,
+                        "NewHash": self.GetFileHash(NewHashes, NewSize),
+                        "NewSize": NewSize,
+                        "Chunks": [],
+                    }
+
+                    # Compressed in batches to bound memory used by chunks waiting to be written.
+                    for First in range(0, len(Changed), self.Jobs * 4):
+                        Batch = Changed[First:First + self.Jobs * 4]
+                        for Index, Data in zip(Batch, Executor.map(lambda i: self.ReadChunk(NewPath, i), Batch)):
+                            Entry["Chunks"].append([Index, Patch.tell(), len(Data)])
+                            Patch.write(Data)
+
+                    Header["Files"].append(Entry)
+
+                Header["Removed"] = sorted(x for x in OldFiles if x not in NewFiles)
+
+                HeaderOffset = Patch.tell()
+                Patch.write(json.dumps(Header).encode())
+                Patch.write(struct.pack("<Q", HeaderOffset))
+                Patch.write(self.Magic)
+
+        return Header
+
+    def Load(self, PatchPath):
+        with open(PatchPath, 'rb') as Patch:
+            if Patch.read(len(self.Magic)) != self.Magic:
+                raise ValueError(f"{PatchPath} is not a UEDT patch.")
+            Patch.seek(-(8 + len(self.Magic)), os.SEEK_END)
+            Trailer = Patch.read()
+            if Trailer[8:] != self.Magic:
+                raise ValueError(f"{PatchPath} is incomplete.")
+            HeaderOffset = struct.unpack("<Q", Trailer[:8])[0]
+            Patch.seek(HeaderOffset)
+            return json.loads(Patch.read(os.path.getsize(PatchPath) - HeaderOffset - len(Trailer)))
+
+    def GetTargetHash(self, FilePath, Executor):
+        if not os.path.isfile(FilePath):
+            return None
+        return self.GetFileHash(self.HashChunks([FilePath], Executor)[FilePath], os.path.getsize(FilePath))
+
+    # Verifies every target file before changing any, so a patch applied to the wrong build leaves it untouched.
+    # @ret - (patched files, already up to date files, list of errors)
+    def Apply(self, PatchPath, TargetDir, DryRun=False):
+        Header = self.Load(PatchPath)
+        self.ChunkSize = Header["ChunkSize"]
+        ToPatch = []
+        UpToDate = 0
+        Errors = []
+
+        with ThreadPoolExecutor(max_workers=self.Jobs) as Executor:
+            for Entry in Header["Files"]:
+                TargetHash = self.GetTargetHash(os.path.join(TargetDir, Entry["Path"]), Executor)
+                if TargetHash == Entry["NewHash"]:
+                    UpToDate += 1
+                elif TargetHash != Entry["OldHash"]:
+                    Errors.append(f"{Entry['Path']} does not match the patched build.")
+                else:
+                    ToPatch.append(Entry)
+
+            if len(Errors) > 0:
+                return 0, UpToDate, Errors
+            if DryRun:
+                return len(ToPatch), UpToDate, Errors
+
+            with open(PatchPath, 'rb') as Patch:
+                for Entry in ToPatch:
+                    FilePath = os.path.join(TargetDir, Entry["Path"])
+                    os.makedirs(os.path.dirname(FilePath), exist_ok=True)
+                    self.PrepareTarget(FilePath)
+
+                    with open(FilePath, 'r+b' if os.path.exists(FilePath) else 'w+b') as File:
+                        for Index, Offset, Length in Entry["Chunks"]:
+                            Patch.seek(Offset)
+                            File.seek(Index * self.ChunkSize)
+                            File.write(zlib.decompress(Patch.read(Length)))
+                        File.truncate(Entry["NewSize"])
+
+                    if self.GetTargetHash(FilePath, Executor) != Entry["NewHash"]:
+                        Errors.append(f"{Entry['Path']} verification failed after patching.")
+
+        # Files removed by the patch are kept until every patched file is verified.
+        if len(Errors) > 0:
+            if len(Header["Removed"]) > 0:
+                Errors.append(f"{len(Header['Removed'])} files removed by the patch were kept.")
+            return len(ToPatch), UpToDate, Errors
+
+        for RelPath in Header["Removed"]:
+            FilePath = os.path.join(TargetDir, RelPath)
+            if os.path.isfile(FilePath):
+                ForceRemoveFile(FilePath)
+
+        return len(ToPatch), UpToDate, Errors
+
+    # Files linked to other builds (see StagingStore) are replaced by a private writable copy before writing.
+    @staticmethod
+    def PrepareTarget(FilePath):
+        if not os.path.exists(FilePath):
+            return
+        Stat = os.stat(FilePath)
+        if Stat.st_nlink > 1:
+            shutil.copyfile(FilePath, FilePath + ".uedt-tmp")
+            os.replace(FilePath + ".uedt-tmp", FilePath)
+        if not os.access(FilePath, os.W_OK):
+            os.chmod(FilePath, os.stat(FilePath).st_mode | stat.S_IWUSR)
+
+# Filters and colors UE log lines. Every line is matched by a single precompiled pattern, filters are set lookups.
+class LogFilter:
+    Verbosities = ["Fatal", "Error", "Warning", "Display", "Log", "Verbose", "VeryVerbose"]
+    # [2024.01.01-12.00.00:000][  0]LogCategory: Verbosity: Message, timestamp and verbosity are optional, no verbosity means Log.
+    LinePattern = re.compile(r"^(?:\[[^\]]*\]\[\s*\d+\])?(\w+): (?:(Fatal|Error|Warning|Display|Verbose|VeryVerbose): )?")
+    Colors = {"Fatal": "\033[91m", "Error": "\033[91m", "Warning": "\033[93m", "Hitch": "\033[95m"}
+    ResetColor = "\033[0m"
+
+    # Categories - categories to show, "-Category" hides a category. None - all.
+    # Verbosity - least severe verbosity shown, eg. "Warning" shows warnings, errors and fatal errors.
+    def __init__(self, Categories=None, Verbosity=None, Color=False):
+        Categories = [x.strip() for x in (Categories or []) if x.strip()]
+        self.Include = {x for x in Categories if not x.startswith("-")} or None
+        self.Exclude = {x[1:] for x in Categories if x.startswith("-")}
+        self.Shown = set(self.Verbosities[:self.Verbosities.index(Verbosity) + 1] if Verbosity else self.Verbosities)
+        self.HitchPattern = re.compile(c.LaunchHitchPattern)
+        self.Color = Color
+        self.Counts = {"Lines": 0, "Shown": 0, "Warning": 0, "Error": 0, "Hitch": 0}
+
+    # @ret - Text to print for the given lines.
+    def Filter(self, Lines):
+        Output = []
+        Counts = self.Counts
+        for Line in Lines:
+            Counts["Lines"] += 1
+            Found = self.LinePattern.match(Line)
+            if Found is not None:
+                Category = Found.group(1)
+                Verbosity = Found.group(2) or "Log"
+            else:
+                # Continuation of a multi line message or output without a category.
+                Category = None
+                Verbosity = "Log"
+
+            Highlight = None
+            if Verbosity in ("Fatal", "Error"):
+                Counts["Error"] += 1
+                Highlight = Verbosity
+            elif Verbosity == "Warning":
+                Counts["Warning"] += 1
+                Highlight = Verbosity
+            if self.HitchPattern.search(Line):
+                Counts["Hitch"] += 1
+                Highlight = "Hitch"
+
+            if Verbosity not in self.Shown and Highlight != "Hitch":
+                continue
+            if Category is not None and (Category in self.Exclude or (self.Include is not None and Category not in self.Include)):
+                continue
+
+            Counts["Shown"] += 1
+            Output.append(f"{self.Colors[Highlight]}{Line}{self.ResetColor}" if self.Color and Highlight else Line)
+
+        return "\n".join(Output) + "\n" if len(Output) > 0 else ""
+
+# Follows a growing log file, like 'tail -f'. Reads only new bytes, handles the file being recreated (UE backs up the old log on start)
+# or truncated. Waits for changes with inotify on Linux, polls elsewhere.
+class LogFollower:
+    IN_MODIFY = 0x2
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    ReadSize = 1024 * 1024
+
+    def __init__(self, LogPath, PollInterval=0.1):
+        self.LogPath = str(LogPath)
+        self.PollInterval = PollInterval
+        self.File = None
+        self.Inode = None
+        self.Remainder = b""
+        self.Notify = None
+
+        # Content present before following started is skipped, unless the file is recreated.
+        try:
+            Stat = os.stat(self.LogPath)
+            self.Open()
+            self.File.seek(Stat.st_size)
+        except OSError:
+            pass
+
+        if platform.uname().system == "Linux":
+            try:
+                import ctypes
+                LibC = ctypes.CDLL(None, use_errno=True)
+                Notify = LibC.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+                os.makedirs(os.path.dirname(self.LogPath), exist_ok=True)
+                if Notify >= 0 and LibC.inotify_add_watch(Notify, os.path.dirname(self.LogPath).encode(), self.IN_MODIFY | self.IN_CREATE | self.IN_MOVED_TO) >= 0:
+                    self.Notify = Notify
+                elif Notify >= 0:
+                    os.close(Notify)
+            except (OSError, AttributeError):
+                self.Notify = None
+
+    def Open(self):
+        if self.File is not None:
+            self.File.close()
+        self.File = open(self.LogPath, 'rb')
+        self.Inode = os.fstat(self.File.fileno()).st_ino
+        self.Remainder = b""
+
+    # Blocks until the log directory changes or Timeout passes.
+    def Wait(self, Timeout):
+        if self.Notify is not None:
+            if select.select([self.Notify], [], [], Timeout)[0]:
+                try:
+                    os.read(self.Notify, 64 * 1024)
+                except BlockingIOError:
+                    pass
+        else:
+            time.sleep(min(Timeout, self.PollInterval))
+
+    # @ret - Complete lines written since the last call.
+    def Read(self, Final=False):
+        try:
+            Stat = os.stat(self.LogPath)
+            if self.File is None or Stat.st_ino != self.Inode or Stat.st_size < self.File.tell():
+                self.Open()
+        except OSError:
+            return []
+
+        Data = self.Remainder
+        while True:
+            Chunk = self.File.read(self.ReadSize)
+            if not Chunk:
+                break
+            Data += Chunk
+
+        Lines = Data.split(b"\n")
+        self.Remainder = Lines.pop() if not Final else b""
+        if Final and Lines and Lines[-1] == b"":
+            Lines.pop()
+        return [x.decode("utf-8", errors="replace").rstrip("\r") for x in Lines if x or Final]
+
+    def Close(self):
+        if self.File is not None:
+            self.File.close()
+        if self.Notify is not None:
+            os.close(self.Notify)
+
+# Long running UEDT process that executes commands sent by thin clients over a Unix domain socket, see RunDaemonClient.
+# Keeps project context, Perforce state and the argument parser warm between commands. Runs one command at a time,
+# a client that finds the daemon busy executes its command itself. Commands run in the working directory and environment
+# of the client. A client that disconnects (eg. Ctrl-C) cancels its command, processes it started are killed.
+# Protocol - JSON lines. Request {"Args": [...], "Cwd": path, "Env": {...}} or {"Control": "status" | "stop"},
+# responses {"Accepted": true}, {"Output": text}, ending with {"Exit": code}, or a single {"Busy": true}, {"Restart": true} or status.
+# Clients run the command themselves only when it was not accepted, an accepted command is never executed twice.
+class Daemon:
+    # Stand-alone client written next to the daemon's state. Running UEDT.py compiles the whole script on every call,
+    # this client only starts the interpreter. Falls back to running UEDT.py when the daemon is not available.
+    ClientScript = '''import json, os, socket, sys
+SocketPath, ScriptPath = {SocketPath!r}, {ScriptPath!r}
+def Fallback():
+    Args = [sys.executable, ScriptPath] + sys.argv[1:]
+    Env = dict(os.environ, UEDT_NO_DAEMON="1")
+    if os.name == "posix":
+        os.execve(sys.executable, Args, Env)
+    import subprocess
+    sys.exit(subprocess.call(Args, env=Env))
+if len(sys.argv) < 2 or sys.argv[1] == "daemon" or not hasattr(socket, "AF_UNIX"):
+    Fallback()
+Accepted = False
+try:
+    Client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    Client.connect(SocketPath)
+    Client.sendall((json.dumps({{"Args": sys.argv[1:], "Cwd": os.getcwd(), "Env": dict(os.environ)}}) + "\\n").encode())
+    for Line in Client.makefile("rb"):
+        Message = json.loads(Line)
+        Accepted = Accepted or Message.get("Accepted", False)
+        if "Output" in Message:
+            sys.stdout.write(Message["Output"])
+            sys.stdout.flush()
+        elif "Exit" in Message:
+            sys.exit(Message["Exit"])
+except (OSError, ValueError):
+    pass
+except KeyboardInterrupt:
+    sys.exit(130) # Closed connection cancels the command in the daemon.
+if Accepted:
+    sys.stderr.write("UEDT daemon closed the connection before the command finished.\\n")
+    sys.exit(1)
+Fallback()
+'''
+
+    def __init__(self, SocketPath):
+        self.SocketPath = str(SocketPath)
+        self.Parser = CreateArgumentParser()
+        self.Lock = threading.Lock()
+        self.Started = time.time()
+        self.LastActivity = time.monotonic()
+        self.Served = 0
+        self.Running = True
+        self.Inputs = self.GetInputs()
+        self.CodeTime = os.stat(os.path.realpath(__file__)).st_mtime_ns
+        self.ConsoleHandler = next((x for x in logging.getLogger().handlers if type(x) is logging.StreamHandler), None)
+
+    # Modification times of files the resolved project state depends on.
+    def GetInputs(self):
+        Inputs = {}
+        for InputPath in [FindUProjectFile(GetProjectDir())] + glob.glob(str(GetProjectDir() / "Config" / "*.ini")):
+            try:
+                Inputs[str(InputPath)] = os.stat(InputPath).st_mtime_ns
+            except (OSError, TypeError):
+                pass
+        return Inputs
+
+    def Serve(self):
+        if os.path.exists(self.SocketPath):
+            os.unlink(self.SocketPath)
+        Server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        Server.bind(self.SocketPath)
+        os.chmod(self.SocketPath, stat.S_IRUSR | stat.S_IWUSR)
+        Server.listen(16)
+        Server.settimeout(1.0)
+        self.WriteClient()
+        logging.getLogger().info(f"UEDT daemon {os.getpid()} listening on {self.SocketPath}")
+
+        try:
+            while self.Running:
+                try:
+                    Connection, _ = Server.accept()
+                except socket.timeout:
+                    if not self.Lock.locked() and time.monotonic() - self.LastActivity > c.DaemonIdleTimeout:
+                        logging.getLogger().info(f"UEDT daemon idle for {c.DaemonIdleTimeout}s, exiting.")
+                        break
+                    continue
+                threading.Thread(target=self.HandleConnection, args=(Connection,), daemon=True).start()
+        finally:
+            Server.close()
+            if os.path.exists(self.SocketPath):
+                os.unlink(self.SocketPath)
+
+    @staticmethod
+    def GetClientPath():
+        return GetUEDTCacheDir() / "UEDTClient.py"
+
+    def WriteClient(self):
+        ClientPath = self.GetClientPath()
+        ClientPath.parent.mkdir(parents=True, exist_ok=True)
+        ClientPath.write_text(self.ClientScript.format(SocketPath=self.SocketPath, ScriptPath=os.path.realpath(__file__)))
+
+    @staticmethod
+    def Send(Connection, Message):
+        Connection.sendall((json.dumps(Message) + "\n").encode())
+
+    def HandleConnection(self, Connection):
+        with Connection:
+            try:
+                Request = json.loads(Connection.makefile('rb').readline())
+                Control = Request.get("Control")
+                if Control == "status":
+                    self.Send(Connection, {"Pid": os.getpid(), "Uptime": time.time() - self.Started, "Served": self.Served,
+                        "Idle": time.monotonic() - self.LastActivity, "Busy": self.Lock.locked()})
+                elif Control == "stop":
+                    self.Running = False
+                    self.Send(Connection, {"Exit": 0})
+                elif not self.Lock.acquire(blocking=False):
+                    self.Send(Connection, {"Busy": True})
+                else:
+                    try:
+                        self.Execute(Connection, Request)
+                    finally:
+                        self.LastActivity = time.monotonic()
+                        self.Lock.release()
+            except (OSError, ValueError) as e:
+                logging.getLogger().error(f"UEDT daemon request failed. {e}")
+
+    # Sets Cancel when the client closes the connection, until Finished becomes readable.
+    # Clients send nothing after the request, data is discarded.
+    @staticmethod
+    def WatchConnection(Connection, Cancel, Finished):
+        while True:
+            try:
+                Readable, _, _ = select.select([Connection, Finished], [], [])
+                if Finished in Readable:
+                    return
+                if not Connection.recv(4096):
+                    Cancel.set()
+                    return
+            except (OSError, ValueError):
+                Cancel.set()
+                return
+
+    def Execute(self, Connection, Request):
+        # Config lives in UEDT.py, changed code cannot be reloaded in place.
+        if os.stat(os.path.realpath(__file__)).st_mtime_ns != self.CodeTime:
+            self.Running = False
+            self.Send(Connection, {"Restart": True})
+            return
+
+        self.Send(Connection, {"Accepted": True})
+
+        Inputs = self.GetInputs()
+        if Inputs != self.Inputs:
+            logging.getLogger().info("Project files changed, resolving project context again.")
+            ResetProjectContext()
+            self.Inputs = Inputs
+
+        # Per run state, processes found by the previous command may have exited since.
+        processCache.clear()
+
+        # A watcher polling the connection keeps it open, it is woken up and joined before the connection is closed.
+        Cancel = threading.Event()
+        Finished, Finish = socket.socketpair()
+        Watcher = threading.Thread(target=self.WatchConnection, args=(Connection, Cancel, Finished), daemon=True)
+        Watcher.start()
+
+        Writer = DaemonOutput(Connection, Cancel)
+        Stdout, Stderr = sys.stdout, sys.stderr
+        Cwd, Environment = os.getcwd(), dict(os.environ)
+        sys.stdout = sys.stderr = Writer
+        if self.ConsoleHandler is not None:
+            self.ConsoleHandler.setStream(Writer)
+
+        ExitCode = 1
+        try:
+            # Commands run in the client's context, eg. relative paths and P4CLIENT of the client's shell.
+            if "Env" in Request:
+                os.environ.clear()
+                os.environ.update(Request["Env"])
+            os.chdir(Request.get("Cwd") or Cwd)
+            jobContext.Cancel = Cancel
+            ExitCode = ExecuteCommand(self.Parser.parse_args(Request.get("Args", [])))
+        except SystemExit as e:
+            ExitCode = e.code if isinstance(e.code, int) else 1 # Invalid arguments.
+        except Exception:
+            # The client must not run an accepted command again, it gets the traceback and a failure instead.
+            logging.getLogger().exception(f"UEDT daemon command {' '.join(Request.get('Args', []))} failed.")
+        finally:
+            jobContext.Cancel = None
+            Finish.send(b"\0")
+            Watcher.join()
+            Finished.close()
+            Finish.close()
+            os.chdir(Cwd)
+            os.environ.clear()
+            os.environ.update(Environment)
+            sys.stdout, sys.stderr = Stdout, Stderr
+            if self.ConsoleHandler is not None:
+                self.ConsoleHandler.setStream(Stdout)
+
+        self.Served += 1
+        if Cancel.is_set():
+            logging.getLogger().info(f"UEDT daemon client disconnected, {' '.join(Request.get('Args', []))} cancelled.")
+            return
+        self.Send(Connection, {"Exit": ExitCode})
+
+# File-like object forwarding command output to a daemon client. Cancel is set when the client went away.
+class DaemonOutput:
+    def __init__(self, Connection, Cancel):
+        self.Connection = Connection
+        self.Cancel = Cancel
+        self.Lock = threading.Lock()
+
+    def write(self, Text):
+        if Text and not self.Cancel.is_set():
+            with self.Lock:
+                try:
+                    Daemon.Send(self.Connection, {"Output": Text})
+                except OSError:
+                    self.Cancel.set()
+        return len(Text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+# Streaming analysis of CsvProfiler captures (Saved/Profiling/CSV). Rows are parsed in chunks of Config.CsvChunkRows,
+# vectorized with numpy when installed. Per stat only running sums and maxima are kept, frame times are kept as float32 for percentiles.
+class CsvCaptureAnalyzer:
+    FrameTimeStat = "FrameTime"
+    Percentiles = [50, 90, 95, 99]
+
+    def __init__(self, ChunkRows=None, UseNumpy=True):
+        self.ChunkRows = int(ChunkRows or c.CsvChunkRows)
+        self.Numpy = None
+        if UseNumpy:
+            try:
+                import numpy
+                self.Numpy = numpy
+            except ImportError:
+                pass
+
+    # Rows end at the metadata line ("[HasHeaderRowAtEnd],1,[platform],...") or a repeated header.
+    @staticmethod
+    def IsDataRow(Line, Header):
+        return Line and not Line.startswith("[") and Line != Header
+
+    @staticmethod
+    def ParseMetadata(Line):
+        Fields = Line.rstrip("\r\n").split(",")
+        return {Fields[i].strip("[]"): Fields[i + 1] for i in range(0, len(Fields) - 1, 2) if Fields[i].startswith("[")}
+
+    def Analyze(self, CsvPath):
+        import itertools
+
+        with open(CsvPath, 'r', encoding='utf-8', errors='replace') as File:
+            Header = File.readline().rstrip("\r\n")
+            Names = Header.split(",")
+            First = File.readline().rstrip("\r\n")
+
+            # Columns with text (EVENTS) are skipped.
+            Columns = []
+            for Index, Value in enumerate(First.split(",")):
+                try:
+                    float(Value)
+                    Columns.append(Index)
+                except ValueError:
+                    pass
+            StatNames = [Names[x] for x in Columns]
+            FrameColumn = StatNames.index(self.FrameTimeStat) if self.FrameTimeStat in StatNames else None
+
+            Count = [0] * len(Columns)
+            Sum = [0.0] * len(Columns)
+            Max = [float("-inf")] * len(Columns)
+            FrameTimes = []
+            Frames = 0
+            Metadata = {}
+
+            Pending = [First]
+            Done = False
+            while not Done:
+                Lines = Pending + [x.rstrip("\r\n") for x in itertools.islice(File, self.ChunkRows)]
+                Pending = []
+                if len(Lines) == 0:
+                    break
+
+                End = next((i for i, Line in enumerate(Lines) if not self.IsDataRow(Line, Header)), None)
+                if End is not None:
+                    Rest = Lines[End:] + [x.rstrip("\r\n") for x in File]
+                    Metadata = self.ParseMetadata(next((x for x in Rest if x.startswith("[")), ""))
+                    Lines = Lines[:End]
+                    Done = True
+
+                if len(Lines) == 0:
+                    continue
+                Frames += len(Lines)
+
+                if self.Numpy is not None:
+                    self.AnalyzeChunkNumpy(Lines, Columns, FrameColumn, Count, Sum, Max, FrameTimes)
+                else:
+                    self.AnalyzeChunk(Lines, Columns, FrameColumn, Count, Sum, Max, FrameTimes)
+
+        Report = {"Path": str(CsvPath), "Frames": Frames, "Metadata": Metadata, "Stats": {}}
+        for Index, Name in enumerate(StatNames):
+            if Count[Index] > 0:
+                Report["Stats"][Name] = {"Mean": Sum[Index] / Count[Index], "Max": Max[Index]}
+
+        if FrameColumn is not None and Frames > 0:
+            Report["FrameTime"] = self.GetFrameTimeSummary(FrameTimes)
+        return Report
+
+    def AnalyzeChunkNumpy(self, Lines, Columns, FrameColumn, Count, Sum, Max, FrameTimes):
+        np = self.Numpy
+        try:
+            Data = np.loadtxt(Lines, delimiter=",", usecols=Columns, dtype=np.float64, ndmin=2)
+        except ValueError:
+            # Rows with missing values.
+            Data = np.genfromtxt(Lines, delimiter=",", usecols=Columns, dtype=np.float64, ndmin=2)
+
+        Valid = ~np.isnan(Data)
+        ChunkCount = Valid.sum(axis=0)
+        ChunkSum = np.where(Valid, Data, 0.0).sum(axis=0)
+        ChunkMax = np.where(Valid, Data, -np.inf).max(axis=0)
+        for Index in range(len(Columns)):
+            Count[Index] += int(ChunkCount[Index])
+            Sum[Index] += float(ChunkSum[Index])
+            Max[Index] = max(Max[Index], float(ChunkMax[Index]))
+
+        if FrameColumn is not None:
+            Frame = Data[:, FrameColumn]
+            FrameTimes.append(Frame[~np.isnan(Frame)].astype(np.float32))
+
+    def AnalyzeChunk(self, Lines, Columns, FrameColumn, Count, Sum, Max, FrameTimes):
+        for Line in Lines:
+            Fields = Line.split(",")
+            for Index, Column in enumerate(Columns):
+                try:
+                    Value = float(Fields[Column])
+                except (ValueError, IndexError):
+                    continue
+                Count[Index] += 1
+                Sum[Index] += Value
+                if Value > Max[Index]:
+                    Max[Index] = Value
+                if Index == FrameColumn:
+                    FrameTimes.append(Value)
+
+    def GetFrameTimeSummary(self, FrameTimes):
+        if self.Numpy is not None:
+            np = self.Numpy
+            Values = np.concatenate(FrameTimes) if len(FrameTimes) > 0 else np.zeros(0, dtype=np.float32)
+            if len(Values) == 0:
+                return None
+            Summary = {"Mean": float(Values.mean(dtype=np.float64)), "Max": float(Values.max())}
+            Summary.update({f"P{p}": float(x) for p, x in zip(self.Percentiles, np.percentile(Values, self.Percentiles))})
+            Summary["Hitches"] = {str(x): int((Values > x).sum()) for x in c.CsvHitchThresholds}
+        else:
+            Values = sorted(FrameTimes)
+            if len(Values) == 0:
+                return None
+            Summary = {"Mean": sum(Values) / len(Values), "Max": Values[-1]}
+            Summary.update({f"P{p}": Percentile(Values, p) for p in self.Percentiles})
+            Summary["Hitches"] = {str(x): sum(1 for v in Values if v > x) for x in c.CsvHitchThresholds}
+        return Summary
+
+    @staticmethod
+    def PrintReport(Report, Top=20):
+        print("--------------------------------")
+        print(f"Capture : {Report['Path']}")
+        print(f"Frames : {Report['Frames']}" + "".join(f", {k} : {v}" for k, v in Report["Metadata"].items() if k in ("platform", "config", "buildversion", "commandline")))
+        FrameTime = Report.get("FrameTime")
+        if FrameTime:
+            print(f"Frame time (ms) : mean {FrameTime['Mean']:.2f}, " + ", ".join(f"p{p} {FrameTime[f'P{p}']:.2f}" for p in CsvCaptureAnalyzer.Percentiles) + f", max {FrameTime['Max']:.2f}")
+            print("Hitches : " + ", ".join(f"> {k} ms : {v}" for k, v in FrameTime["Hitches"].items()))
+        print(f"{'Stat':<48}{'Mean':>12}{'Max':>12}")
+        for Name, Stat in sorted(Report["Stats"].items(), key=lambda x: -x[1]["Mean"])[:Top]:
+            print(f"{Name:<48}{Stat['Mean']:>12.3f}{Stat['Max']:>12.3f}")
+        print("--------------------------------")
+
+    # Prints frame time and stats of New next to Base, stats sorted by the largest relative change of their mean.
+    @staticmethod
+    def PrintComparison(Base, New, Top=20):
+        def Change(Old, Value):
+            return (Value - Old) / Old * 100 if Old else 0.0
+
+        print("--------------------------------")
+        print(f"Base : {Base['Path']} ({Base['Frames']} frames)")
+        print(f"New : {New['Path']} ({New['Frames']} frames)")
+        print(f"{'':<48}{'Base':>12}{'New':>12}{'Change':>10}")
+        if Base.get("FrameTime") and New.get("FrameTime"):
+            for Key in ["Mean"] + [f"P{p}" for p in CsvCaptureAnalyzer.Percentiles] + ["Max"]:
+                Old, Value = Base["FrameTime"][Key], New["FrameTime"][Key]
+                print(f"{'FrameTime ' + Key:<48}{Old:>12.2f}{Value:>12.2f}{Change(Old, Value):>9.1f}%")
+            for Threshold, Old in Base["FrameTime"]["Hitches"].items():
+                Value = New["FrameTime"]["Hitches"].get(Threshold, 0)
+                print(f"{'Hitches > ' + Threshold + ' ms':<48}{Old:>12}{Value:>12}")
+
+        Common = [x for x in New["Stats"] if x in Base["Stats"]]
+        Common.sort(key=lambda x: -abs(Change(Base["Stats"][x]["Mean"], New["Stats"][x]["Mean"])))
+        print(f"{'Stat mean':<48}")
+        for Name in Common[:Top]:
+            Old, Value = Base["Stats"][Name]["Mean"], New["Stats"][Name]["Mean"]
+            print(f"{Name:<48}{Old:>12.3f}{Value:>12.3f}{Change(Old, Value):>9.1f}%")
+        print("--------------------------------")
+
+    # Writes a capture in CsvProfiler format, frame times are normally distributed around FrameTime ms with a hitch every HitchEvery frames.
+    @staticmethod
+    def WriteSyntheticCapture(CsvPath, Frames, Stats=50, FrameTime=16.6, HitchEvery=500, Seed=0):
+        import random
+        Random = random.Random(Seed)
+        Names = ["FrameTime", "GameThreadTime", "RenderThreadTime", "GPUTime"] + [f"Exclusive/GameThread/Stat{i}" for i in range(Stats)]
+        with open(CsvPath, 'w', encoding='utf-8') as File:
+            Header = ",".join(Names + ["EVENTS"])
+            File.write(Header + "\n")
+            for Frame in range(Frames):
+                Time = max(1.0, Random.gauss(FrameTime, FrameTime * 0.05)) * (6 if HitchEvery and Frame % HitchEvery == HitchEvery - 1 else 1)
+                Values = [Time, Time * 0.8, Time * 0.7, Time * 0.9] + [Random.random() * (i % 7 + 1) for i in range(Stats)]
+                File.write(",".join(f"{x:.4f}" for x in Values) + ("," + ("Hitch" if Time > 50 else "") + "\n"))
+            File.write(Header + "\n")
+            File.write("[HasHeaderRowAtEnd],1,[platform],Windows,[config],Development,[commandline],\" -game\"\n")
+
+# Collects compile times of translation units and included headers. Reads MSVC /Bt+ and /d1reportTime lines from live UBT output
+# and clang -ftime-trace files. Translation units are attributed to modules by their path.
+class CompileTimingAnalyzer:
+    # Eg. "time(C:\VS\c1xx.dll)=0.51234s < 5446953462 - 5448373766 > BB [C:\Game\Intermediate\...\Module.Game.1.cpp]"
+    BtPattern = re.compile(r"time\((?P<Tool>[^)]*)\)=(?P<Seconds>[\d.]+)s.*\[(?P<File>[^\]]+)\]")
+    # Eg. "		C:\Engine\Source\Runtime\Core\Public\CoreMinimal.h: 0.12345s" of the "Include Headers" section.
+    IncludePattern = re.compile(r"^\s+(?P<File>\S.*\.(?:h|hpp|hxx|inl)): (?P<Seconds>[\d.]+)s\s*$")
+    # Source folders with modules one level below.
+    SourceGroups = {"Runtime", "Editor", "Developer", "Programs", "ThirdParty"}
+
+    def __init__(self):
+        self.Lock = threading.Lock()
+        self.Units = {} # Translation unit path -> seconds
+        self.Headers = {} # Header path -> [included count, seconds]
+
+    def AnalyzeLine(self, Line):
+        Match = self.BtPattern.search(Line)
+        if Match is not None:
+            with self.Lock:
+                File = Match["File"].replace("\\", "/")
+                self.Units[File] = self.Units.get(File, 0.0) + float(Match["Seconds"])
+            return
+        Match = self.IncludePattern.match(Line)
+        if Match is not None:
+            self.AddHeader(Match["File"], float(Match["Seconds"]))
+
+    def AddHeader(self, File, Seconds):
+        with self.Lock:
+            Header = self.Headers.setdefault(File.replace("\\", "/"), [0, 0.0])
+            Header[0] += 1
+            Header[1] += Seconds
+
+    # Reads a clang -ftime-trace file, "<unit>.json" next to the object file. Durations are in microseconds.
+    def AnalyzeTimeTrace(self, TracePath):
+        try:
+            with open(TracePath, 'r', encoding='utf-8') as File:
+                Events = json.load(File).get("traceEvents", [])
+        except (OSError, ValueError, AttributeError):
+            return False
+
+        Total = None
+        for Event in Events:
+            if Event.get("name") == "Source" and "dur" in Event:
+                self.AddHeader(Event.get("args", {}).get("detail", "?"), Event["dur"] / 1e6)
+            elif Event.get("name") == "Total ExecuteCompiler":
+                Total = Event.get("dur", 0) / 1e6
+        if Total is None:
+            return False
+        with self.Lock:
+            self.Units[str(TracePath)[:-len(".json")].replace(os.sep, "/")] = Total
+        return True
+
+    # Unity files and generated code live in Intermediate/Build/<Platform>/<Target>/<Configuration>/<Module>,
+    # sources in Source/<Module> or Source/<Runtime|Editor|...>/<Module>.
+    @classmethod
+    def GetModule(cls, UnitPath):
+        Parts = UnitPath.split("/")
+        if "Intermediate" in Parts and len(Parts) >= 2:
+            return Parts[-2]
+        if "Source" in Parts:
+            Index = len(Parts) - 1 - Parts[::-1].index("Source")
+            Rest = Parts[Index + 1:-1]
+            if len(Rest) > 1 and Rest[0] in cls.SourceGroups:
+                return Rest[1]
+            if len(Rest) > 0:
+                return Rest[0]
+        return "Unknown"
+
+    def GetReport(self):
+        Modules = {}
+        for Unit, Seconds in self.Units.items():
+            Module = Modules.setdefault(self.GetModule(Unit), {"Seconds": 0.0, "Units": 0})
+            Module["Seconds"] += Seconds
+            Module["Units"] += 1
+        return {
+            "Modules": dict(sorted(Modules.items(), key=lambda x: -x[1]["Seconds"])),
+            "Units": dict(sorted(self.Units.items(), key=lambda x: -x[1])),
+            "Headers": dict(sorted(self.Headers.items(), key=lambda x: (-x[1][0], -x[1][1]))),
+        }
+
+# Sizes and last use times of files in directory trees, persisted in Saved/UEDT/UsageIndex.json.
+# Directories are listed in parallel. A directory whose modification time did not change keeps its file list from the index without
+# querying its files again, so files touched in place are only seen by a full rescan. Entries are checked again before eviction.
+class UsageIndex:
+    Version = 1
+
+    def __init__(self, IndexPath=None):
+        self.IndexPath = Path(IndexPath or GetUEDTCacheDir() / "UsageIndex.json")
+        self.Dirs = {} # Directory path -> [mtime, {file name: [size, last use]}, [subdirectory names]]
+
+    def Load(self):
+        try:
+            with open(self.IndexPath, 'r') as f:
+                Index = json.load(f)
+            if Index.get("Version") == self.Version:
+                self.Dirs = Index["Dirs"]
+        except (OSError, ValueError):
+            self.Dirs = {}
+
+    def Save(self):
+        try:
+            self.IndexPath.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.IndexPath, 'w') as f:
+                json.dump({"Version": self.Version, "Dirs": self.Dirs}, f)
+        except OSError as e:
+            logging.getLogger().error(f"Cannot write usage index {self.IndexPath}. {e}")
+
+    # Last use is the later of access and modification time, access times are not updated on every file system.
+    @staticmethod
+    def GetLastUse(Stat):
+        return max(Stat.st_atime_ns, Stat.st_mtime_ns)
+
+    def ScanDir(self, DirPath, Full):
+        try:
+            DirTime = os.stat(DirPath).st_mtime_ns
+            Cached = self.Dirs.get(DirPath)
+            if not Full and Cached is not None and Cached[0] == DirTime:
+                return DirPath, Cached, 0
+
+            Files, SubDirs = {}, []
+            with os.scandir(DirPath) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False) and not IsLinkEntry(entry):
+                        SubDirs.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        Stat = entry.stat(follow_symlinks=False)
+                        Files[entry.name] = [Stat.st_size, self.GetLastUse(Stat)]
+            return DirPath, [DirTime, Files, SubDirs], 1
+        except OSError as e:
+            logging.getLogger().error(f"Cannot scan {DirPath}. {e}")
+            return DirPath, None, 0
+
+    # Updates the index of Roots, directories under Roots that no longer exist are dropped.
+    # @ret - Number of directories listed again.
+    def Update(self, Roots, Jobs=0, Full=False):
+        Prefixes = tuple(str(x).rstrip(os.sep) + os.sep for x in Roots)
+        Dirs = {x: Entry for x, Entry in self.Dirs.items() if not (x + os.sep).startswith(Prefixes)}
+        Listed = 0
+        with ThreadPoolExecutor(max_workers=GetJobCount(Jobs)) as Executor:
+            Pending = {Executor.submit(self.ScanDir, str(x), Full) for x in Roots if os.path.isdir(x)}
+            while Pending:
+                Done, Pending = wait(Pending, return_when=FIRST_COMPLETED)
+                for Future in Done:
+                    DirPath, Entry, Count = Future.result()
+                    if Entry is None:
+                        continue
+                    Dirs[DirPath] = Entry
+                    Listed += Count
+                    Pending |= {Executor.submit(self.ScanDir, os.path.join(DirPath, x), Full) for x in Entry[2]}
+        self.Dirs = Dirs
+        return Listed
+
+    # Groups files under Root into eviction entries, files or directories Depth levels below Root.
+    # @ret - Entry path -> [size, last use, is directory]
+    def GetEntries(self, Root, Depth):
+        Root = str(Root)
+        Entries = {}
+        Prefix = Root.rstrip(os.sep) + os.sep
+        for DirPath, (_, Files, _) in self.Dirs.items():
+            if DirPath != Root and not DirPath.startswith(Prefix):
+                continue
+            Parts = Path(os.path.relpath(DirPath, Root)).parts if DirPath != Root else ()
+            for Name, (Size, LastUse) in Files.items():
+                if Depth > 0 and len(Parts) >= Depth:
+                    Key, IsDir = os.path.join(Root, *Parts[:Depth]), True
+                else:
+                    Key, IsDir = os.path.join(DirPath, Name), False
+                Entry = Entries.setdefault(Key, [0, 0, IsDir])
+                Entry[0] += Size
+                Entry[1] = max(Entry[1], LastUse)
+        return Entries
+
+# Reads dependencies of an editor package (.uasset, .umap) from its header without loading the rest of the file.
+# Parses FPackageFileSummary, the name table and the import table. Dependencies are top level "Package" imports, native (/Script/) packages excluded.
+class PackageSummaryReader:
+    Tag = 0x9E2A83C1
+    PKG_FilterEditorOnly = 0x80000000
+    # Object versions changing the summary and import table layout.
+    VER_UE4_ADD_STRING_ASSET_REFERENCES_MAP = 384
+    VER_UE4_SERIALIZE_TEXT_IN_PACKAGES = 459
+    VER_UE4_NAME_HASHES_SERIALIZED = 504
+    VER_UE4_ADDED_SOFT_OBJECT_PATH = 514
+    VER_UE4_ADDED_PACKAGE_SUMMARY_LOCALIZATION_ID = 516
+    VER_UE4_NON_OUTER_PACKAGE_IMPORT = 520
+    VER_UE5_OPTIONAL_RESOURCES = 1003
+    VER_UE5_ADD_SOFTOBJECTPATH_LIST = 1008
+    VER_UE5_METADATA_SERIALIZATION_OFFSET = 1014
+    VER_UE5_VERSE_CELLS = 1015
+    VER_UE5_PACKAGE_SAVED_HASH = 1016
+    # Package paths in headers that cannot be parsed, eg. unversioned packages.
+    FallbackPattern = re.compile(rb"(/[A-Za-z0-9_]+(?:/[A-Za-z0-9_\- ]+)+)\x00")
+
+    # @ret - {"Package": package name from the summary, "Dependencies": [package names], "SoftDependencies": [package names],
+    #   "Error": None | reason the header was scanned instead}
+    # Soft dependencies are soft package references, eg. streaming sublevels of a map. A scanned header has only Dependencies.
+    def Read(self, FilePath):
+        with open(FilePath, 'rb') as File:
+            if os.fstat(File.fileno()).st_size == 0:
+                return {"Package": None, "Dependencies": [], "SoftDependencies": [], "Error": "Empty file"}
+            with mmap.mmap(File.fileno(), 0, access=mmap.ACCESS_READ) as Data:
+                try:
+                    return self.Parse(Data)
+                except (ValueError, IndexError, struct.error) as e:
+                    Names = {x.decode('latin-1') for x in self.FallbackPattern.findall(Data, 0, min(len(Data), 4 * 2**20))}
+                    return {"Package": None, "Dependencies": sorted(x for x in Names if not x.startswith("/Script/")), "SoftDependencies": [],
+                        "Error": str(e) or type(e).__name__}
+
+    def Parse(self, Data):
+        Offset = 0
+
+        def Int32():
+            nonlocal Offset
+            Value = struct.unpack_from("<i", Data, Offset)[0]
+            Offset += 4
+            return Value
+
+        def String():
+            nonlocal Offset
+            Length = Int32()
+            if Length == 0:
+                return ""
+            Size = Length if Length > 0 else -Length * 2
+            if Offset + Size > len(Data):
+                raise ValueError("String out of bounds")
+            Value = Data[Offset:Offset + Size].decode('latin-1' if Length > 0 else 'utf-16-le')
+            Offset += Size
+            return Value[:-1]
+
+        if struct.unpack_from("<I", Data, 0)[0] != self.Tag:
+            raise ValueError("Not a package")
+        Offset = 4
+        LegacyVersion = Int32()
+        # -6 and older use other custom version formats, -9 and newer are not known.
+        if LegacyVersion < -8 or LegacyVersion > -6:
+            raise ValueError(f"Unsupported legacy file version {LegacyVersion}")
+        Int32() # LegacyUE3Version
+        UE4Version = Int32()
+        UE5Version = Int32() if LegacyVersion <= -8 else 0
+        Int32() # Licensee version
+        if UE4Version == 0 and UE5Version == 0:
+            raise ValueError("Unversioned package")
+
+        if UE5Version >= self.VER_UE5_PACKAGE_SAVED_HASH:
+            Offset += 20 + 4 # SavedHash, TotalHeaderSize
+        CustomVersions = Int32()
+        if CustomVersions < 0 or CustomVersions > 4096:
+            raise ValueError("Corrupted custom versions")
+        Offset += CustomVersions * 20 # Guid, version
+        if UE5Version < self.VER_UE5_PACKAGE_SAVED_HASH:
+            Offset += 4 # TotalHeaderSize
+
+        PackageName = String()
+        Flags = struct.unpack_from("<I", Data, Offset)[0]
+        Offset += 4
+        NameCount, NameOffset = Int32(), Int32()
+        if UE5Version >= self.VER_UE5_ADD_SOFTOBJECTPATH_LIST:
+            Offset += 8
+        EditorOnlyData = not Flags & self.PKG_FilterEditorOnly
+        if EditorOnlyData and UE4Version >= self.VER_UE4_ADDED_PACKAGE_SUMMARY_LOCALIZATION_ID:
+            String()
+        if UE4Version >= self.VER_UE4_SERIALIZE_TEXT_IN_PACKAGES:
+            Offset += 8
+        Int32(), Int32() # Exports
+        ImportCount, ImportOffset = Int32(), Int32()
+        if UE5Version >= self.VER_UE5_VERSE_CELLS:
+            Offset += 16 # Cell exports and imports
+        if UE5Version >= self.VER_UE5_METADATA_SERIALIZATION_OFFSET:
+            Offset += 4
+        Int32() # DependsOffset
+        SoftCount, SoftOffset = (Int32(), Int32()) if UE4Version >= self.VER_UE4_ADD_STRING_ASSET_REFERENCES_MAP else (0, 0)
+        if NameCount < 0 or ImportCount < 0 or NameOffset >= len(Data) or ImportOffset > len(Data):
+            raise ValueError("Corrupted summary")
+        if SoftCount < 0 or (SoftCount > 0 and SoftOffset + SoftCount * 8 > len(Data)):
+            raise ValueError("Soft package references out of bounds")
+
+        Names = []
+        Offset = NameOffset
+        for _ in range(NameCount):
+            Names.append(String())
+            if UE4Version >= self.VER_UE4_NAME_HASHES_SERIALIZED:
+                Offset += 4
+
+        def Name(Index, Number):
+            return Names[Index] if Number == 0 else f"{Names[Index]}_{Number - 1}"
+
+        ImportFormat = "<iiiiiii" + ("ii" if EditorOnlyData and UE4Version >= self.VER_UE4_NON_OUTER_PACKAGE_IMPORT else "") + ("i" if UE5Version >= self.VER_UE5_OPTIONAL_RESOURCES else "")
+        ImportSize = struct.calcsize(ImportFormat)
+        if ImportOffset + ImportCount * ImportSize > len(Data):
+            raise ValueError("Import table out of bounds")
+
+        Dependencies = set()
+        for Index in range(ImportCount):
+            # ClassPackage, ClassName, OuterIndex, ObjectName, [PackageName], [bImportOptional]
+            Values = struct.unpack_from(ImportFormat, Data, ImportOffset + Index * ImportSize)
+            if Values[4] == 0 and Name(Values[2], Values[3]) == "Package":
+                Dependencies.add(Name(Values[5], Values[6]))
+            if len(Values) >= 9 and Names[Values[7]] != "None":
+                Dependencies.add(Name(Values[7], Values[8]))
+
+        SoftDependencies = set()
+        Offset = SoftOffset
+        for _ in range(SoftCount):
+            SoftDependencies.add(Name(Int32(), Int32()) if UE4Version >= self.VER_UE4_ADDED_SOFT_OBJECT_PATH else String())
+
+        Dependencies = {x for x in Dependencies if not x.startswith("/Script/") and x != PackageName}
+        return {"Package": PackageName, "Dependencies": sorted(Dependencies),
+            "SoftDependencies": sorted(x for x in SoftDependencies if not x.startswith("/Script/") and x != PackageName and x not in Dependencies), "Error": None}
+
+# Dependency graph of project packages, persisted in Saved/UEDT/AssetGraph.json.
+# Only packages whose files changed (size, mtime) since the last update are read again.
+# Soft references (streaming sublevels, soft object paths) are kept apart from imports, both are cooked.
+class AssetGraph:
+    Version = 2
+    PackageExtensions = (".uasset", ".umap")
+    # Files of the package next to the header file.
+    DataExtensions = (".uexp", ".ubulk", ".uptnl")
+
+    def __init__(self, ProjectDir=None):
+        self.ProjectDir = Path(ProjectDir or GetProjectDir())
+        self.GraphPath = GetUEDTCacheDir(self.ProjectDir) / "AssetGraph.json"
+        self.Packages = {} # Package name -> {"File", "Size", "MTime", "Dependencies", "SoftDependencies", "Error"}
+        self.Referencers = None
+        self.SoftReferencers = None
+
+    def Load(self):
+        try:
+            with open(self.GraphPath, 'r') as f:
+                Graph = json.load(f)
+            if Graph.get("Version") == self.Version:
+                self.Packages = Graph["Packages"]
+        except (OSError, ValueError):
+            self.Packages = {}
+
+    def Save(self):
+        try:
+            self.GraphPath.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.GraphPath, 'w') as f:
+                json.dump({"Version": self.Version, "Packages": self.Packages}, f)
+        except OSError as e:
+            logging.getLogger().error(f"Cannot write asset graph {self.GraphPath}. {e}")
+
+    # @ret - Number of packages read.
+    def Update(self, Jobs=0, Full=False):
+        if not Full:
+            self.Load()
+
+        Files = {} # Relative path without extension -> [header file relative path, size, mtime]
+        DataSizes = {}
+        Stack = [str(x) for x in GetContentRoots(self.ProjectDir) if x.is_dir()]
+        while Stack:
+            with os.scandir(Stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        Stack.append(entry.path)
+                        continue
+                    Stem, Extension = os.path.splitext(os.path.relpath(entry.path, self.ProjectDir).replace(os.sep, "/"))
+                    if Extension.lower() in self.PackageExtensions:
+                        Stat = entry.stat()
+                        Files[Stem] = [Stem + Extension, Stat.st_size, Stat.st_mtime_ns]
+                    elif Extension.lower() in self.DataExtensions:
+                        DataSizes[Stem] = DataSizes.get(Stem, 0) + entry.stat().st_size
+
+        Packages = {}
+        ToRead = []
+        for Stem, (RelPath, Size, MTime) in Files.items():
+            PackageName = GetPackageName(RelPath)
+            if PackageName is None:
+                continue
+            Old = self.Packages.get(PackageName)
+            Size += DataSizes.get(Stem, 0)
+            if Old is not None and Old["File"] == RelPath and Old["Size"] == Size and Old["MTime"] == MTime:
+                Packages[PackageName] = Old
+            else:
+                Packages[PackageName] = {"File": RelPath, "Size": Size, "MTime": MTime, "Dependencies": [], "SoftDependencies": [], "Error": None}
+                ToRead.append(PackageName)
+
+        Reader = PackageSummaryReader()
+        def Read(PackageName):
+            try:
+                return Reader.Read(self.ProjectDir / Packages[PackageName]["File"])
+            except OSError as e:
+                return {"Dependencies": [], "SoftDependencies": [], "Error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=GetJobCount(Jobs)) as Executor:
+            for PackageName, Summary in zip(ToRead, Executor.map(Read, ToRead)):
+                Packages[PackageName]["Dependencies"] = [x for x in Summary["Dependencies"] if x != PackageName]
+                Packages[PackageName]["SoftDependencies"] = [x for x in Summary["SoftDependencies"] if x != PackageName]
+                Packages[PackageName]["Error"] = Summary["Error"]
+
+        Changed = len(ToRead) > 0 or len(Packages) != len(self.Packages)
+        self.Packages = Packages
+        self.Referencers = None
+        self.SoftReferencers = None
+        if Changed or not self.GraphPath.exists():
+            self.Save()
+        return len(ToRead)
+
+    # @ret - Package name of a map given by package name ("/Game/Maps/Main") or by short name ("Main"), None if not found.
+    def FindMap(self, Name):
+        if Name in self.Packages:
+            return Name
+        return next((x for x, Info in self.Packages.items() if x.rsplit("/", 1)[-1] == Name and Info["File"].lower().endswith(".umap")), None)
+
+    # @ret - Project packages reachable from Roots, including Roots. Soft - follow soft references too.
+    def GetClosure(self, Roots, Soft=True):
+        Closure = set()
+        Stack = [x for x in Roots if x in self.Packages]
+        while Stack:
+            PackageName = Stack.pop()
+            if PackageName in Closure:
+                continue
+            Closure.add(PackageName)
+            Info = self.Packages[PackageName]
+            Stack += [x for x in Info["Dependencies"] + (Info["SoftDependencies"] if Soft else []) if x in self.Packages and x not in Closure]
+        return Closure
+
+    # @ret - Packages directly depending on any of PackageNames. Soft - include soft referencers.
+    def GetReferencers(self, PackageNames, Soft=True):
+        if self.Referencers is None:
+            self.Referencers, self.SoftReferencers = {}, {}
+            for PackageName, Info in self.Packages.items():
+                for Dependency in Info["Dependencies"]:
+                    self.Referencers.setdefault(Dependency, set()).add(PackageName)
+                for Dependency in Info["SoftDependencies"]:
+                    self.SoftReferencers.setdefault(Dependency, set()).add(PackageName)
+        Found = set().union(*(self.Referencers.get(x, set()) for x in PackageNames))
+        if Soft:
+            Found |= set().union(*(self.SoftReferencers.get(x, set()) for x in PackageNames))
+        return Found
+
+    def GetSize(self, PackageNames):
+        return sum(self.Packages[x]["Size"] for x in PackageNames if x in self.Packages)
+
 class Command(ABC):
    
     def __init__(self, *args, **kwargs) -> None:
-        self._Execute(args[0])
+        # _Execute may return an exit code, None means success.
+        self.ExitCode = self._Execute(args[0]) or 0
     
     def _Execute(self, args):
         pass
@@ -183,19 +2717,24 @@ class Command(ABC):
 
 #region Objects
 perforceHandler = PerforceHandler()
+projectContext = None
+# Per thread state of a running job, eg. pipeline step. LogPrefix is prepended to process output started from the thread.
+jobContext = threading.local()
+# Process name -> running processes, found once per run. See FindProcesses.
+processCache = {}
 #endregion Objects
 
 #region Functions 
 
-def HandleCommand(Arguments, LiveLog=False):
+def HandleCommand(Arguments, LiveLog=False, Input=None, Timeout=10):
     OK = True
     Response = None
 
     try:
         if LiveLog:
-            OK = not subprocess.Popen(Arguments).wait()
+            OK = RunProcess(Arguments).OK
         else:
-            Response = subprocess.run(Arguments, capture_output=True, timeout=10)
+            Response = subprocess.run(Arguments, input=Input, capture_output=True, timeout=Timeout)
             if Response.returncode != 0:
                 logging.getLogger().error(Response.stderr)
                 OK = False
@@ -204,52 +2743,160 @@ def HandleCommand(Arguments, LiveLog=False):
         raise RuntimeError(f"command {e.cmd} return with error (code {e.returncode}): {e.output}")
     except subprocess.TimeoutExpired as e:
         logging.getLogger().error(f"Command {Arguments} timeout expired.")
+        OK = False
 
     return Response, OK
 
+def KillProcessTree(Process):
+    try:
+        if platform.uname().system == "Windows":
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(Process.pid)], capture_output=True)
+        else:
+            os.killpg(Process.pid, signal.SIGKILL)
+    except OSError:
+        Process.kill()
+
+# Runs a process and tees its output line by line to the console and UEDT.log.
+# stdout and stderr are read concurrently on reader threads, only the last Config.ProcessTailLines lines are kept in memory.
+# Timeouts are looked up in Config.CommandTimeouts by Name, on expiry the whole process tree is killed.
+# The process tree is killed as well when the cancel event of the job, see TaskScheduler.RunTask, gets set.
+# OnLine - optional callable receiving every output line, calls are serialized.
+# LogPrefix - prepended to lines written to console and UEDT.log, tells apart output of concurrent processes.
+def RunProcess(Args, Name=None, OnLine=None, LogPrefix="", **kwargs):
+    LogPrefix = getattr(jobContext, "LogPrefix", "") + LogPrefix
+    Cancel = getattr(jobContext, "Cancel", None)
+    IdleTimeout, TotalTimeout = c.CommandTimeouts.get(Name, (0, 0))
+    Logger = logging.getLogger("UEDT.Process")
+    Tail = deque(maxlen=c.ProcessTailLines)
+    LineLock = threading.Lock()
+    Start = time.monotonic()
+    LastOutput = [Start]
+
+    if platform.uname().system != "Windows":
+        kwargs.setdefault("start_new_session", True) # Own process group, so the tree can be killed on timeout.
+
+    try:
+        Process = subprocess.Popen([str(x) for x in Args], stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+    except OSError as e:
+        logging.getLogger().error(f"Cannot start {Args[0]}. {e}")
+        return ProcessResult(-1, [])
+
+    def Read(Stream, Log):
+        for Line in iter(Stream.readline, b''):
+            Line = Line.decode("utf-8", errors="replace").rstrip("\r\n")
+            with LineLock:
+                LastOutput[0] = time.monotonic()
+                Tail.append(Line)
+                Log(LogPrefix + Line)
+                if OnLine is not None:
+                    OnLine(Line)
+
+    Readers = [threading.Thread(target=Read, args=(Process.stdout, Logger.info), daemon=True), threading.Thread(target=Read, args=(Process.stderr, Logger.warning), daemon=True)]
+    for Reader in Readers:
+        Reader.start()
+
+    TimedOut = None
+    TimedOutAt = None
+    try:
+        for Reader in Readers:
+            while Reader.is_alive():
+                Now = time.monotonic()
+                if TimedOut is None and TotalTimeout > 0 and Now - Start >= TotalTimeout:
+                    TimedOut = "total"
+                elif TimedOut is None and IdleTimeout > 0 and Now - LastOutput[0] >= IdleTimeout:
+                    TimedOut = "idle"
+                elif TimedOut is None and Cancel is not None and Cancel.is_set():
+                    TimedOut = "cancel"
+                elif TimedOut is not None and Now - TimedOutAt > 5.0:
+                    break # Pipes held open by orphaned children, stop waiting for them.
+                else:
+                    Reader.join(0.5 if Cancel is not None else 1.0 if IdleTimeout > 0 or TotalTimeout > 0 or TimedOut is not None else None)
+                    continue
+
+                TimedOutAt = Now
+                if TimedOut == "cancel":
+                    logging.getLogger().error(f"{Name or Args[0]} cancelled. Killing process.")
+                else:
+                    logging.getLogger().error(f"{Name or Args[0]} {TimedOut} timeout expired. Killing process.")
+                KillProcessTree(Process)
+    except KeyboardInterrupt:
+        KillProcessTree(Process)
+        raise
+
+    Result = ProcessResult(Process.wait(), list(Tail), TimedOut, time.monotonic() - Start)
+
+    if not Result.OK:
+        logging.getLogger().error(f"{Name or Args[0]} failed with code {Result.ReturnCode}. Last {len(Result.Tail)} lines:\n" + "\n".join(Result.Tail))
+
+    return Result
+
+def GetProjectContext():
+    global projectContext
+    if projectContext is None:
+        projectContext = ProjectContext.Resolve(GetProjectDir())
+    return projectContext
+
+def ResetProjectContext():
+    global projectContext
+    projectContext = None
+
+# Only the top level of the project dir is checked, 'uproject' file is always placed there.
+def FindUProjectFile(ProjectDir):
+    with os.scandir(ProjectDir) as it:
+        Found = sorted(entry.name for entry in it if entry.name.endswith(".uproject") and entry.is_file())
+
+    if len(Found) > 0:
+        return Path(ProjectDir) / Found[0]
+    return None
+
 # Returns full path to the project's 'uproject' file.
 # Eg. C:/Project/Project.uproject
 def GetUProjectPath():
-    for root, dirs, files in os.walk(GetProjectDir()):
-        for file in files:
-            if file.endswith(".uproject"):
-                return Path(os.path.join(root, file))
+    return GetProjectContext().UProjectPath
 
 def GetProjectDir():
     return Path(os.path.dirname(os.path.realpath(__file__)))
 
+def GetUEDTCacheDir(ProjectDir=None):
+    return Path(ProjectDir or GetProjectDir()) / "Saved" / "UEDT"
+
 def GetProjectFileName():
-    return str(GetUProjectPath()).split(os.sep)[-1]
+    return GetProjectContext().ProjectFileName
 
 def GetProjectName():
-    return GetProjectFileName().split(".")[0]
+    return GetProjectContext().ProjectName
 
 def GetUATPath():
     return Path(GetAssociatedEngineDir()) / 'Engine/Build/BatchFiles/RunUAT.bat'
 
-def GetUProjectFileData():
-    import json
-    
-    with open(GetUProjectPath(), 'r') as f:
+def ReadUProjectFile(UProjectPath):
+    with open(UProjectPath, 'r') as f:
         try:
             json_object = json.loads(f.read())
             return json_object
         except ValueError as e:
-            logging.getLogger().error(f"Cannot parse {GetUProjectPath()} file. {e}")
+            logging.getLogger().error(f"Cannot parse {UProjectPath} file. {e}")
             sys.exit(1)
+
+def GetUProjectFileData():
+    return ReadUProjectFile(GetUProjectPath())
     
 # [TestRequired]
 def GetAssociatedEngineDir():
-    data = GetUProjectFileData()
+    return GetProjectContext().EngineDir
+
+def ResolveEngineDir(EngineAssociation):
     path = []
     
     # Distinguish source and launcher engine association.
-    if data['EngineAssociation'].startswith('{'):
-        path = GetRegistryData(f"HKCU:Software/Epic Games/Unreal Engine/Builds/{data['EngineAssociation']}")
+    if EngineAssociation.startswith('{'):
+        path = GetRegistryData(f"HKCU:Software/Epic Games/Unreal Engine/Builds/{EngineAssociation}")
     else:
-        path = GetRegistryData(f"HKLM:SOFTWARE/EpicGames/Unreal Engine/{data['EngineAssociation']}/InstalledDirectory")
+        path = GetRegistryData(f"HKLM:SOFTWARE/EpicGames/Unreal Engine/{EngineAssociation}/InstalledDirectory")
         
-    #path = Path(GetRegistryData(f"HKLM:SOFTWARE/EpicGames/Unreal Engine/{data['EngineAssociation']}/InstalledDirectory")[0])
+    if path is None or len(path) < 1:
+        logging.getLogger().error(f"Cannot find engine associated with \"{EngineAssociation}\". Set Config.EngineDir to override.")
+        sys.exit(1)
     
     return Path(path[0])
 
@@ -316,25 +2963,786 @@ def RemoveFile(path):
 def RmTreeHandleError(func, path, exc_info):
     print("Cannot remove files from path " + str(path))
 
+# Staged build of a configuration, BuildStagingDir / ProjectName / ConfigurationName
+def GetBuildStagingDir(BuildConfiguration):
+    return Path(c.BuildStagingDir) / GetProjectName() / BuildConfiguration
+
+# Report is written next to the staged build, so it survives restaging.
+def GetBuildReportPath(BuildConfiguration):
+    return Path(c.BuildStagingDir) / GetProjectName() / f"{BuildConfiguration}.BuildReport.json"
+
+# Returns processes running on the machine. Uses psutil when available, /proc otherwise.
+def ReadProcessTable():
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    Processes = []
+    if psutil is not None:
+        for proc in psutil.process_iter(['pid', 'ppid', 'name', 'memory_info', 'cpu_times']):
+            Info = proc.info
+            Memory, Times = Info.get('memory_info'), Info.get('cpu_times')
+            Processes.append(ProcessInfo(Info['pid'], Info['ppid'], Info['name'], Memory.rss if Memory else 0, (Times.user + Times.system) if Times else 0.0))
+        return Processes
+
+    if not os.path.isdir("/proc"):
+        return Processes
+
+    PageSize = os.sysconf("SC_PAGE_SIZE")
+    ClockTicks = os.sysconf("SC_CLK_TCK")
+    for Entry in os.listdir("/proc"):
+        if not Entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{Entry}/stat", 'rb') as f:
+                Data = f.read().decode(errors="replace")
+        except OSError:
+            continue # Process exited while listing.
+
+        # "pid (comm) state ppid ..." - comm may contain spaces and parentheses.
+        Name = Data[Data.find("(") + 1:Data.rfind(")")]
+        Fields = Data[Data.rfind(")") + 2:].split()
+        Processes.append(ProcessInfo(int(Entry), int(Fields[1]), Name, int(Fields[21]) * PageSize, (int(Fields[11]) + int(Fields[12])) / ClockTicks))
+
+    return Processes
+
+# Returns all descendants of a process.
+def GetProcessTree(RootPid):
+    Children = {}
+    for Info in ReadProcessTable():
+        Children.setdefault(Info.PPid, []).append(Info)
+
+    Tree = []
+    Stack = [RootPid]
+    while Stack:
+        for Info in Children.get(Stack.pop(), []):
+            Tree.append(Info)
+            Stack.append(Info.Pid)
+    return Tree
+
+# Linear interpolation between closest ranks, Percent in <0, 100>.
+def Percentile(Values, Percent):
+    Values = sorted(Values)
+    if len(Values) == 0:
+        return None
+    Rank = (len(Values) - 1) * Percent / 100.0
+    Lower = int(Rank)
+    Upper = min(Lower + 1, len(Values) - 1)
+    return Values[Lower] + (Values[Upper] - Values[Lower]) * (Rank - Lower)
+
+# Regularized incomplete beta function I_x(a, b), continued fraction evaluated with the modified Lentz method.
+def IncompleteBeta(a, b, x):
+    import math
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    # Continued fraction converges fast for x < (a + 1) / (a + b + 2), symmetry is used otherwise.
+    if x > (a + 1.0) / (a + b + 2.0):
+        return 1.0 - IncompleteBeta(b, a, 1.0 - x)
+
+    Front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1.0 - x)) / a
+    Tiny = 1e-300
+    f, C, D = 1.0, 1.0, 0.0
+    for i in range(400):
+        m = i // 2
+        if i == 0:
+            Numerator = 1.0
+        elif i % 2 == 0:
+            Numerator = (m * (b - m) * x) / ((a + 2.0 * m - 1.0) * (a + 2.0 * m))
+        else:
+            Numerator = -((a + m) * (a + b + m) * x) / ((a + 2.0 * m) * (a + 2.0 * m + 1.0))
+        D = 1.0 + Numerator * D
+        D = 1.0 / (D if abs(D) > Tiny else Tiny)
+        C = 1.0 + Numerator / C
+        C = C if abs(C) > Tiny else Tiny
+        f *= C * D
+        if abs(1.0 - C * D) < 1e-12:
+            break
+    return Front * (f - 1.0)
+
+def StudentTCdf(t, DegreesOfFreedom):
+    Tail = 0.5 * IncompleteBeta(DegreesOfFreedom / 2.0, 0.5, DegreesOfFreedom / (DegreesOfFreedom + t * t))
+    return 1.0 - Tail if t > 0 else Tail
+
+# @ret - t such that StudentTCdf(t) == Probability, found by bisection.
+def StudentTQuantile(Probability, DegreesOfFreedom):
+    Low, High = -1e3, 1e3
+    for _ in range(200):
+        Middle = (Low + High) / 2.0
+        if StudentTCdf(Middle, DegreesOfFreedom) < Probability:
+            Low = Middle
+        else:
+            High = Middle
+    return (Low + High) / 2.0
+
+# @ret - (mean, half width of the confidence interval of the mean), half width is None for less than 2 values.
+def GetConfidenceInterval(Values, Confidence):
+    import statistics
+    Mean = statistics.fmean(Values)
+    if len(Values) < 2:
+        return Mean, None
+    return Mean, StudentTQuantile(0.5 + Confidence / 2.0, len(Values) - 1) * statistics.stdev(Values) / len(Values) ** 0.5
+
+# Welch's t-test of the hypothesis that New has a greater mean than Base.
+# @ret - one sided p-value, None for less than 2 values in either group.
+def WelchTestGreater(Base, New):
+    import statistics
+    if len(Base) < 2 or len(New) < 2:
+        return None
+    BaseError = statistics.variance(Base) / len(Base)
+    NewError = statistics.variance(New) / len(New)
+    if BaseError + NewError == 0:
+        return 0.0 if statistics.fmean(New) > statistics.fmean(Base) else 1.0
+    t = (statistics.fmean(New) - statistics.fmean(Base)) / (BaseError + NewError) ** 0.5
+    DegreesOfFreedom = (BaseError + NewError) ** 2 / (BaseError ** 2 / (len(Base) - 1) + NewError ** 2 / (len(New) - 1))
+    return 1.0 - StudentTCdf(t, DegreesOfFreedom)
+
+def FormatBytes(Bytes):
+    for Unit in ("B", "KB", "MB", "GB"):
+        if abs(Bytes) < 1024:
+            return f"{Bytes:.1f} {Unit}" if Unit != "B" else f"{Bytes} B"
+        Bytes /= 1024
+    return f"{Bytes:.1f} TB"
+
+def FormatSeconds(Seconds):
+    if Seconds is None:
+        return "n/a"
+    if Seconds >= 60:
+        return f"{int(Seconds // 60)}m{Seconds % 60:04.1f}s"
+    return f"{Seconds:.2f}s"
+
+# Fingerprints of build inputs of the staged build, next to the staged build so any machine can check it.
+def GetBuildManifestPath(BuildConfiguration):
+    return Path(c.BuildStagingDir) / GetProjectName() / f"{BuildConfiguration}.BuildManifest.json"
+
+# @ret - Memory available to new processes in MB, None if unknown.
+def GetAvailableMemoryMB():
+    try:
+        import psutil
+        return psutil.virtual_memory().available // 2**20
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/meminfo", 'r') as f:
+            for Line in f:
+                if Line.startswith("MemAvailable:"):
+                    return int(Line.split()[1]) // 1024
+    except OSError:
+        pass
+
+    if platform.uname().system == "Windows":
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong), ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong), ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong), ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        Status = MEMORYSTATUSEX()
+        Status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(Status)):
+            return Status.ullAvailPhys // 2**20
+
+    return None
+
+def GetJobCount(Jobs=0):
+    return int(Jobs) if Jobs and int(Jobs) > 0 else (os.cpu_count() or 4)
+
+def ForceRemoveFile(path):
+    try:
+        os.unlink(path)
+    except PermissionError:
+        # Read-only files (eg. checked in binaries) cannot be removed on Windows.
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        os.unlink(path)
+
+def IsLinkEntry(entry):
+    if entry.is_symlink():
+        return True
+    # Junctions are not reported as symlinks on Windows, never descend into them.
+    Attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+    return bool(Attributes & getattr(stat, "FILE_ATTRIBUTE_REPARSE_POINT", 0))
+
+# Removes files of a single directory, returns its subdirectories for further processing.
+def RemoveDirFiles(path):
+    Stats = RemovalStats()
+    SubDirs = []
+
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    IsDir = entry.is_dir(follow_symlinks=False)
+                    if IsDir and not IsLinkEntry(entry):
+                        SubDirs.append(entry.path)
+                        continue
+
+                    if IsDir:
+                        os.rmdir(entry.path) # Directory link, remove the link only.
+                    else:
+                        Stats.Bytes += entry.stat(follow_symlinks=False).st_size
+                        ForceRemoveFile(entry.path)
+                    Stats.Files += 1
+                except OSError as e:
+                    logging.getLogger().error(f"Cannot remove {entry.path}. {e}")
+                    Stats.Errors += 1
+    except OSError as e:
+        logging.getLogger().error(f"Cannot scan {path}. {e}")
+        Stats.Errors += 1
+
+    return SubDirs, Stats
+
+# Walks trees with 'os.scandir' and unlinks files on a thread pool. Directories are removed afterwards, deepest first.
+def RemoveTreesParallel(Paths, Jobs=0):
+    Stats = RemovalStats()
+    Start = time.perf_counter()
+    Dirs = [str(x) for x in Paths]
+
+    with ThreadPoolExecutor(max_workers=GetJobCount(Jobs)) as Executor:
+        Pending = {Executor.submit(RemoveDirFiles, x) for x in Dirs}
+        while Pending:
+            Done, Pending = wait(Pending, return_when=FIRST_COMPLETED)
+            for Future in Done:
+                SubDirs, DirStats = Future.result()
+                Stats.Add(DirStats)
+                Dirs += SubDirs
+                Pending |= {Executor.submit(RemoveDirFiles, x) for x in SubDirs}
+
+    for path in sorted(Dirs, key=lambda x: x.count(os.sep), reverse=True):
+        try:
+            os.rmdir(path)
+            Stats.Dirs += 1
+        except OSError as e:
+            logging.getLogger().error(f"Cannot remove {path}. {e}")
+            Stats.Errors += 1
+
+    Stats.Seconds = time.perf_counter() - Start
+    return Stats
+
+def HashFile(path, ChunkSize=1024 * 1024):
+    Hash = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for Chunk in iter(lambda: f.read(ChunkSize), b''):
+            Hash.update(Chunk)
+    return Hash.hexdigest()
+
+# Lists files under Roots and hashes them on a thread pool.
+# Files with size and mtime unchanged since Previous reuse the previous hash without reading the file.
+# @ret - Relative path (with '/' separators) -> [Size, MTime, Hash]
+def HashFiles(BaseDir, Roots, Previous=None, SkipDirs=(), Jobs=0):
+    Previous = Previous or {}
+    BaseDir = str(BaseDir)
+    Files = {}
+    ToHash = []
+
+    Stack = [str(x) for x in Roots if os.path.isdir(x)]
+    Files.update({Path(x).relative_to(BaseDir).as_posix(): None for x in Roots if os.path.isfile(x)})
+    while Stack:
+        with os.scandir(Stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SkipDirs:
+                        Stack.append(entry.path)
+                elif entry.is_file():
+                    Files[os.path.relpath(entry.path, BaseDir).replace(os.sep, "/")] = entry
+
+    for RelPath, entry in Files.items():
+        Stat = entry.stat() if entry is not None else os.stat(os.path.join(BaseDir, RelPath))
+        Old = Previous.get(RelPath)
+        if Old is not None and Old[0] == Stat.st_size and Old[1] == Stat.st_mtime_ns:
+            Files[RelPath] = Old
+        else:
+            Files[RelPath] = [Stat.st_size, Stat.st_mtime_ns, None]
+            ToHash.append(RelPath)
+
+    with ThreadPoolExecutor(max_workers=GetJobCount(Jobs)) as Executor:
+        for RelPath, Hash in zip(ToHash, Executor.map(lambda x: HashFile(os.path.join(BaseDir, x)), ToHash)):
+            Files[RelPath][2] = Hash
+
+    return Files
+
+# Project Content and Content folders of project plugins.
+def GetContentRoots(ProjectDir=None):
+    ProjectDir = Path(ProjectDir or GetProjectDir())
+    return [ProjectDir / "Content"] + [Path(x) / "Content" for x in glob.glob(str(ProjectDir) + "/Plugins/*")]
+
+# Package name of an asset file relative to the project dir, eg. "Content/Maps/Main.umap" -> "/Game/Maps/Main",
+# "Plugins/Tools/Content/Icon.uasset" -> "/Tools/Icon". None for files that are not packages.
+def GetPackageName(RelPath):
+    Parts = Path(RelPath).with_suffix("").parts
+    if Path(RelPath).suffix.lower() not in (".uasset", ".umap"):
+        return None
+    if len(Parts) > 1 and Parts[0] == "Content":
+        return "/Game/" + "/".join(Parts[1:])
+    if len(Parts) > 3 and Parts[0] == "Plugins" and Parts[2] == "Content":
+        return f"/{Parts[1]}/" + "/".join(Parts[3:])
+    return None
+
+# Single hash of a set of files, independent of mtimes, so it can be compared across machines.
+def GetFingerprint(Files, Extra=""):
+    Hash = hashlib.blake2b(Extra.encode(), digest_size=20)
+    for RelPath in sorted(Files.keys()):
+        Hash.update(f"{RelPath}\0{Files[RelPath][2]}\n".encode())
+    return Hash.hexdigest()
+
+def GetTrashDir(ProjectDir=None):
+    return Path(ProjectDir or GetProjectDir()) / ".uedt-trash"
+
+# Renames paths into a new trash batch dir. Rename within the same volume is atomic and instant.
+# Returns batch dir and paths that could not be moved (eg. locked by another process).
+def MoveToTrash(Paths, ProjectDir=None):
+    BatchDir = GetTrashDir(ProjectDir) / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    BatchDir.mkdir(parents=True, exist_ok=True)
+
+    NotMoved = []
+    for Index, path in enumerate(Paths):
+        try:
+            os.rename(path, BatchDir / f"{Index}-{Path(path).name}")
+        except OSError as e:
+            logging.getLogger().info(f"Cannot move {path} to trash. {e}")
+            NotMoved.append(path)
+
+    return BatchDir, NotMoved
+
+# Splits items into Count groups with similar total weight. Heaviest items are assigned first, each to the lightest group.
+# @ret - list of (total weight, items).
+def SplitIntoShards(Items, Weights, Count):
+    Shards = [[0.0, []] for _ in range(max(1, min(Count, len(Items))))]
+    for Item in sorted(Items, key=lambda x: Weights[x], reverse=True):
+        Shard = min(Shards, key=lambda x: x[0])
+        Shard[0] += Weights[Item]
+        Shard[1].append(Item)
+    return [tuple(x) for x in Shards]
+
+def GetCookTimesPath():
+    return GetUEDTCacheDir() / "CookTimes.json"
+
+def GetCookedDir():
+    return GetProjectDir() / "Saved" / "Cooked" / c.CookPlatform
+
+def IsBuildWideCookFile(RelativePath):
+    RelativePath = RelativePath.replace(os.sep, "/")
+    return any(fnmatch.fnmatch(RelativePath, x) for x in c.CookBuildWideFiles)
+
+# Copies files of shard outputs into the cooked tree. Cooks write into the cooked tree in place, so it never shares files
+# with shard outputs. Files already copied by an earlier merge (same size and modification time) are skipped.
+# Files cooked by several shards (shared dependencies, maps cooked by a different shard before) are taken from the newest cook.
+# Build-wide files (Config.CookBuildWideFiles) are merged only when all shards wrote the same content, otherwise they are left out
+# as conflicts and have to be written by a cook of all maps. Strict - nothing is merged when there are conflicts.
+# @ret - (cooked files, updated files, files cooked by more than one shard, conflicting build-wide files)
+def MergeCookedShards(ShardDirs, CookedDir, Strict=True):
+    Newest = {}
+    BuildWide = {}
+    Duplicates = 0
+    for ShardDir in ShardDirs:
+        for Root, Dirs, Files in os.walk(ShardDir):
+            for FileName in Files:
+                Source = os.path.join(Root, FileName)
+                RelativePath = os.path.relpath(Source, ShardDir)
+                if IsBuildWideCookFile(RelativePath):
+                    BuildWide.setdefault(RelativePath, []).append(Source)
+                    continue
+                MTime = os.stat(Source).st_mtime_ns
+                if RelativePath in Newest:
+                    Duplicates += 1
+                    if Newest[RelativePath][0] >= MTime:
+                        continue
+                Newest[RelativePath] = (MTime, Source)
+
+    Conflicts = []
+    for RelativePath, Sources in BuildWide.items():
+        if len(Sources) == len(ShardDirs) and len(set(HashFile(x) for x in Sources)) == 1:
+            Newest[RelativePath] = (0, Sources[0])
+        else:
+            Conflicts.append(RelativePath)
+    Conflicts.sort()
+
+    if Strict and len(Conflicts) > 0:
+        return 0, 0, Duplicates, Conflicts
+
+    Updated = 0
+    for RelativePath, (MTime, Source) in Newest.items():
+        Target = os.path.join(CookedDir, RelativePath)
+        try:
+            SourceStat = os.stat(Source)
+            TargetStat = os.stat(Target)
+            if not os.path.samestat(SourceStat, TargetStat) and SourceStat.st_size == TargetStat.st_size and SourceStat.st_mtime_ns == TargetStat.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(Target), exist_ok=True)
+        # Replaced rather than written in place, breaks links left by merges of earlier versions.
+        shutil.copy2(Source, Target + ".uedt-tmp")
+        os.replace(Target + ".uedt-tmp", Target)
+        Updated += 1
+
+    # Conflicting files linked by merges of earlier versions are replaced by copies, so the cook writing them does not change shard outputs.
+    for RelativePath in Conflicts:
+        Target = os.path.join(CookedDir, RelativePath)
+        try:
+            if os.stat(Target).st_nlink > 1:
+                shutil.copy2(Target, Target + ".uedt-tmp")
+                os.replace(Target + ".uedt-tmp", Target)
+        except FileNotFoundError:
+            pass
+    return len(Newest), Updated, Duplicates, Conflicts
+
+# Cook commandlet arguments equivalent to the cook step of BuildCookRun for a build configuration.
+# Maps - maps to cook, Config.Maps by default. OutputDir - cooked output, Saved/Cooked/<CookPlatform> by default.
+def GetCookArgs(BuildConfiguration=None, Iterative=True, Maps=None, OutputDir=None):
+    Args = [
+        f"{str(Path(GetAssociatedEngineDir()) / 'Engine/Binaries/Win64/UnrealEditor-Cmd.exe')}",
+        f"{str(Path(GetUProjectPath()))}",
+        "-run=cook",
+        f"-targetplatform={c.CookPlatform}",
+        f"-map={'+'.join(Maps if Maps is not None else c.Maps)}",
+        (f"-OutputDir={str(OutputDir)}" if OutputDir is not None else ""),
+        "-unattended",
+        "-unversioned",
+        "-compressed",
+        "-ini:Game[/Script/UnrealEd.ProjectPackagingSettings]:BlueprintNativizationMethod=Disabled",
+        ("-skipeditorcontent" if BuildConfiguration == "Release" else ""),
+        ("-iterate" if Iterative else ""),
+    ]
+    return [x for x in Args if x]
+
+# Cooks Config.Maps in Shards cook commandlets running side by side, each into its own output folder, then merges the outputs
+# into Saved/Cooked/<CookPlatform>. Shard outputs are kept, so the next iterative cook of a shard only recooks what changed.
+# Map cook times are measured per shard and stored in Saved/UEDT/CookTimes.json to balance the next split.
+# Build-wide files that differ between shards are written by a final iterative cook of all maps, see Config.CookShardFinalPass.
+# @ret - exit code.
+# BuildConfiguration - shards cook with the same arguments as the cook of this configuration, see GetCookArgs.
+# OnLine - called with output lines of all shards, one line at a time.
+def CookSharded(Shards, BuildConfiguration=None, Iterative=True, ExtraArgs=(), OnLine=None):
+    if len(c.Maps) == 0:
+        logging.getLogger().error("Sharded cook splits Config.Maps between workers, Config.Maps is empty.")
+        return 1
+
+    TimesPath = GetCookTimesPath()
+    try:
+        with open(TimesPath, 'r', encoding='utf-8') as File:
+            Times = json.load(File)
+    except (OSError, ValueError):
+        Times = {}
+
+    # Maps never cooked before are assumed to take as long as a typical known map.
+    Known = [Times[x] for x in c.Maps if x in Times]
+    Default = Percentile(Known, 50) if len(Known) > 0 else 1.0
+    Weights = {x: Times.get(x, Default) for x in c.Maps}
+
+    ShardRoot = GetUEDTCacheDir() / "CookShards"
+    OnLineLock = threading.Lock()
+    def OnShardLine(Line):
+        if OnLine is not None:
+            with OnLineLock:
+                OnLine(Line)
+
+    Scheduler = TaskScheduler(Shards, FailFast=False)
+    Split = SplitIntoShards(c.Maps, Weights, Shards)
+    if len(Split) > 1 and not c.CookShardFinalPass and len(c.CookBuildWideFiles) > 0:
+        logging.getLogger().warning("Shards write their own build-wide files (asset registries), the merge fails unless they match. See Config.CookShardFinalPass.")
+
+    for Index, (Estimate, Maps) in enumerate(Split):
+        OutputDir = ShardRoot / f"Shard{Index}" / c.CookPlatform
+        Args = GetCookArgs(BuildConfiguration, Iterative, Maps, OutputDir) + list(ExtraArgs)
+        logging.getLogger().info(f"Cook shard {Index} (estimated {FormatSeconds(Estimate)}) : {', '.join(Maps)}")
+
+        Prefix = f"[cook shard {Index}] "
+        Scheduler.Add(Task(f"cook shard {Index}", lambda Args=Args, Prefix=Prefix: RunProcess(Args, "cook", OnLine=OnShardLine, LogPrefix=Prefix).ReturnCode,
+            MemoryMB=c.BuildStepResources["cook"][1]))
+
+    Scheduler.Run()
+
+    # Shard time is attributed to its maps proportionally to their previous estimates.
+    for Index, (Estimate, Maps) in enumerate(Split):
+        Item = Scheduler.Tasks[f"cook shard {Index}"]
+        if Item.State != "done":
+            continue
+        for Map in Maps:
+            Measured = Item.Seconds * Weights[Map] / Estimate if Estimate > 0 else Item.Seconds / len(Maps)
+            Times[Map] = round(Measured if Map not in Times else 0.5 * Times[Map] + 0.5 * Measured, 3)
+
+    TimesPath.parent.mkdir(parents=True, exist_ok=True)
+    with open(TimesPath, 'w', encoding='utf-8') as File:
+        json.dump(Times, File, indent=4)
+
+    for Index in range(len(Split)):
+        Item = Scheduler.Tasks[f"cook shard {Index}"]
+        logging.getLogger().info(f"Cook shard {Index} {Item.State} in {FormatSeconds(Item.Seconds)}")
+
+    Failed = [x for x in Scheduler.Tasks.values() if x.State != "done"]
+    if len(Failed) > 0:
+        return Failed[0].ExitCode or 1
+
+    # Folders of shards from earlier runs with more shards hold maps cooked by the current shards, they are not merged.
+    CookedDir = GetCookedDir()
+    ShardDirs = [str(ShardRoot / f"Shard{Index}" / c.CookPlatform) for Index in range(len(Split))]
+    Files, Updated, Duplicates, Conflicts = MergeCookedShards(ShardDirs, str(CookedDir), Strict=not c.CookShardFinalPass)
+    if len(Conflicts) > 0 and not c.CookShardFinalPass:
+        logging.getLogger().error(f"Shards wrote different build-wide files, cannot merge them into {CookedDir} : {', '.join(Conflicts)}. "
+            "Enable Config.CookShardFinalPass to write them with a cook of all maps, or cook without shards.")
+        return 1
+    logging.getLogger().info(f"Merged {Files} cooked files into {CookedDir} ({Updated} updated, {Duplicates} cooked by more than one shard).")
+
+    if len(Conflicts) > 0:
+        logging.getLogger().info(f"Cooking all maps into {CookedDir} to write {len(Conflicts)} build-wide files.")
+        Args = GetCookArgs(BuildConfiguration, True, c.Maps, CookedDir) + list(ExtraArgs)
+        ReturnCode = RunProcess(Args, "cook", OnLine=OnShardLine, LogPrefix="[cook final] ").ReturnCode
+        if ReturnCode != 0:
+            return ReturnCode
+
+    logging.getLogger().info(f"Cook total : {FormatSeconds(time.monotonic() - Scheduler.Start)}")
+    return 0
+
+# Removes hard links to the staging store from the staged build of a configuration before it is staged again, see StagingStore.Detach.
+# @ret - True when the staged build can be staged into.
+def DetachStagedBuild(Configuration):
+    StagedDir = GetBuildStagingDir(Configuration)
+    if not StagingStore.GetIndexPath(StagedDir).exists():
+        return True
+    Removed, Failed = StagingStore().Detach(StagedDir)
+    if Removed > 0:
+        logging.getLogger().info(f"Detached {Removed} files of {StagedDir} from the staging store.")
+    if len(Failed) > 0:
+        logging.getLogger().error(f"Cannot stage into {StagedDir}, {len(Failed)} files are still linked to the staging store.")
+    return len(Failed) == 0
+
+# Ingests staged builds of the given configurations into the staging store.
+def IngestStagedBuilds(Configurations, Jobs=0):
+    Store = StagingStore()
+    for Configuration in Configurations:
+        StagedDir = GetBuildStagingDir(Configuration)
+        if not StagedDir.is_dir():
+            logging.getLogger().error(f"Staged build {StagedDir} does not exist.")
+            continue
+        Start = time.monotonic()
+        Files, Linked, Saved = Store.Ingest(StagedDir, Jobs)
+        logging.getLogger().info(f"Stored {Configuration} : {Files} files, {Linked} linked to existing blobs, {FormatBytes(Saved)} deduplicated in {FormatSeconds(time.monotonic() - Start)}.")
+    return Store
+
+def GetDaemonSocketPath():
+    import tempfile
+    # Unix socket paths are limited to ~100 characters, the project path is hashed into a short name.
+    ProjectHash = hashlib.blake2b(str(GetProjectDir()).encode(), digest_size=8).hexdigest()
+    return Path(tempfile.gettempdir()) / f"uedt-{ProjectHash}.sock"
+
+# @ret - Response messages of the daemon, None if no daemon is listening.
+def SendDaemonRequest(Request, OnMessage=None, Timeout=None):
+    SocketPath = GetDaemonSocketPath()
+    if not hasattr(socket, "AF_UNIX") or not SocketPath.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as Client:
+            Client.settimeout(Timeout)
+            Client.connect(str(SocketPath))
+            Client.sendall((json.dumps(Request) + "\n").encode())
+            Messages = []
+            for Line in Client.makefile('rb'):
+                Message = json.loads(Line)
+                if OnMessage is not None:
+                    OnMessage(Message)
+                else:
+                    Messages.append(Message)
+            return Messages
+    except (OSError, ValueError):
+        return None
+
+def StartDaemon():
+    FireAndForgetProcess([sys.executable, os.path.realpath(__file__), "daemon", "run"])
+    Deadline = time.monotonic() + 10
+    while time.monotonic() < Deadline:
+        Status = SendDaemonRequest({"Control": "status"}, Timeout=1)
+        if Status:
+            return Status[0]
+        time.sleep(0.02)
+    return None
+
+# Thin client, sends the command line to a running daemon and prints its output.
+# @ret - Exit code of the command, None if the command has to be executed in this process.
+def RunDaemonClient(Argv):
+    if os.environ.get("UEDT_NO_DAEMON") or not hasattr(socket, "AF_UNIX"):
+        return None
+    if not GetDaemonSocketPath().exists():
+        if not c.DaemonAutoStart or StartDaemon() is None:
+            return None
+
+    Result = {}
+    def OnMessage(Message):
+        if "Output" in Message:
+            sys.stdout.write(Message["Output"])
+            sys.stdout.flush()
+        Result.update(Message)
+
+    try:
+        SendDaemonRequest({"Args": Argv, "Cwd": os.getcwd(), "Env": dict(os.environ)}, OnMessage)
+    except KeyboardInterrupt:
+        return 130 # Closed connection cancels the command in the daemon.
+
+    # Busy, restarting or unreachable daemon, the command runs locally. An accepted command is never run again.
+    if not Result.get("Accepted"):
+        return None
+    if "Exit" not in Result:
+        print("UEDT daemon closed the connection before the command finished.", file=sys.stderr)
+        return 1
+    return Result["Exit"]
+
+def CreateArgumentParser():
+    parser = argparse.ArgumentParser(description="Unreal Engine Development Tool")
+    subparsers = parser.add_subparsers(dest='command')
+
+    for command in commands:
+        command_paraser = subparsers.add_parser(command[0], help=command[2])
+        subcommands = command[3]
+        if len(subcommands) > 0:
+            for subcommand in subcommands:
+                command_paraser.add_argument(subcommand[0], help=subcommand[1], **(subcommand[2] if len(subcommand) > 2 else {}))
+
+    return parser
+
+# Executes parsed command line arguments and records the run.
+# @ret - Exit code.
+def ExecuteCommand(args):
+    CommandToExecute = None
+
+    for command in commands:
+        if args.command == command[0]:
+            CommandToExecute = command[1]
+            break
+
+    if CommandToExecute is None:
+        logging.getLogger().info(f'No such command "{args.command}"')
+        return 0
+
+    Recorder = None
+    if c.HistoryEnabled and args.command not in ("stats", "daemon"):
+        Recorder = RunRecorder(args.command, vars(args))
+        Recorder.Start()
+
+    ExitCode = 1
+    try:
+        ExitCode = CommandToExecute(vars(args)).ExitCode
+    except SystemExit as e:
+        ExitCode = e.code if isinstance(e.code, int) else 1
+    finally:
+        if Recorder is not None:
+            Recorder.Finish(ExitCode)
+
+    return ExitCode
+
+def GetCsvCaptureDir():
+    return GetProjectDir() / "Saved" / "Profiling" / "CSV"
+
+# @ret - CSV captures, oldest first.
+def GetCsvCaptures():
+    CaptureDir = GetCsvCaptureDir()
+    return sorted(CaptureDir.glob("*.csv"), key=lambda x: x.stat().st_mtime) if CaptureDir.is_dir() else []
+
+# Analyzes a capture (or loads a report written by a previous analysis), writes <capture>.report.json and prints it.
+# Baseline - capture or report to compare with.
+# @ret - report.
+def AnalyzeCsvCapture(CsvPath, Baseline=None):
+    def Load(ReportPath):
+        if str(ReportPath).endswith(".json"):
+            with open(ReportPath, 'r', encoding='utf-8') as File:
+                return json.load(File)
+        Start = time.monotonic()
+        Report = CsvCaptureAnalyzer().Analyze(ReportPath)
+        Report["Seconds"] = round(time.monotonic() - Start, 3)
+        with open(f"{ReportPath}.report.json", 'w', encoding='utf-8') as File:
+            json.dump(Report, File, indent=4)
+        return Report
+
+    Report = Load(CsvPath)
+    CsvCaptureAnalyzer.PrintReport(Report)
+    if "Seconds" in Report:
+        print(f"Analyzed in {FormatSeconds(Report['Seconds'])}, report {CsvPath}.report.json")
+    if Baseline is not None:
+        CsvCaptureAnalyzer.PrintComparison(Load(Baseline), Report)
+    return Report
+
 def GetUnrealInsightsPath():
     return GetAssociatedEngineBinariesDir() / "UnrealInsights.exe"
 
 def GetUnrealFrontEndPath():
     return GetAssociatedEngineBinariesDir() / "UnrealFrontend.exe"
 
-def IsProcessRunning(process_name):
+# Finds running processes by executable name, eg. "UnrealInsights.exe". Uses psutil when installed, reads /proc on Linux,
+# asks tasklist on Windows. Results are cached for the rest of the run, Refresh forces a new lookup.
+# @ret - list of ProcessInfo.
+def FindProcesses(Name, Refresh=False):
+    if not Refresh and Name in processCache:
+        return processCache[Name]
+
+    Found = []
     try:
         import psutil
     except ImportError:
-        logging.error("Required module \"psutil\" not found. Use \"pip install psutil\" or \"pip3 install psutil\"")
-        sys.exit(1)
-        
-    for proc in psutil.process_iter(['pid', 'name']):
-        if proc.info['name'] == process_name:
-            return True
-    
-    return False
+        psutil = None
+
+    if psutil is not None:
+        for proc in psutil.process_iter(['pid', 'ppid', 'name']):
+            if proc.info['name'] == Name:
+                Found.append(ProcessInfo(proc.info['pid'], proc.info['ppid'], Name))
+
+    elif os.path.isdir("/proc"):
+        # comm holds at most 15 characters of the name, cmdline is read only to confirm a candidate.
+        Comm = Name[:15]
+        for Entry in os.listdir("/proc"):
+            if not Entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{Entry}/comm", 'rb') as f:
+                    if f.read().decode(errors="replace").rstrip("\n") != Comm:
+                        continue
+                with open(f"/proc/{Entry}/cmdline", 'rb') as f:
+                    # Executable is the second argument when started through an interpreter or a loader.
+                    Executables = [os.path.basename(x.decode(errors="replace").replace("\\", "/")) for x in f.read().split(b"\0")[:2]]
+                with open(f"/proc/{Entry}/stat", 'rb') as f:
+                    Data = f.read()
+                if Data[Data.rfind(b")") + 2:Data.rfind(b")") + 3] == b"Z":
+                    continue # Exited, not reaped by its parent yet.
+            except OSError:
+                continue # Process exited while listing.
+            if len(Name) <= 15 or Name in Executables:
+                Found.append(ProcessInfo(int(Entry), None, Name))
+
+    elif platform.uname().system == "Windows":
+        Response, OK = HandleCommand(["tasklist", "/FI", f"IMAGENAME eq {Name}", "/FO", "CSV", "/NH"])
+        if OK:
+            for Line in Response.stdout.decode(errors="replace").splitlines():
+                Fields = [x.strip('"') for x in Line.split('","')]
+                if len(Fields) > 1 and Fields[0] == Name and Fields[1].isdigit():
+                    Found.append(ProcessInfo(int(Fields[1]), None, Name))
+
+    processCache[Name] = Found
+    return Found
+
+def IsProcessRunning(process_name):
+    return len(FindProcesses(process_name)) > 0
+
+# Waits until a TCP port accepts connections.
+# Process - optional Popen, waiting stops early when it exits.
+# @ret - True if the port is ready.
+def WaitForPort(Host, Port, Timeout, Process=None):
+    Deadline = time.monotonic() + Timeout
+    Delay = 0.02
+    while True:
+        try:
+            with socket.create_connection((Host, Port), timeout=max(0.05, min(1.0, Deadline - time.monotonic()))):
+                return True
+        except OSError:
+            pass
 
+        if Process is not None and Process.poll() is not None:
+            return False
+        if time.monotonic() + Delay > Deadline:
+            return False
+        time.sleep(Delay)
+        Delay = min(Delay * 2, 0.25)
+
+# Output of the process is discarded, nothing reads it once UEDT exits and a full pipe would block the process.
 def FireAndForgetProcess(Args):
     try:
         kwargs = {}
@@ -348,22 +3756,24 @@ def FireAndForgetProcess(Args):
         else:  # Python 3.2+ and Unix
             kwargs.update(start_new_session=True)
 
-        p = subprocess.Popen(Args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+        p = subprocess.Popen(Args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs)
         assert not p.poll()
         return p
     except Exception as e:
         logging.error(f"Cannot fire and forget process. {e} ({Args})")
         sys.exit(1)
         
+# @ret - Started process, None if UnrealInsights was already running.
 def LaunchUnrealInsights():
     if not IsProcessRunning("UnrealInsights.exe"):
-        FireAndForgetProcess([f"{GetUnrealInsightsPath()}"])
+        Process = FireAndForgetProcess([f"{GetUnrealInsightsPath()}"])
+        processCache["UnrealInsights.exe"] = [ProcessInfo(Process.pid, os.getpid(), "UnrealInsights.exe")]
         logging.info("Launching UnrealInsights...")
-        return True
+        return Process
     else:
         logging.info("UnrealInsights process detected. Skipping launching...")
         
-    return False
+    return None
 
 #endregion Functions
 
@@ -375,6 +3785,8 @@ def LaunchUnrealInsights():
 class Clean(Command):
     def _Execute(self, args):
         ProjectDir = GetProjectDir()
+        Mode = args.get("mode") or c.CleanMode
+        Jobs = args.get("jobs") or c.CleanJobs
         
         DirsToRemove = [
             "Binaries",
@@ -386,17 +3798,22 @@ class Clean(Command):
         
         PathsToRemove = [ProjectDir / x for x in DirsToRemove]
 
-        for path in PathsToRemove:
-            path = Path(path)
-            if os.path.exists(path):
-                RemoveDir(path)
-
         for mainPath in glob.glob(str(ProjectDir) + "/Plugins/*"):
-            for dirToRemove in DirsToRemove:
-                finalPath = Path(mainPath) / dirToRemove
-                if os.path.exists(finalPath):
-                    RemoveDir(finalPath)
-        
+            PathsToRemove += [Path(mainPath) / x for x in DirsToRemove]
+
+        PathsToRemove = [x for x in PathsToRemove if os.path.exists(x)]
+
+        if Mode == "trash":
+            Start = time.perf_counter()
+            BatchDir, PathsToRemove = MoveToTrash(PathsToRemove, ProjectDir)
+            print(f"Moved folders to {BatchDir} in {(time.perf_counter() - Start) * 1000:.0f} ms. Deleting in background, see UEDT.log for the report.")
+            FireAndForgetProcess([sys.executable, os.path.realpath(__file__), "emptyTrash", "--batch", BatchDir.name, "--jobs", str(GetJobCount(Jobs))])
+
+        if Mode == "serial":
+            for path in PathsToRemove:
+                RemoveDir(path)
+        elif len(PathsToRemove) > 0:
+            print(f"Clean: {RemoveTreesParallel(PathsToRemove, Jobs)}")
 
         for file in os.listdir(ProjectDir):
             if file.endswith(".sln"):
@@ -406,7 +3823,125 @@ class Clean(Command):
 
         print("Clean Up Ended.")
 
+class EmptyTrash(Command):
+    def _Execute(self, args):
+        TrashDir = GetTrashDir()
+        if not TrashDir.exists():
+            return
+
+        if args.get("batch") is not None:
+            Paths = [TrashDir / args.get("batch")]
+        else:
+            Paths = [TrashDir / x for x in os.listdir(TrashDir)]
+
+        Stats = RemoveTreesParallel([x for x in Paths if x.exists()], args.get("jobs") or c.CleanJobs)
+        logging.getLogger().info(f"Trash emptied: {Stats}")
+
+        try:
+            TrashDir.rmdir()
+        except OSError:
+            pass # Another batch is still being deleted.
+
+# Evicts least recently used files and directories of Config.PruneTrees until every tree fits its budget.
+class Prune(Command):
+    def _Execute(self, args):
+        ProjectDir = GetProjectDir()
+        Jobs = args.get("jobs") or c.PruneJobs
+        DryRun = args.get("dry_run")
+
+        Trees = {}
+        for Pattern, (Budget, Depth) in c.PruneTrees.items():
+            if args.get("tree") is not None and args.get("tree") != Pattern:
+                continue
+            Roots = [Path(x) for x in glob.glob(str(ProjectDir / Pattern)) if os.path.isdir(x)]
+            Budget = int(float(args.get("budget")) * 2**30) if args.get("budget") is not None else Budget
+            Trees[Pattern] = (Roots, Budget, Depth)
+
+        Index = UsageIndex()
+        if not args.get("rescan"):
+            Index.Load()
+        Start = time.perf_counter()
+        Listed = Index.Update([x for Roots, _, _ in Trees.values() for x in Roots], Jobs, Full=args.get("rescan"))
+        Index.Save()
+        logging.getLogger().info(f"Usage index : {len(Index.Dirs)} directories, {Listed} listed in {FormatSeconds(time.perf_counter() - Start)}.")
+
+        Files, Dirs, Freed = [], [], {}
+        for Pattern, (Roots, Budget, Depth) in Trees.items():
+            Entries = {}
+            for Root in Roots:
+                Entries.update(Index.GetEntries(Root, Depth))
+            Total = sum(x[0] for x in Entries.values())
+            Evicted = self.SelectEvicted(Entries, Total - Budget)
+            Freed.update(Evicted)
+
+            print(f"{Pattern} : {FormatBytes(Total)} in {len(Entries)} entries, budget {FormatBytes(Budget)}")
+            if len(Evicted) > 0:
+                Newest = time.strftime('%Y-%m-%d %H:%M', time.localtime(max(Entries[x][1] for x in Evicted) / 1e9))
+                print(f"    {'Would evict' if DryRun else 'Evicting'} {len(Evicted)} entries, {FormatBytes(sum(Evicted.values()))}, last used {Newest} or earlier")
+                for Entry in sorted(Evicted, key=lambda x: -Entries[x][0])[:int(args.get("top") if args.get("top") is not None else 10)] if DryRun else []:
+                    print(f"    {FormatBytes(Entries[Entry][0]):>10}  {time.strftime('%Y-%m-%d', time.localtime(Entries[Entry][1] / 1e9))}  {os.path.relpath(Entry, ProjectDir)}")
+            Dirs.extend(x for x in Evicted if Entries[x][2])
+            Files.extend(x for x in Evicted if not Entries[x][2])
+
+        if DryRun or len(Files) + len(Dirs) == 0:
+            return 0
+
+        Start = time.perf_counter()
+        Stats = RemoveTreesParallel(Dirs, Jobs) if len(Dirs) > 0 else RemovalStats()
+        with ThreadPoolExecutor(max_workers=GetJobCount(Jobs)) as Executor:
+            for FilePath, Error in zip(Files, Executor.map(self.RemoveFile, Files)):
+                if Error is None:
+                    Stats.Files += 1
+                    Stats.Bytes += Freed[FilePath]
+                else:
+                    logging.getLogger().error(f"Cannot remove {FilePath}. {Error}")
+                    Stats.Errors += 1
+        Stats.Seconds = time.perf_counter() - Start
+        logging.getLogger().info(f"Prune: {Stats}")
+        return 1 if Stats.Errors > 0 else 0
+
+    # Picks least recently used entries until Excess bytes are freed. Every entry is checked on disk first,
+    # entries used since the index was built are skipped.
+    # @ret - Entry path -> size
+    def SelectEvicted(self, Entries, Excess):
+        Evicted, Freed = {}, 0
+        for Entry in sorted(Entries, key=lambda x: Entries[x][1]):
+            if Freed >= Excess:
+                break
+            Size, LastUse = self.GetUsage(Entry, Entries[Entry][2])
+            if Size is None or LastUse > Entries[Entry][1]:
+                continue
+            Evicted[Entry] = Size
+            Freed += Size
+        return Evicted
+
+    # @ret - (size, last use) of a file or a directory tree, (None, None) when it does not exist.
+    def GetUsage(self, EntryPath, IsDir):
+        try:
+            if not IsDir:
+                Stat = os.stat(EntryPath)
+                return Stat.st_size, UsageIndex.GetLastUse(Stat)
+            Size, LastUse = 0, 0
+            for DirPath, _, FileNames in os.walk(EntryPath):
+                for Name in FileNames:
+                    Stat = os.stat(os.path.join(DirPath, Name), follow_symlinks=False)
+                    Size, LastUse = Size + Stat.st_size, max(LastUse, UsageIndex.GetLastUse(Stat))
+            return Size, LastUse
+        except OSError:
+            return None, None
+
+    def RemoveFile(self, FilePath):
+        try:
+            ForceRemoveFile(FilePath)
+        except OSError as e:
+            return e
+        return None
+
 class Build(Command):
+    ManifestVersion = 1
+    # Folders of plugins that are build outputs, not build inputs.
+    SkipDirs = {"Binaries", "Intermediate", "Saved", "DerivedDataCache"}
+
     def _Execute(self, args):
         
         BuildConfiguration = ""
@@ -417,16 +3952,182 @@ class Build(Command):
             BuildConfiguration = args.get("c")
         else:
             BuildConfiguration = c.BuildConfiguration
-        
-        ActualBuildConfiguration = BuildConfiguration
 
-        if ActualBuildConfiguration == "Release":
-            ActualBuildConfiguration = "Shipping"
+        Configurations = [x.strip() for x in BuildConfiguration.split(",") if x.strip()]
+        if len(Configurations) > 1:
+            return self.BuildConfigurations(Configurations, args.get("force"))
 
         logging.getLogger().info("--------------------------------")
         logging.getLogger().info(f"Build Configuration : {BuildConfiguration}")
         logging.getLogger().info("--------------------------------")
 
+        ManifestPath = GetBuildManifestPath(BuildConfiguration)
+        Manifest = self.LoadManifest(ManifestPath)
+        Inputs = self.GetInputs(Manifest)
+
+        Mode = "full" if args.get("force") else self.GetBuildMode(Manifest, Inputs, GetBuildStagingDir(BuildConfiguration))
+        if Mode == "uptodate":
+            logging.getLogger().info(f"Staged build {GetBuildStagingDir(BuildConfiguration)} is up to date. Use --force to rebuild.")
+            return 0
+
+        logging.getLogger().info(f"Build mode : {Mode}")
+
+        if not DetachStagedBuild(BuildConfiguration):
+            return 1
+
+        Analyzer = BuildLogAnalyzer(Live=True)
+        Shards = int(args.get("shards") or c.CookShards)
+        if Shards > 1:
+            # Compile, cook in shards, stage the merged cooked content.
+            ReturnCode = RunProcess(self.GetBuildArgs(BuildConfiguration, Mode, ["build"]), "build", OnLine=Analyzer.AnalyzeLine).ReturnCode
+            if ReturnCode == 0:
+                Analyzer.BeginPhase("cook")
+                ReturnCode = CookSharded(Shards, BuildConfiguration, Iterative=Mode == "content", OnLine=Analyzer.AnalyzeLine)
+                Analyzer.EndPhase()
+            if ReturnCode == 0:
+                ReturnCode = RunProcess(self.GetBuildArgs(BuildConfiguration, Mode, ["stage"]), "build", OnLine=Analyzer.AnalyzeLine).ReturnCode
+        else:
+            ReturnCode = RunProcess(self.GetBuildArgs(BuildConfiguration, Mode), "build", OnLine=Analyzer.AnalyzeLine).ReturnCode
+
+        Report = Analyzer.GetReport(ReturnCode, Project=GetProjectName(), Configuration=BuildConfiguration, Mode=Mode)
+        BuildLogAnalyzer.WriteReport(Report, GetBuildReportPath(BuildConfiguration))
+
+        if ReturnCode == 0:
+            self.SaveManifest(ManifestPath, BuildConfiguration, Inputs)
+            if c.StoreAutoIngest:
+                IngestStagedBuilds([BuildConfiguration])
+
+        return ReturnCode
+
+    # Builds several configurations at once. Every configuration is split into compile, cook and stage steps scheduled by TaskScheduler:
+    # - compile steps run UBT directly and share the UBT lock, cooks wait for the editor compile,
+    # - configurations with the same cooked content share a single cook commandlet, one cook runs at a time,
+    # - stage steps run once their compile and cook finished, next cook waits until they are done reading cooked content.
+    # AutomationTool refuses to run next to another instance of itself, so only stage steps use it, one at a time (UAT lock).
+    def BuildConfigurations(self, Configurations, Force=False):
+        logging.getLogger().info("--------------------------------")
+        logging.getLogger().info(f"Build Configurations : {', '.join(Configurations)}")
+        logging.getLogger().info("--------------------------------")
+
+        Manifests = {x: self.LoadManifest(GetBuildManifestPath(x)) for x in Configurations}
+        Inputs = self.GetInputs(next((x for x in Manifests.values() if x is not None), None))
+        Modes = {x: "full" if Force else self.GetBuildMode(Manifests[x], Inputs, GetBuildStagingDir(x)) for x in Configurations}
+
+        for Configuration in Configurations:
+            logging.getLogger().info(f"{Configuration} build mode : {Modes[Configuration]}")
+
+        # Release cooks without editor content, other configurations share cooked content.
+        Variants = {}
+        for Configuration in Configurations:
+            if Modes[Configuration] != "uptodate":
+                Variants.setdefault("Release" if Configuration == "Release" else "Default", []).append(Configuration)
+
+        Logs = {x: JobLog(GetUEDTCacheDir() / "Logs" / f"Build-{x}.log") for x in sum(Variants.values(), [])}
+        Analyzers = {}
+        Scheduler = TaskScheduler(c.BuildMaxJobs, FailFast=False)
+        PreviousStages = []
+
+        def MakeStep(Step, Configuration, Mode, Targets):
+            def Run():
+                Analyzer = Analyzers.setdefault((Step, Configuration), BuildLogAnalyzer(Live=True))
+                def OnLine(Line):
+                    Analyzer.AnalyzeLine(Line)
+                    for Target in Targets:
+                        Logs[Target].Write(Line)
+                if Step == "compile":
+                    Args = self.GetCompileArgs(Configuration)
+                elif Step == "cook":
+                    Args = GetCookArgs(Configuration, Iterative=Mode == "content")
+                else:
+                    if not DetachStagedBuild(Configuration):
+                        return 1
+                    Args = self.GetBuildArgs(Configuration, Mode, ["stage"])
+                return RunProcess(Args, "build", OnLine=OnLine, LogPrefix=f"[{Step} {Configuration}] ").ReturnCode
+            return Run
+
+        # The cook commandlet runs the editor, which has to be compiled first.
+        if len(Variants) > 0:
+            Cores, MemoryMB = c.BuildStepResources["compile"]
+            Logs["Editor"] = JobLog(GetUEDTCacheDir() / "Logs" / "Build-Editor.log")
+            Scheduler.Add(Task("compile Editor", MakeStep("compile", "Editor", "full", ["Editor"]), Locks=["ubt"], Cores=Cores, MemoryMB=MemoryMB))
+
+        for Variant, VariantConfigurations in Variants.items():
+            CookMode = "full" if any(Modes[x] == "full" for x in VariantConfigurations) else "content"
+            Cores, MemoryMB = c.BuildStepResources["cook"]
+            Cook = Scheduler.Add(Task(f"cook {Variant}", MakeStep("cook", VariantConfigurations[0], CookMode, VariantConfigurations),
+                Requires=["compile Editor"], After=PreviousStages, Locks=["cook-Win64"], Cores=Cores, MemoryMB=MemoryMB))
+
+            PreviousStages = []
+            for Configuration in VariantConfigurations:
+                Cores, MemoryMB = c.BuildStepResources["compile"]
+                Compile = Scheduler.Add(Task(f"compile {Configuration}", MakeStep("compile", Configuration, Modes[Configuration], [Configuration]),
+                    Locks=["ubt"], Cores=Cores, MemoryMB=MemoryMB))
+                Cores, MemoryMB = c.BuildStepResources["stage"]
+                Stage = Scheduler.Add(Task(f"stage {Configuration}", MakeStep("stage", Configuration, Modes[Configuration], [Configuration]),
+                    Requires=[Compile.Name, Cook.Name], Locks=["uat"], Cores=Cores, MemoryMB=MemoryMB))
+                PreviousStages.append(Stage.Name)
+
+        Scheduler.Run()
+
+        logging.getLogger().info("--------------------------------")
+        ExitCode = 0
+        for Configuration in Configurations:
+            if Configuration not in Logs:
+                logging.getLogger().info(f"{Configuration:<12} up to date")
+                continue
+
+            Logs[Configuration].Close()
+            Variant = "Release" if Configuration == "Release" else "Default"
+            Steps = [Scheduler.Tasks["compile Editor"], Scheduler.Tasks[f"compile {Configuration}"], Scheduler.Tasks[f"cook {Variant}"], Scheduler.Tasks[f"stage {Configuration}"]]
+            Failed = next((x for x in Steps if x.State != "done"), None)
+            ConfigurationExitCode = 0 if Failed is None else (Failed.ExitCode or 1)
+            ExitCode = ExitCode or ConfigurationExitCode
+
+            Analyzer = BuildLogAnalyzer()
+            for Step, StepConfiguration in [("compile", "Editor"), ("compile", Configuration), ("cook", next(x for x in Variants[Variant])), ("stage", Configuration)]:
+                if (Step, StepConfiguration) in Analyzers:
+                    Analyzer.Merge(Analyzers[(Step, StepConfiguration)])
+            Report = Analyzer.GetReport(ConfigurationExitCode, Project=GetProjectName(), Configuration=Configuration, Mode=Modes[Configuration],
+                Steps={x.Name: {"State": x.State, "ExitCode": x.ExitCode, "Seconds": x.Seconds} for x in Steps})
+            BuildLogAnalyzer.WriteReport(Report, GetBuildReportPath(Configuration))
+
+            if ConfigurationExitCode == 0:
+                self.SaveManifest(GetBuildManifestPath(Configuration), Configuration, Inputs)
+                if c.StoreAutoIngest:
+                    IngestStagedBuilds([Configuration])
+
+            Status = "succeeded" if Failed is None else f"{Failed.Name} {Failed.State} (exit code {ConfigurationExitCode})"
+            logging.getLogger().info(f"{Configuration:<12} {Status}, {', '.join(f'{x.Name} {FormatSeconds(x.Seconds)}' for x in Steps if x.Seconds is not None)}, log {Logs[Configuration].LogPath}")
+
+        if "Editor" in Logs:
+            Logs["Editor"].Close()
+        logging.getLogger().info(f"Total : {FormatSeconds(Scheduler.End - Scheduler.Start)}")
+        logging.getLogger().info("--------------------------------")
+
+        return ExitCode
+
+    # UBT arguments compiling the game target of a configuration, "Editor" compiles the editor target used by cooks.
+    def GetCompileArgs(self, BuildConfiguration):
+        if BuildConfiguration == "Editor":
+            Target, Configuration = GetProjectName() + "Editor", "Development"
+        else:
+            Target, Configuration = GetProjectName(), "Shipping" if BuildConfiguration == "Release" else BuildConfiguration
+        return [
+            f"{str(Path(GetAssociatedEngineDir()) / 'Engine/Build/BatchFiles/Build.bat')}",
+            Target,
+            "Win64",
+            Configuration,
+            f"{str(Path(GetUProjectPath()))}",
+            "-WaitMutex",
+        ]
+
+    # Steps - BuildCookRun steps to run, any of "build", "cook", "stage".
+    def GetBuildArgs(self, BuildConfiguration, Mode="full", Steps=("build", "cook", "stage")):
+        ActualBuildConfiguration = BuildConfiguration
+
+        if ActualBuildConfiguration == "Release":
+            ActualBuildConfiguration = "Shipping"
+
         Args = [
             f"{str(GetUATPath())}",
             "BuildCookRun",
@@ -437,10 +4138,12 @@ class Build(Command):
             "-targetplatform=Win64",
             "-platform=Win64",
             "-noP4",
-            "-build",
-            "-cook", # cook -
-            "-stage",
-            f"-stagingdirectory={str(Path(c.BuildStagingDir) / GetProjectName() / BuildConfiguration)}",
+            # Wait for other AutomationTool instances instead of failing.
+            "-WaitForUATMutex",
+            ("-build" if "build" in Steps else "-skipbuild"),
+            ("-cook" if "cook" in Steps else "-skipcook"), # cook -
+            ("-stage" if "stage" in Steps else "-skipstage"),
+            f"-stagingdirectory={str(GetBuildStagingDir(BuildConfiguration))}",
             # Due to problems with blueprint nativization, it is by default disabled in building process.
             "-ini:Game[/Script/UnrealEd.ProjectPackagingSettings]:BlueprintNativizationMethod=Disabled",
             #"-nocompileeditor",
@@ -452,40 +4155,381 @@ class Build(Command):
             ("-encryptinifiles" if BuildConfiguration == "Release" else ""), # 
             ("-skipeditorcontent" if BuildConfiguration == "Release" else ""), # 
             ("-skipcookingeditorcontent" if BuildConfiguration == "Release" else ""), # 
-            ("-pak" if BuildConfiguration == "Release" else ""), # 
-            "-fullrebuild"
+            ("-pak" if BuildConfiguration == "Release" and "stage" in Steps else ""), # 
+            # Only content changed since the last staged build, code is up to date and content can be cooked iteratively.
+            ("" if "build" not in Steps and "cook" not in Steps else "-iterativecooking" if Mode == "content" else "-fullrebuild"),
             #"-clean",
-            #"-iterativecooking"
         ]
 
+        return [x for x in Args if x]
+
+    # Build inputs grouped by what they invalidate. Code and config changes require a full rebuild, content changes only a recook.
+    def GetInputs(self, Manifest=None):
+        ProjectDir = GetProjectDir()
+        Previous = Manifest["Files"] if Manifest is not None else None
+        Plugins = [Path(x) for x in glob.glob(str(ProjectDir) + "/Plugins/*")]
+
+        CodeRoots = [ProjectDir / "Source", ProjectDir / "Config", GetUProjectPath()]
+        for Plugin in Plugins:
+            CodeRoots += [x for x in Plugin.iterdir() if x.name not in self.SkipDirs and x.name != "Content"] if Plugin.is_dir() else []
+
+        ContentRoots = GetContentRoots(ProjectDir)
+
+        Code = HashFiles(ProjectDir, CodeRoots, Previous, self.SkipDirs)
+        Content = HashFiles(ProjectDir, ContentRoots, Previous, self.SkipDirs)
+
+        return {
+            "Fingerprints": {
+                "Code": GetFingerprint(Code),
+                "Content": GetFingerprint(Content),
+                "Maps": GetFingerprint({}, "+".join(c.Maps)),
+            },
+            "Files": {**Code, **Content},
+        }
+
+    # @ret - "uptodate" | "content" | "full"
+    def GetBuildMode(self, Manifest, Inputs, StagingDir):
+        if Manifest is None or not os.path.isdir(StagingDir):
+            return "full"
+
+        Old, New = Manifest["Fingerprints"], Inputs["Fingerprints"]
+        Changed = [x for x in New if Old.get(x) != New[x]]
+        if len(Changed) == 0:
+            return "uptodate"
+        if "Code" not in Changed:
+            return "content"
+        return "full"
+
+    def LoadManifest(self, ManifestPath):
         try:
-            BuildProcess = subprocess.Popen(Args).wait()
-        except:
+            with open(ManifestPath, 'r') as f:
+                Manifest = json.load(f)
+            if Manifest.get("Version") == self.ManifestVersion:
+                return Manifest
+        except (OSError, ValueError):
             pass
+        return None
+
+    def SaveManifest(self, ManifestPath, BuildConfiguration, Inputs):
+        Manifest = {"Version": self.ManifestVersion, "Project": GetProjectName(), "Configuration": BuildConfiguration}
+        Manifest.update(Inputs)
+
+        try:
+            Path(ManifestPath).parent.mkdir(parents=True, exist_ok=True)
+            with open(ManifestPath, 'w') as f:
+                json.dump(Manifest, f)
+        except OSError as e:
+            logging.getLogger().error(f"Cannot write build manifest {ManifestPath}. {e}")
+
+# Runs UEDT commands as steps of a dependency graph. Steps start as soon as the steps they depend on are done.
+# Pipeline file format:
+# {
+#     "MaxJobs": 2,
+#     "FailFast": false,
+#     "Steps": {
+#         "compile": {},
+#         "cook": {"Requires": ["compile"]},
+#         "lighting": {"Command": "rebuildlight", "Requires": ["compile"]},
+#         "gauntlet": {"Args": {"target": "BootTest"}, "Requires": ["cook", "lighting"]}
+#     }
+# }
+# "Command" defaults to the step name, "Args" are the command options without leading dashes.
+class Pipeline(Command):
+    def _Execute(self, args):
+        Steps = {}
+        MaxJobs = 0
+        FailFast = True
+
+        if args.get("file") is not None:
+            with open(args.get("file"), 'r', encoding='utf-8') as File:
+                Data = json.load(File)
+            Steps = Data.get("Steps", {})
+            MaxJobs = Data.get("MaxJobs", MaxJobs)
+            FailFast = Data.get("FailFast", FailFast)
+
+        if args.get("steps") is not None:
+            Steps = self.ParseSteps(args.get("steps"))
+
+        for Value in args.get("set") or []:
+            try:
+                Key, Value = Value.split("=", 1)
+                StepName, Option = Key.split(".", 1)
+                Steps[StepName].setdefault("Args", {})[Option] = Value
+            except (ValueError, KeyError):
+                logging.getLogger().error(f"Invalid --set value \"{Value}\", expected <step>.<option>=<value> of an existing step.")
+                return 1
+
+        if len(Steps) == 0:
+            logging.getLogger().error("No steps to run. Provide --file or --steps.")
+            return 1
+
+        if args.get("jobs") is not None:
+            MaxJobs = int(args.get("jobs"))
+        if args.get("keep_going"):
+            FailFast = False
+
+        Scheduler = TaskScheduler(MaxJobs or len(Steps), FailFast=FailFast)
+        for StepName, Step in Steps.items():
+            CommandName = Step.get("Command", StepName)
+            Entry = next((x for x in commands if x[0] == CommandName), None)
+            if Entry is None or Entry[1] is Pipeline:
+                logging.getLogger().error(f"Step \"{StepName}\" uses unknown command \"{CommandName}\".")
+                return 1
+            Scheduler.Add(Task(StepName, self.MakeStep(StepName, Entry, Step.get("Args", {})), Requires=Step.get("Requires", [])))
+
+        try:
+            Order = Scheduler.GetOrder()
+        except ValueError as e:
+            logging.getLogger().error(str(e))
+            return 1
+
+        logging.getLogger().info("--------------------------------")
+        logging.getLogger().info(f"Pipeline : {', '.join(Order)}")
+        logging.getLogger().info("--------------------------------")
+
+        Scheduler.Run()
+        self.PrintSummary(Scheduler, Order)
+
+        Failed = [Scheduler.Tasks[x] for x in Order if Scheduler.Tasks[x].State == "failed"]
+        if len(Failed) > 0:
+            return Failed[0].ExitCode or 1
+        if any(x.State != "done" for x in Scheduler.Tasks.values()):
+            return 1
+
+    # Format: space separated steps, each step "name[:dependency,dependency]", eg. "compile cook:compile validate:cook".
+    def ParseSteps(self, Value):
+        Steps = {}
+        for Item in Value.split():
+            StepName, _, Requires = Item.partition(":")
+            Steps[StepName] = {"Requires": [x for x in Requires.split(",") if x]}
+        return Steps
+
+    def MakeStep(self, StepName, Entry, StepArgs):
+        # Same arguments argparse would produce, so commands cannot tell a pipeline step from a regular run.
+        CommandArgs = {"command": Entry[0]}
+        for Option in Entry[3]:
+            Kwargs = Option[2] if len(Option) > 2 else {}
+            CommandArgs[Option[0].lstrip("-").replace("-", "_")] = False if Kwargs.get("action") == "store_true" else None
+        CommandArgs.update(StepArgs)
+
+        def Run():
+            jobContext.LogPrefix = f"[{StepName}] "
+            try:
+                return Entry[1](CommandArgs).ExitCode
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else 1
+            finally:
+                jobContext.LogPrefix = ""
+        return Run
+
+    def PrintSummary(self, Scheduler, Order):
+        CriticalPath = Scheduler.GetCriticalPath()
+
+        print("--------------------------------")
+        print(f"{'Step':<24}{'State':<10}{'Start':>10}{'Duration':>10}")
+        for Name in Order:
+            Item = Scheduler.Tasks[Name]
+            Start = FormatSeconds(Item.Start - Scheduler.Start) if Item.Start is not None else "-"
+            Marker = " *" if Item in CriticalPath else ""
+            print(f"{Name:<24}{Item.State:<10}{Start:>10}{FormatSeconds(Item.Seconds):>10}{Marker}")
+
+        Total = Scheduler.End - Scheduler.Start
+        Busy = sum(x.Seconds or 0 for x in Scheduler.Tasks.values())
+        print("--------------------------------")
+        if len(CriticalPath) > 0:
+            print(f"Critical path (*) : {' -> '.join(x.Name for x in CriticalPath)}")
+            Bottleneck = max(CriticalPath, key=lambda x: x.Seconds or 0)
+            print(f"Bottleneck : {Bottleneck.Name} ({FormatSeconds(Bottleneck.Seconds)}, {100 * (Bottleneck.Seconds or 0) / Total if Total > 0 else 0:.0f}% of total)")
+        print(f"Total : {FormatSeconds(Total)}, sum of steps {FormatSeconds(Busy)}, parallel speedup {Busy / Total if Total > 0 else 0:.2f}x")
+
+class Store(Command):
+    def _Execute(self, args):
+        Action = args.get("action") or "report"
+
+        if args.get("configuration") is not None:
+            Configurations = args.get("configuration").split(",")
+        elif args.get("c") is not None:
+            Configurations = args.get("c").split(",")
+        else:
+            ProjectStagingDir = Path(c.BuildStagingDir) / GetProjectName()
+            Configurations = sorted(x.name for x in ProjectStagingDir.iterdir() if x.is_dir()) if ProjectStagingDir.is_dir() else []
+
+        if Action == "ingest":
+            IngestStagedBuilds(Configurations, args.get("jobs"))
+            Action = "report"
+
+        Store = StagingStore()
+
+        if Action == "gc":
+            Removed, Bytes = Store.CollectGarbage(args.get("dry_run"))
+            print(f"{'Would remove' if args.get('dry_run') else 'Removed'} {Removed} unreferenced blobs, {FormatBytes(Bytes)}.")
+
+        elif Action == "report":
+            Report = Store.GetReport()
+            print("--------------------------------")
+            for StagedDir, Tree in sorted(Report["Trees"].items()):
+                print(f"{StagedDir:<60}{Tree['Files']:>8} files{FormatBytes(Tree['Bytes']):>12}")
+            print("--------------------------------")
+            print(f"Staged trees : {FormatBytes(Report['StagedBytes'])}")
+            print(f"Store : {FormatBytes(Report['StoreBytes'])} in {Report['Blobs']} blobs ({FormatBytes(Report['UnreferencedBytes'])} unreferenced, run 'store gc')")
+            print(f"Disk saved : {FormatBytes(Report['SavedBytes'])}")
+
+# Staged build configuration name or path of a build folder.
+def GetBuildDir(Value):
+    return Path(Value) if os.path.isdir(Value) or not Value.isidentifier() else GetBuildStagingDir(Value)
+
+class CreatePatch(Command):
+    def _Execute(self, args):
+        if args.get("old") is None or args.get("new") is None:
+            logging.getLogger().error("Provide --old and --new builds.")
+            return 1
+
+        OldDir = GetBuildDir(args.get("old"))
+        NewDir = GetBuildDir(args.get("new"))
+        for BuildDir in (OldDir, NewDir):
+            if not BuildDir.is_dir():
+                logging.getLogger().error(f"Build folder {BuildDir} does not exist.")
+                return 1
+
+        PatchPath = args.get("output") or f"{NewDir.name}.uedtpatch"
+        Start = time.monotonic()
+        Header = BuildPatch(args.get("chunk_size"), args.get("jobs")).Create(OldDir, NewDir, PatchPath)
+        PatchSize = os.path.getsize(PatchPath)
+
+        print("--------------------------------")
+        print(f"Patch : {PatchPath}")
+        print(f"Changed files : {len(Header['Files'])}, removed : {len(Header['Removed'])}, unchanged : {Header['Unchanged']}")
+        print(f"Patch size : {FormatBytes(PatchSize)}, full build : {FormatBytes(Header['NewBytes'])}, saved : {FormatBytes(Header['NewBytes'] - PatchSize)} ({100 * (1 - PatchSize / Header['NewBytes']) if Header['NewBytes'] > 0 else 0:.1f}%)")
+        print(f"Created in {FormatSeconds(time.monotonic() - Start)}")
+        print("--------------------------------")
+
+class ApplyPatch(Command):
+    def _Execute(self, args):
+        if args.get("patch") is None or args.get("target") is None:
+            logging.getLogger().error("Provide --patch and --target.")
+            return 1
+
+        TargetDir = GetBuildDir(args.get("target"))
+        Start = time.monotonic()
+        try:
+            Patched, UpToDate, Errors = BuildPatch(Jobs=args.get("jobs")).Apply(args.get("patch"), TargetDir, args.get("dry_run"))
+        except (OSError, ValueError) as e:
+            logging.getLogger().error(f"Cannot apply {args.get('patch')}. {e}")
+            return 1
+
+        for Error in Errors:
+            logging.getLogger().error(Error)
+        if len(Errors) > 0:
+            logging.getLogger().error(f"Patch not applied to {TargetDir}." if Patched == 0 else f"Patch applied to {TargetDir} with errors.")
+            return 1
+
+        Verb = "Would patch" if args.get("dry_run") else "Patched"
+        logging.getLogger().info(f"{Verb} {Patched} files in {TargetDir}, {UpToDate} already up to date, in {FormatSeconds(time.monotonic() - Start)}.")
+
+class AnalyzeBuildLog(Command):
+    def _Execute(self, args):
+        if args.get("log") is None:
+            print("Cannot analyze build log. Log file not provided.")
+            return 1
+
+        Analyzer = BuildLogAnalyzer()
+        with open(args.get("log"), 'r', encoding='utf-8', errors='replace') as f:
+            for Line in f:
+                Analyzer.AnalyzeLine(Line.rstrip("\r\n"))
+
+        Report = Analyzer.GetReport(Log=str(Path(args.get("log")).resolve()))
+        BuildLogAnalyzer.WriteReport(Report, args.get("output") or Path(args.get("log")).with_suffix(".BuildReport.json"))
 
 class FixBinaryPermissions(Command):
+    Extensions = ('.dll', '.pdb', '.modules', '.target', '.uproject')
+    # Directories that never contain binaries, they are not descended into.
+    SkipDirs = {"Content", "DerivedDataCache", "ShaderAutogen", "ProjectFiles", "Config", "PipInstall", "Saved"}
+    IndexFileName = "BinaryPermissions.json"
+
     def _Execute(self, args):
-        import stat
+        ProjectDir = GetProjectDir()
+        IndexPath = GetUEDTCacheDir() / self.IndexFileName
+        Start = time.perf_counter()
 
-        extensions = ['.dll', '.pdb', '.modules', '.target', '.uproject']
-        files = [os.path.join(root, f) for root, dirs, filenames in os.walk(GetProjectDir()) for f in filenames if any(f.endswith(ext) for ext in extensions ) ]
+        # Index of files already known to be writable, keyed by path. Value is [inode, mtime].
+        Index = {}
+        if not args.get("full"):
+            try:
+                with open(IndexPath, 'r') as f:
+                    Index = json.load(f)
+            except (OSError, ValueError):
+                pass
 
-        result = True
+        Candidates = []
+        NewIndex = {} # Only files seen in this scan are kept, removed files drop out of the index.
+        for entry in self.ScanBinaries(ProjectDir):
+            Stat = entry.stat()
+            Key = [entry.inode(), Stat.st_mtime_ns]
+            if Index.get(entry.path) == Key:
+                NewIndex[entry.path] = Key
+                continue
+            Candidates.append((entry.path, Stat.st_mode, Key))
 
-        for file in files:
-            if not os.access(file, os.W_OK):
-                os.chmod(file, stat.S_IWUSR)
-                if not os.access(file, os.W_OK):
+        result = True
+        Skipped = len(NewIndex)
+        Fixed = 0
+
+        with ThreadPoolExecutor(max_workers=GetJobCount()) as Executor:
+            for file, Key, WasFixed, OK in Executor.map(lambda x: self.FixFile(*x), Candidates):
+                if OK:
+                    NewIndex[file] = Key
+                    Fixed += WasFixed
+                else:
                     print(f"Cannot fix permissions for {file}")
                     result = False
 
+        try:
+            IndexPath.parent.mkdir(parents=True, exist_ok=True)
+            with open(IndexPath, 'w') as f:
+                json.dump(NewIndex, f)
+        except OSError as e:
+            logging.getLogger().info(f"Cannot write permission index. {e}")
+
+        print(f"Checked {len(Candidates)} files, fixed {Fixed}, skipped {Skipped} already fixed files in {time.perf_counter() - Start:.2f}s.")
+
         if result == True:
             print("Permissions fixed successfuly!")
         else:
             print("Unable to fix all permissions.\n Check if account that you are logged on is an owner of these files or if you need to launch the script as an administrator.")
 
+    def FixFile(self, file, Mode, Key):
+        if Mode & stat.S_IWUSR:
+            return file, Key, False, True
+
+        os.chmod(file, Mode | stat.S_IWUSR)
+        return file, Key, True, os.access(file, os.W_OK)
+
+    # Yields 'os.DirEntry' objects of files with matching extensions.
+    # Only Binaries, Intermediate and plugin Binaries folders are scanned.
+    def ScanBinaries(self, ProjectDir):
+        Roots = [ProjectDir / "Binaries", ProjectDir / "Intermediate"]
+        Roots += [Path(x) / "Binaries" for x in glob.glob(str(ProjectDir) + "/Plugins/*")]
+
+        with os.scandir(ProjectDir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(self.Extensions):
+                    yield entry
+
+        Stack = [str(x) for x in Roots if x.is_dir()]
+        while Stack:
+            try:
+                with os.scandir(Stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.SkipDirs:
+                                Stack.append(entry.path)
+                        elif entry.name.endswith(self.Extensions):
+                            yield entry
+            except OSError as e:
+                logging.getLogger().info(f"Cannot scan directory. {e}")
+
 class RebuildLighting(Command):
-    def _Execute(self):
+    def _Execute(self, args):
         logging.getLogger().info("--------------------------------")
         logging.getLogger().info(f"Rebuild Lighting Started")
         logging.getLogger().info("--------------------------------")
@@ -500,15 +4544,16 @@ class RebuildLighting(Command):
             f"-map={'+'.join(c.Maps)}",
         ]
 
-        try:
-            process = subprocess.Popen(Args).wait()
-        except:
-            pass
+        return RunProcess(Args, "rebuildlight").ReturnCode
 
+# Compiles one or more targets in a single UBT invocation, so all targets share one action graph and one UBT mutex.
+# With --timing compile times are collected per module, translation unit and header and stored in the run history.
 class Compile(Command):
+    TargetSuffixes = {"Editor": "Editor", "Game": "", "Client": "Client", "Server": "Server"}
+
     def _Execute(self, args):
         MSBuildPath = GetRegistryData("HKLM:SOFTWARE/Microsoft/MSBuild/ToolsVersions/4.0/MSBuildToolsPath")
-        if len(MSBuildPath) > 0:
+        if MSBuildPath is not None and len(MSBuildPath) > 0:
             ProjectName = GetProjectName()
 
             BatchFilePath = Path(GetAssociatedEngineDir()) / 'Engine/Build/BatchFiles/Build.bat'
@@ -516,28 +4561,109 @@ class Compile(Command):
                 logging.error(f"File does not exist. {str(BatchFilePath)}")
                 return
 
-            Commands = [
-                f"{str(BatchFilePath)}",
-                ProjectName+'Editor',
-                'Win64',
-                c.CompilationConfiguration,
-                GetUProjectPath(),
-                '-WaitMutex'
-            ]
-
-            try:
-                BuildProcess = subprocess.Popen(Commands).wait()
-            except:
-                pass
+            Configuration = args.get("configuration") or args.get("c") or c.CompilationConfiguration
+            Targets = [ProjectName + self.TargetSuffixes[x] if x in self.TargetSuffixes else x for x in (args.get("targets") or c.CompilationTargets).split(",") if x]
+
+            if len(Targets) == 1:
+                Commands = [
+                    f"{str(BatchFilePath)}",
+                    Targets[0],
+                    'Win64',
+                    Configuration,
+                    GetUProjectPath(),
+                    '-WaitMutex'
+                ]
+            else:
+                Commands = [f"{str(BatchFilePath)}"] + [f'-Target={x} Win64 {Configuration} -Project="{GetUProjectPath()}"' for x in Targets] + ['-WaitMutex']
+
+            if not args.get("timing"):
+                return RunProcess(Commands, "compile").ReturnCode
+
+            Analyzer = CompileTimingAnalyzer()
+            Started = time.time()
+            Result = RunProcess(Commands + c.CompileTimingArgs, "compile", OnLine=Analyzer.AnalyzeLine)
+            self.ReadTimeTraces(Analyzer, Targets, Configuration, Started)
+
+            Report = Analyzer.GetReport()
+            if len(Report["Units"]) == 0:
+                logging.getLogger().info("No compile timing found. Nothing was compiled or the toolchain does not support timing output.")
+                return Result.ReturnCode
+
+            Regressions = self.RecordHistory(Report, "+".join(Targets), Configuration, Started) if Result.OK else {}
+            self.PrintReport(Report, Regressions, int(args.get("top") or 10))
+
+            ReportPath = GetUEDTCacheDir() / "CompileTiming.json"
+            ReportPath.parent.mkdir(parents=True, exist_ok=True)
+            with open(ReportPath, 'w', encoding='utf-8') as File:
+                json.dump({"Targets": Targets, "Configuration": Configuration, "Started": Started, **Report}, File, indent=4)
+            logging.getLogger().info(f"Compile timing report written to {ReportPath}")
+            return Result.ReturnCode
         else:
             logging.error("MSBuild not installed. Use 'python UEDT.py compile -help' to get information about MSBuild tool installation.")
 
+    # clang writes a trace per translation unit next to its object file.
+    def ReadTimeTraces(self, Analyzer, Targets, Configuration, Started):
+        Traces = []
+        for IntermediateDir in [GetProjectDir() / "Intermediate"] + [Path(x) / "Intermediate" for x in glob.glob(str(GetProjectDir()) + "/Plugins/*")]:
+            for Target in Targets:
+                for TargetDir in glob.glob(str(IntermediateDir / "Build" / "*" / Target / Configuration)):
+                    for DirPath, _, FileNames in os.walk(TargetDir):
+                        Traces += [os.path.join(DirPath, x) for x in FileNames if x.endswith(".json") and os.path.getmtime(os.path.join(DirPath, x)) >= Started]
+        with ThreadPoolExecutor(max_workers=GetJobCount()) as Executor:
+            list(Executor.map(Analyzer.AnalyzeTimeTrace, Traces))
+
+    # Stores module times and flags modules slower than comparable previous compiles (same targets, configuration and number of units).
+    # @ret - Module name -> median seconds of previous compiles, for flagged modules.
+    def RecordHistory(self, Report, Targets, Configuration, Started):
+        Regressions = {}
+        try:
+            History = RunHistory()
+            for Module, Times in Report["Modules"].items():
+                Previous = [x["Seconds"] for x in History.GetModuleTimes(Module, Targets, Configuration, Times["Units"], Limit=10)]
+                Median = Percentile(Previous, 50)
+                if Median is not None and Times["Seconds"] > Median * c.CompileRegressionThreshold and Times["Seconds"] - Median >= c.CompileRegressionMinSeconds:
+                    Regressions[Module] = Median
+            History.AddModuleTimes(Started, Targets, Configuration, Report["Modules"])
+            History.Close()
+        except Exception as e:
+            logging.getLogger().info(f"Cannot record compile timing history. {e}")
+        return Regressions
+
+    def PrintReport(self, Report, Regressions, Top):
+        print("--------------------------------")
+        print(f"Slowest modules ({len(Report['Modules'])} compiled):")
+        for Module, Times in list(Report["Modules"].items())[:Top]:
+            Flag = f"  REGRESSION, median {FormatSeconds(Regressions[Module])}" if Module in Regressions else ""
+            print(f"{FormatSeconds(Times['Seconds']):>12} {Times['Units']:>5} units  {Module}{Flag}")
+        for Module in [x for x in Regressions if x not in list(Report["Modules"])[:Top]]:
+            print(f"{FormatSeconds(Report['Modules'][Module]['Seconds']):>12} {Report['Modules'][Module]['Units']:>5} units  {Module}  REGRESSION, median {FormatSeconds(Regressions[Module])}")
+        print(f"Slowest translation units ({len(Report['Units'])} compiled):")
+        for Unit, Seconds in list(Report["Units"].items())[:Top]:
+            print(f"{FormatSeconds(Seconds):>12}  {Unit}")
+        if len(Report["Headers"]) > 0:
+            print("Most included headers:")
+            for Header, (Count, Seconds) in list(Report["Headers"].items())[:Top]:
+                print(f"{Count:>7}x {FormatSeconds(Seconds):>10}  {Header}")
+        print("--------------------------------")
+
 class LaunchMode(IntFlag):
     Opti = auto()
     Trace = auto()
     Debug = auto()
 
 class Launch(Command):
+    OptiArgs = [
+        "-noailogging",
+        "-nosound",
+        "-novsync",
+        "-nogpucrashdebugging",
+        "-nomcp", # No multiplayer.
+        "-noscreenmessages",
+        "-noverifygc",
+        "-nothreadtimeout",
+        "-unattended",
+    ]
+
     def _Execute(self, args):
         Mode = None
 
@@ -563,30 +4689,82 @@ class Launch(Command):
                     ]
 
                 if Data & LaunchMode.Opti.value:           
-                    Args += [
-                        "-noailogging",
-                        "-nosound",
-                        "-novsync",
-                        "-nogpucrashdebugging",
-                        "-nomcp", # No multiplayer.
-                        "-noscreenmessages",
-                        "-noverifygc",
-                        "-nothreadtimeout",
-                        "-unattended",
-                    ]
+                    Args += self.OptiArgs
                     
                 if Data & LaunchMode.Trace.value:
-                    if LaunchUnrealInsights():
-                        import time
-                        time.sleep(1) # Small delay to let UnrealInsights warmup, otherwise it might not notice that the game is launching.
+                    # The game connects to the trace server once at start, it has to be listening before the game launches.
+                    InsightsProcess = LaunchUnrealInsights()
+                    Start = time.monotonic()
+                    if WaitForPort(c.TraceServerHost, c.TraceServerPort, c.TraceServerTimeout, InsightsProcess):
+                        logging.info(f"Trace server ready in {FormatSeconds(time.monotonic() - Start)}.")
+                    else:
+                        logging.warning(f"Trace server {c.TraceServerHost}:{c.TraceServerPort} not ready after {FormatSeconds(time.monotonic() - Start)}, the trace may not be recorded.")
                         
                     Args += [
                         "-trace=default,memory,metadata,assetmetadata"
                     ]
             
+        if args.get("csvprofile"):
+            Args += [f"-csvCaptureFrames={args.get('frames')}" if args.get("frames") else "-ExecCmds=csvprofile start"]
+
         logging.info(f"Launching {GetProjectName()}...")
 
+        # Capture is written when the game exits, analyzing it requires waiting for the game.
+        if args.get("csvprofile"):
+            Start = time.time()
+            ExitCode = self.RunAttached(Args, args)
+            Captures = [x for x in GetCsvCaptures() if x.stat().st_mtime >= Start]
+            if len(Captures) == 0:
+                logging.getLogger().error(f"No CSV capture written to {GetCsvCaptureDir()}.")
+                return ExitCode or 1
+            AnalyzeCsvCapture(Captures[-1], args.get("baseline"))
+            return ExitCode
+
+        if args.get("attach"):
+            return self.RunAttached(Args, args)
+
         FireAndForgetProcess(Args)
+
+    # Runs the game, drains its output and prints new lines of its log file until it exits.
+    def RunAttached(self, Args, args):
+        LogPath = GetProjectDir() / "Saved" / "Logs" / f"{GetProjectName()}.log"
+        Follower = LogFollower(LogPath)
+        Filter = LogFilter(args.get("category").split(",") if args.get("category") else None, args.get("verbosity"), sys.stdout.isatty())
+        Logger = logging.getLogger("UEDT.Process")
+
+        try:
+            Process = subprocess.Popen([str(x) for x in Args], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except OSError as e:
+            logging.getLogger().error(f"Cannot start {Args[0]}. {e}")
+            Follower.Close()
+            return 1
+
+        # Game writes the same lines to the log file, console output is only drained so the game never blocks on a full pipe.
+        def Drain():
+            for Line in iter(Process.stdout.readline, b''):
+                Logger.debug(Line.decode("utf-8", errors="replace").rstrip("\r\n"))
+        Drainer = threading.Thread(target=Drain, daemon=True)
+        Drainer.start()
+
+        try:
+            while Process.poll() is None:
+                Follower.Wait(0.25)
+                Text = Filter.Filter(Follower.Read())
+                if Text:
+                    sys.stdout.write(Text)
+                    sys.stdout.flush()
+        except KeyboardInterrupt:
+            logging.getLogger().info("Detached, the game keeps running.")
+            return 0
+        finally:
+            sys.stdout.write(Filter.Filter(Follower.Read(Final=Process.poll() is not None)))
+            Follower.Close()
+
+        Drainer.join(1.0)
+        Counts = Filter.Counts
+        logging.getLogger().info(f"{GetProjectName()} exited with code {Process.returncode}. {Counts['Lines']} log lines, {Counts['Shown']} shown, "
+            f"{Counts['Warning']} warnings, {Counts['Error']} errors, {Counts['Hitch']} hitches.")
+        return Process.returncode
         
     def ParseLaunchMode(self, Mode):
         PreparedString = "".join(Mode.split()).lower()
@@ -603,6 +4781,10 @@ class Launch(Command):
 
 class CookProject(Command):
     def _Execute(self, args):
+        Shards = int(args.get("shards") or c.CookShards)
+        if Shards > 1:
+            return CookSharded(Shards, Iterative=not args.get("full"))
+
         Args = [
             f"{str(Path(GetAssociatedEngineDir()) / 'Engine/Binaries/Win64/UnrealEditor.exe')}",
             f"{str(Path(GetUProjectPath()))}",
@@ -616,44 +4798,261 @@ class CookProject(Command):
             #"-clean",
         ]
 
-        try:
-            BuildProcess = subprocess.Popen(Args).wait()
-        except:
-            pass
+        return RunProcess(Args, "cook").ReturnCode
 
+# Validates packages changed since the last successful validation, or packages opened in a changelist, together with their direct referencers.
+# Content hashes of the last successful validation are kept in Saved/UEDT/ValidationIndex.json.
 class DataValidator(Command):
+    IndexVersion = 1
+
     def _Execute(self, args):
-        args = f"{str(Path(GetAssociatedEngineDir()) / 'Engine/Binaries/Win64/UnrealEditor-Cmd.exe')} {str(Path(GetUProjectPath()))} -run=DataValidation"
+        Args = [
+            f"{str(Path(GetAssociatedEngineDir()) / 'Engine/Binaries/Win64/UnrealEditor-Cmd.exe')}",
+            f"{str(Path(GetUProjectPath()))}",
+            "-run=DataValidation",
+        ]
 
+        ProjectDir = GetProjectDir()
+        IndexPath = GetUEDTCacheDir() / "ValidationIndex.json"
+        Index = None if args.get("full") else self.LoadIndex(IndexPath)
+        Files = HashFiles(ProjectDir, GetContentRoots(ProjectDir), Index)
+
+        if args.get("changelist") is not None:
+            Changed = self.GetChangelistFiles(args.get("changelist"), ProjectDir)
+            if Changed is None:
+                return 1
+        elif Index is not None:
+            # Deleted packages are kept, their referencers have to be validated. Touched files with the same content are not changed.
+            Changed = [x for x in Files if x not in Index or Index[x][2] != Files[x][2]] + [x for x in Index if x not in Files]
+        else:
+            Changed = None
+
+        if Changed is not None:
+            Packages = {x for x in (GetPackageName(x) for x in Changed) if x is not None}
+            if len(Packages) == 0:
+                logging.getLogger().info("No changed packages to validate.")
+                return 0
+
+            Graph = AssetGraph(ProjectDir)
+            Graph.Update()
+            Referencers = Graph.GetReferencers(Packages) - Packages
+            Existing = {GetPackageName(x) for x in Files}
+            Packages = sorted((Packages | Referencers) & Existing)
+            logging.getLogger().info(f"Validating {len(Packages)} packages, {len(Referencers)} of them referencing changed packages.")
+
+            Batches = self.GetBatches(Args, Packages)
+            if len(Batches) > c.ValidationMaxBatches:
+                logging.getLogger().info(f"{len(Packages)} packages need {len(Batches)} commandlet runs, validating the whole project instead.")
+                Changed = None
+            else:
+                for Number, Batch in enumerate(Batches):
+                    Checked = []
+                    OnLine = lambda Line: Checked.extend(int(x) for x in re.findall(c.ValidationCheckedPattern, Line))
+                    Result = RunProcess(Args + [c.ValidationPackagesArg + "+".join(Batch)], "validate", OnLine=OnLine,
+                        LogPrefix=f"[{Number + 1}/{len(Batches)}] " if len(Batches) > 1 else "")
+                    if not Result.OK:
+                        return Result.ReturnCode or 1
+                    if len(Checked) > 0 and Checked[-1] > len(Batch):
+                        logging.getLogger().error(f"DataValidation validated {Checked[-1]} packages of {len(Batch)} passed with {c.ValidationPackagesArg}, "
+                            "the commandlet does not support the argument. Set Config.ValidationPackagesArg or use --full.")
+                        return 1
+                    if len(Checked) == 0:
+                        logging.getLogger().warning(f"No \"{c.ValidationCheckedPattern}\" summary in DataValidation output, cannot check that only {len(Batch)} packages were validated.")
+
+        if Changed is None:
+            logging.getLogger().info("Validating the whole project.")
+            Result = RunProcess(Args, "validate")
+            if not Result.OK:
+                return Result.ReturnCode or 1
+
+        # Packages of a changelist were validated against the workspace, other changes since the last validation were not.
+        if args.get("changelist") is None:
+            self.SaveIndex(IndexPath, Files)
+
+    # @ret - Relative paths of files opened in the changelist, None if Perforce cannot be queried.
+    def GetChangelistFiles(self, Changelist, ProjectDir):
+        Opened = perforceHandler.QueryOpenedFiles()
+        if Opened is None:
+            logging.getLogger().error("Cannot query opened files from Perforce.")
+            return None
+
+        # Paths are compared normalized, relative paths keep the server spelling, package names are case-sensitive.
+        ProjectKey = os.path.join(P4OpenedFileCache.GetKey(ProjectDir), "")
+        Files = []
+        for filePath, State in Opened.items():
+            if State["Change"] == str(Changelist) and filePath.startswith(ProjectKey):
+                Files.append(Path(os.path.abspath(State.get("Path", filePath))[len(ProjectKey):]).as_posix())
+        logging.getLogger().info(f"Changelist {Changelist} : {len(Files)} opened files in the project.")
+        return Files
+
+    # @ret - Lists of packages, each fitting into a command line of Config.ValidationMaxCommandLine characters.
+    def GetBatches(self, Args, Packages):
+        Available = c.ValidationMaxCommandLine - len(" ".join(Args)) - len(c.ValidationPackagesArg) - 1
+        Batches = []
+        Length = None
+        for Package in Packages:
+            if Length is None or Length + len(Package) + 1 > Available:
+                Batches.append([])
+                Length = 0
+            Batches[-1].append(Package)
+            Length += len(Package) + 1
+        return Batches
+
+    def LoadIndex(self, IndexPath):
         try:
-            process = subprocess.Popen(args.split()).wait()
-        except:
+            with open(IndexPath, 'r') as f:
+                Index = json.load(f)
+            if Index.get("Version") == self.IndexVersion and Index.get("Project") == GetProjectName():
+                return Index["Files"]
+        except (OSError, ValueError):
             pass
+        return None
+
+    def SaveIndex(self, IndexPath, Files):
+        try:
+            IndexPath.parent.mkdir(parents=True, exist_ok=True)
+            with open(IndexPath, 'w') as f:
+                json.dump({"Version": self.IndexVersion, "Project": GetProjectName(), "Files": Files}, f)
+        except OSError as e:
+            logging.getLogger().error(f"Cannot write validation index {IndexPath}. {e}")
 
 
-class GauntletTest(Command):      
+# Runs Gauntlet test targets against a single staged build. The build is skipped when the staged build is up to date (build manifest).
+# Targets run concurrently, each with its own Gauntlet temp and log folder, results are merged into one JUnit report.
+class GauntletTest(Command):
     def _Execute(self, args):
         
         if args.get("target") is None:
             print("Cannot perform GauntletTest. Target not provided.")
-            return
-        
-        args = f"{GetUATPath()} BuildCookRun -project={GetUProjectPath()} -platform=Win64 -configuration=Development -build -cook -pak -stage"
-        print(args)
-        
-        try:
-            process = subprocess.Popen(args.split()).wait()
-        except:
-            pass
-        
+            return 1
+
+        Targets = [x.strip() for x in args.get("target").split(",") if x.strip()]
+        Configuration = args.get("c") or c.GauntletConfiguration
+        StagingDir = GetBuildStagingDir(Configuration)
+
+        if args.get("skip_build"):
+            if not StagingDir.is_dir():
+                logging.getLogger().error(f"No staged build in {StagingDir}.")
+                return 1
+        else:
+            # Build checks the manifest fingerprints and only builds when inputs changed.
+            ExitCode = Build({"command": "build", "c": Configuration, "force": args.get("rebuild")}).ExitCode
+            if ExitCode != 0:
+                return ExitCode
+
         print("\n################\n# START GAUNTLET TEST\n################")
-        
-        args = f"{GetUATPath()} RunUnreal -project={GetUProjectPath()} -platform=Win64 -configuration=Development -build=local -test={args.target}"
 
-        try:
-            process = subprocess.Popen(args.split()).wait()
-        except:
-            pass
+        ResultsDir = GetUEDTCacheDir() / "Gauntlet"
+        Scheduler = TaskScheduler(args.get("jobs") or c.GauntletMaxJobs, FailFast=False)
+        Logs = {}
+        for Target in Targets:
+            TargetDir = ResultsDir / Target
+            if TargetDir.exists():
+                shutil.rmtree(TargetDir, onerror=RmTreeHandleError)
+            Logs[Target] = JobLog(TargetDir / "Gauntlet.log")
+            Scheduler.Add(Task(Target, self.MakeRun(Target, Configuration, StagingDir, TargetDir, Logs[Target]), Locks=[] if c.GauntletParallelUAT else ["uat"]))
+
+        Scheduler.Run()
+        for Log in Logs.values():
+            Log.Close()
+
+        ReportPath = Path(args.get("report") or ResultsDir / "Results.xml")
+        Suites = [self.GetSuite(Scheduler.Tasks[x], ResultsDir / x, Logs[x].LogPath) for x in Targets]
+        self.WriteJUnitReport(ReportPath, Suites)
+        self.PrintSummary(Suites, ReportPath, Scheduler.End - Scheduler.Start)
+
+        Failed = [Scheduler.Tasks[x] for x in Targets if Scheduler.Tasks[x].State != "done"]
+        if len(Failed) > 0:
+            return Failed[0].ExitCode or 1
+        return 1 if any(x["State"] == "failed" for Suite in Suites for x in Suite["Tests"]) else 0
+
+    def MakeRun(self, Target, Configuration, StagingDir, TargetDir, Log):
+        Args = [
+            GetUATPath(),
+            "RunUnreal",
+            f"-project={GetUProjectPath()}",
+            "-platform=Win64",
+            f"-configuration={'Shipping' if Configuration == 'Release' else Configuration}",
+            f"-build={StagingDir}",
+            f"-test={Target}",
+            # Gauntlet installs the build and keeps Saved of the test instance in tempdir, artifacts go to logdir.
+            f"-tempdir={TargetDir / 'Temp'}",
+            f"-logdir={TargetDir / 'Logs'}",
+            f"-ReportExportPath={TargetDir / 'Report'}",
+            "-unattended",
+        ]
+        Env = None
+        if c.GauntletParallelUAT:
+            Env = dict(os.environ, uebp_UATMutexNoWait="1")
+        else:
+            Args.append("-WaitForUATMutex")
+        def Run():
+            return RunProcess(Args, "gauntlet", OnLine=Log.Write, LogPrefix=f"[{Target}] ", env=Env).ReturnCode
+        return Run
+
+    # @ret - Suite of a target: its tests from the automation report, or the whole target as a single test when there is no report.
+    def GetSuite(self, TargetTask, TargetDir, LogPath):
+        Suite = {"Name": TargetTask.Name, "Seconds": TargetTask.Seconds or 0.0, "ExitCode": TargetTask.ExitCode, "Log": str(LogPath), "Tests": []}
+
+        for ReportPath in sorted((TargetDir / "Report").glob("**/index.json")) if (TargetDir / "Report").is_dir() else []:
+            try:
+                with open(ReportPath, 'r', encoding='utf-8-sig') as File:
+                    Report = json.load(File)
+            except (OSError, ValueError) as e:
+                logging.getLogger().error(f"Cannot read automation report {ReportPath}. {e}")
+                continue
+            for Test in Report.get("tests", []):
+                Errors = [x["event"]["message"] for x in Test.get("entries", []) if x.get("event", {}).get("type") == "Error"]
+                Suite["Tests"].append({
+                    "Name": Test.get("fullTestPath") or Test.get("testDisplayName"),
+                    "Seconds": float(Test.get("duration") or 0.0),
+                    "State": {"Success": "passed", "Fail": "failed"}.get(Test.get("state"), "skipped"),
+                    "Message": "\n".join(Errors),
+                })
+
+        if len(Suite["Tests"]) == 0:
+            Suite["Tests"].append({
+                "Name": TargetTask.Name,
+                "Seconds": Suite["Seconds"],
+                "State": "passed" if TargetTask.State == "done" else "failed",
+                "Message": "" if TargetTask.State == "done" else f"Gauntlet {TargetTask.State} with exit code {TargetTask.ExitCode}, see {LogPath}",
+            })
+        elif TargetTask.State != "done" and not any(x["State"] == "failed" for x in Suite["Tests"]):
+            # Gauntlet failed outside of the reported tests, eg. the instance crashed.
+            Suite["Tests"].append({"Name": f"{TargetTask.Name}.Gauntlet", "Seconds": Suite["Seconds"], "State": "failed",
+                "Message": f"Gauntlet {TargetTask.State} with exit code {TargetTask.ExitCode}, see {LogPath}"})
+        return Suite
+
+    def WriteJUnitReport(self, ReportPath, Suites):
+        import xml.etree.ElementTree as ET
+        Root = ET.Element("testsuites", name=GetProjectName(),
+            tests=str(sum(len(x["Tests"]) for x in Suites)),
+            failures=str(sum(1 for x in Suites for t in x["Tests"] if t["State"] == "failed")),
+            time=f"{sum(x['Seconds'] for x in Suites):.3f}")
+        for Suite in Suites:
+            SuiteElement = ET.SubElement(Root, "testsuite", name=Suite["Name"],
+                tests=str(len(Suite["Tests"])),
+                failures=str(sum(1 for x in Suite["Tests"] if x["State"] == "failed")),
+                skipped=str(sum(1 for x in Suite["Tests"] if x["State"] == "skipped")),
+                time=f"{Suite['Seconds']:.3f}")
+            for Test in Suite["Tests"]:
+                Case = ET.SubElement(SuiteElement, "testcase", classname=Suite["Name"], name=Test["Name"], time=f"{Test['Seconds']:.3f}")
+                if Test["State"] == "failed":
+                    ET.SubElement(Case, "failure", message=Test["Message"].split("\n")[0]).text = Test["Message"]
+                elif Test["State"] == "skipped":
+                    ET.SubElement(Case, "skipped")
+            ET.SubElement(SuiteElement, "system-out").text = Suite["Log"]
+
+        ReportPath.parent.mkdir(parents=True, exist_ok=True)
+        ET.ElementTree(Root).write(ReportPath, encoding="utf-8", xml_declaration=True)
+
+    def PrintSummary(self, Suites, ReportPath, Seconds):
+        print("--------------------------------")
+        print(f"{'Target':<32}{'Tests':>8}{'Failed':>8}{'Duration':>10}")
+        for Suite in Suites:
+            print(f"{Suite['Name']:<32}{len(Suite['Tests']):>8}{sum(1 for x in Suite['Tests'] if x['State'] == 'failed'):>8}{FormatSeconds(Suite['Seconds']):>10}")
+        print("--------------------------------")
+        print(f"Total : {FormatSeconds(Seconds)}, report {ReportPath}")
 
 class Test(Command):
     def _Execute(self, args):
@@ -674,6 +5073,423 @@ class LaunchUnrealInsightsTool(Command):
     def _Execute(self, args):
         LaunchUnrealInsights()
 
+class ShowStats(Command):
+    def _Execute(self, args):
+        History = RunHistory()
+        Threshold = float(args.get("threshold") or c.StatsSlowThreshold)
+        Last = int(args.get("last") or 100)
+        Commands = [args.get("name")] if args.get("name") else History.GetCommands()
+
+        for CommandName in Commands:
+            Runs = [x for x in History.GetRuns(CommandName, Last) if x["Wall"] is not None]
+            if len(Runs) == 0:
+                continue
+
+            Walls = [x["Wall"] for x in Runs]
+            Succeeded = [x["Wall"] for x in Runs if x["ExitCode"] == 0] or Walls
+            Median = Percentile(Succeeded, 50)
+            PeakRSS = [x["PeakRSS"] for x in Runs if x["PeakRSS"]]
+            CPU = [x["CPU"] for x in Runs if x["CPU"]]
+
+            print(f"{CommandName} - {len(Runs)} runs, {len(Runs) - len([x for x in Runs if x['ExitCode'] == 0])} failed")
+            print(f"    wall   p50 {FormatSeconds(Percentile(Walls, 50))}   p90 {FormatSeconds(Percentile(Walls, 90))}   p95 {FormatSeconds(Percentile(Walls, 95))}   max {FormatSeconds(max(Walls))}")
+            if len(CPU) > 0:
+                print(f"    cpu    p50 {FormatSeconds(Percentile(CPU, 50))}   max {FormatSeconds(max(CPU))}")
+            if len(PeakRSS) > 0:
+                print(f"    memory p50 {Percentile(PeakRSS, 50) / 2**20:.0f} MB   max {max(PeakRSS) / 2**20:.0f} MB")
+
+            # Trend - median of the last 5 runs against median of the older ones.
+            if len(Walls) >= 10:
+                Recent, Older = Percentile(Walls[-5:], 50), Percentile(Walls[:-5], 50)
+                print(f"    trend  last 5 runs {(Recent / Older - 1) * 100:+.1f}% against {len(Walls) - 5} older runs")
+
+            for Run in Runs:
+                if Run["Wall"] > Median * Threshold:
+                    Started = time.strftime('%Y-%m-%d %H:%M', time.localtime(Run["Started"]))
+                    Details = ", ".join(x for x in [Run["Configuration"], f"CL {Run['Changelist']}" if Run["Changelist"] else None, f"exit code {Run['ExitCode']}"] if x)
+                    print(f"    SLOW   {Started} {FormatSeconds(Run['Wall'])} ({Run['Wall'] / Median:.2f}x median, {Details})")
+
+        History.Close()
+
+class ControlDaemon(Command):
+    def _Execute(self, args):
+        Action = args.get("action") or "status"
+
+        if not hasattr(socket, "AF_UNIX"):
+            logging.getLogger().error("UEDT daemon requires Unix domain sockets, not supported by this Python.")
+            return 1
+
+        if Action == "run":
+            if SendDaemonRequest({"Control": "status"}, Timeout=1):
+                logging.getLogger().error("UEDT daemon is already running.")
+                return 1
+            Daemon(GetDaemonSocketPath()).Serve()
+
+        elif Action == "start":
+            Status = SendDaemonRequest({"Control": "status"}, Timeout=1) or [StartDaemon()]
+            if Status[0] is None:
+                logging.getLogger().error("UEDT daemon did not start, see UEDT.log.")
+                return 1
+            print(f"UEDT daemon {Status[0]['Pid']} running on {GetDaemonSocketPath()}")
+            print(f"Fast client : python {Daemon.GetClientPath()} <command>")
+
+        elif Action == "stop":
+            if SendDaemonRequest({"Control": "stop"}, Timeout=5) is None:
+                print("UEDT daemon is not running.")
+                return
+
+            # Daemon exits after its current command, wait for it to release the socket.
+            Deadline = time.monotonic() + 10
+            while GetDaemonSocketPath().exists() and time.monotonic() < Deadline:
+                time.sleep(0.05)
+            print("UEDT daemon stopped.")
+
+        elif Action == "status":
+            Status = SendDaemonRequest({"Control": "status"}, Timeout=5)
+            if not Status:
+                print("UEDT daemon is not running.")
+                return 1
+            Status = Status[0]
+            print(f"UEDT daemon {Status['Pid']} on {GetDaemonSocketPath()}")
+            print(f"Uptime : {FormatSeconds(Status['Uptime'])}, commands served : {Status['Served']}, idle : {FormatSeconds(Status['Idle'])}{', busy' if Status['Busy'] else ''}")
+
+# Launches the game several times on a fixed map, captures frame times of each run and compares them with a stored baseline.
+class PerformanceBenchmark(Command):
+    Metrics = ["Mean", "P95", "P99"]
+
+    def _Execute(self, args):
+        Map = args.get("map") or c.BenchmarkMap or (c.Maps[0] if len(c.Maps) > 0 else None)
+        if Map is None:
+            logging.getLogger().error("No benchmark map. Use --map, Config.BenchmarkMap or Config.Maps.")
+            return 1
+
+        Runs = int(args.get("runs") or c.BenchmarkRuns)
+        Frames = int(args.get("frames") or c.BenchmarkFrames)
+        BaselinePath = Path(args.get("baseline") or GetUEDTCacheDir() / "Benchmarks" / f"{Path(Map).name}.json")
+
+        Args = [
+            f"{str(Path(GetAssociatedEngineDir()) / 'Engine/Binaries/Win64/UnrealEditor.exe')}",
+            f"{str(Path(GetUProjectPath()))}",
+            Map,
+            "-game",
+            "-log",
+            "-windowed",
+            f"-resx={c.BenchmarkResolution[0]}",
+            f"-resy={c.BenchmarkResolution[1]}",
+            f"-csvCaptureFrames={Frames}",
+            "-csvExitOnCompletion",
+        ] + Launch.OptiArgs
+
+        Results = []
+        for Run in range(Runs):
+            logging.getLogger().info(f"Benchmark run {Run + 1}/{Runs} on {Map}, {Frames} frames...")
+            Start = time.time()
+            Result = RunProcess(Args, "benchmark", LogPrefix=f"[run {Run + 1}] ")
+            Captures = [x for x in GetCsvCaptures() if x.stat().st_mtime >= Start]
+            if not Result.OK or len(Captures) == 0:
+                logging.getLogger().error(f"Benchmark run {Run + 1} failed" + ("." if not Result.OK else f", no CSV capture written to {GetCsvCaptureDir()}."))
+                return Result.ReturnCode or 1
+
+            Report = CsvCaptureAnalyzer().Analyze(Captures[-1])
+            if not Report.get("FrameTime"):
+                logging.getLogger().error(f"Capture {Captures[-1]} has no frame times.")
+                return 1
+            Results.append({"Capture": str(Captures[-1]), "Frames": Report["Frames"], "Seconds": round(Result.Seconds, 3),
+                "Hitches": Report["FrameTime"]["Hitches"], **{x: Report["FrameTime"][x] for x in self.Metrics}})
+
+        Current = {"Map": Map, "Frames": Frames, "Time": time.time(), "Runs": Results,
+            "Changelist": perforceHandler.GetHaveChangelist() if c.HistoryRecordChangelist else None}
+
+        self.PrintRuns(Current)
+
+        Baseline = None
+        if BaselinePath.exists() and not args.get("save_baseline"):
+            with open(BaselinePath, 'r', encoding='utf-8') as File:
+                Baseline = json.load(File)
+
+        ExitCode = 0
+        if Baseline is not None:
+            ExitCode = self.Compare(Baseline, Current, BaselinePath)
+
+        if Baseline is None or args.get("save_baseline"):
+            BaselinePath.parent.mkdir(parents=True, exist_ok=True)
+            with open(BaselinePath, 'w', encoding='utf-8') as File:
+                json.dump(Current, File, indent=4)
+            logging.getLogger().info(f"Baseline saved to {BaselinePath}")
+
+        return ExitCode
+
+    def PrintRuns(self, Results):
+        print("--------------------------------")
+        print(f"{'Run':<6}{'Frames':>8}" + "".join(f"{x + ' ms':>12}" for x in self.Metrics) + f"{'Hitches':>10}")
+        for Index, Run in enumerate(Results["Runs"]):
+            print(f"{Index + 1:<6}{Run['Frames']:>8}" + "".join(f"{Run[x]:>12.2f}" for x in self.Metrics) + f"{sum(Run['Hitches'].values()):>10}")
+        for Metric in self.Metrics:
+            Mean, HalfWidth = GetConfidenceInterval([x[Metric] for x in Results["Runs"]], c.BenchmarkConfidence)
+            Interval = f" +- {HalfWidth:.2f}" if HalfWidth is not None else ""
+            print(f"{Metric:<6} {Mean:.2f}{Interval} ms ({c.BenchmarkConfidence * 100:.0f}% confidence)")
+        print("--------------------------------")
+
+    # @ret - 1 if any metric regressed significantly.
+    def Compare(self, Baseline, Current, BaselinePath):
+        import statistics
+        Alpha = 1.0 - c.BenchmarkConfidence
+        Regressed = []
+
+        print(f"Baseline : {BaselinePath} ({len(Baseline['Runs'])} runs" + (f", changelist {Baseline['Changelist']}" if Baseline.get("Changelist") else "") + ")")
+        print(f"{'Metric':<8}{'Base ms':>10}{'New ms':>10}{'Change':>10}{'p-value':>10}")
+        for Metric in self.Metrics:
+            Base = [x[Metric] for x in Baseline["Runs"]]
+            New = [x[Metric] for x in Current["Runs"]]
+            BaseMean, NewMean = statistics.fmean(Base), statistics.fmean(New)
+            Change = (NewMean - BaseMean) / BaseMean * 100 if BaseMean else 0.0
+            PValue = WelchTestGreater(Base, New)
+            Significant = PValue is not None and PValue < Alpha and Change >= c.BenchmarkMinRegression
+            if Significant:
+                Regressed.append(Metric)
+            print(f"{Metric:<8}{BaseMean:>10.2f}{NewMean:>10.2f}{Change:>9.1f}%{(f'{PValue:.4f}' if PValue is not None else 'n/a'):>10}{'  REGRESSION' if Significant else ''}")
+
+        if len(Regressed) > 0:
+            logging.getLogger().error(f"Significant frame time regression ({', '.join(Regressed)}), p < {Alpha:.2f} and at least {c.BenchmarkMinRegression}% slower.")
+            return 1
+        logging.getLogger().info("No significant regression.")
+        return 0
+
+# Queries of the asset dependency graph: what maps pull into the cook, largest packages and packages no map references.
+class QueryAssets(Command):
+    def _Execute(self, args):
+        Graph = AssetGraph()
+        Start = time.time()
+        Read = Graph.Update(args.get("jobs"), Full=args.get("rescan"))
+        logging.getLogger().info(f"Asset graph : {len(Graph.Packages)} packages, {Read} read in {FormatSeconds(time.time() - Start)}.")
+
+        Unparsed = [x for x, Info in Graph.Packages.items() if Info["Error"] is not None]
+        if len(Unparsed) > 0:
+            logging.getLogger().info(f"{len(Unparsed)} package headers could not be parsed and were scanned for package names, eg. {Unparsed[0]} ({Graph.Packages[Unparsed[0]]['Error']}).")
+
+        Top = int(args.get("top") or 20)
+
+        if args.get("referencers"):
+            PackageName = args.get("referencers")
+            Hard = Graph.GetReferencers([PackageName], Soft=False)
+            for Referencer in sorted(Graph.GetReferencers([PackageName])):
+                print(Referencer if Referencer in Hard else f"{Referencer} (soft)")
+            return 0
+
+        Maps = [x.strip() for x in args.get("map").split(",")] if args.get("map") else c.Maps
+        Resolved = {}
+        for Map in Maps:
+            Resolved[Map] = Graph.FindMap(Map)
+            if Resolved[Map] is None:
+                logging.getLogger().error(f"Map {Map} not found in the asset graph.")
+                return 1
+
+        if args.get("unreferenced"):
+            Roots = set(Resolved.values()) | {x for x in Graph.Packages if any(x.startswith(Root) for Root in c.AssetRoots)}
+            Unreferenced = sorted(set(Graph.Packages) - Graph.GetClosure(Roots), key=lambda x: -Graph.Packages[x]["Size"])
+            print(f"Unreferenced : {len(Unreferenced)} packages, {FormatBytes(Graph.GetSize(Unreferenced))}, not reachable from {', '.join(Maps) or 'any map'}")
+            for PackageName in Unreferenced[:Top]:
+                print(f"    {FormatBytes(Graph.Packages[PackageName]['Size']):>10}  {PackageName}")
+            return 0
+
+        Union = set()
+        for Map, PackageName in Resolved.items():
+            Closure = Graph.GetClosure([PackageName])
+            Union |= Closure
+            print(f"{Map} : {len(Closure)} packages, {FormatBytes(Graph.GetSize(Closure))}")
+            for Dependency in sorted(Closure, key=lambda x: -Graph.Packages[x]["Size"])[:Top]:
+                print(f"    {FormatBytes(Graph.Packages[Dependency]['Size']):>10}  {Dependency}")
+        if len(Resolved) > 1:
+            print(f"All maps : {len(Union)} packages, {FormatBytes(Graph.GetSize(Union))} of {FormatBytes(Graph.GetSize(Graph.Packages))} in the project")
+
+class CsvReport(Command):
+    def _Execute(self, args):
+        CsvPath = args.get("csv")
+        if CsvPath is None:
+            Captures = GetCsvCaptures()
+            if len(Captures) == 0:
+                logging.getLogger().error(f"No CSV captures in {GetCsvCaptureDir()}.")
+                return 1
+            CsvPath = Captures[-1]
+
+        try:
+            AnalyzeCsvCapture(CsvPath, args.get("baseline"))
+        except (OSError, ValueError) as e:
+            logging.getLogger().error(f"Cannot analyze {CsvPath}. {e}")
+            return 1
+
+class ShowProjectInfo(Command):
+    def _Execute(self, args):
+        Context = GetProjectContext()
+
+        try:
+            EngineDir = str(Context.EngineDir)
+        except (SystemExit, TypeError, NotImplementedError):
+            EngineDir = "<unresolved>"
+
+        print(f"Project : {Context.ProjectName}")
+        print(f"UProject : {Context.UProjectPath}")
+        print(f"Engine Association : {Context.EngineAssociation}")
+        print(f"Engine : {EngineDir}")
+
+class Benchmark(Command):
+    def _Execute(self, args):
+        Suites = {
+            "context": self.BenchProjectContext,
+            "p4": self.BenchPerforceBatch,
+            "daemon": self.BenchDaemon,
+            "csv": self.BenchCsvCapture,
+        }
+
+        Suite = args.get("suite") or "context"
+        Iterations = int(args.get("iterations") or 10)
+
+        if Suite not in Suites:
+            print(f"Unknown benchmark suite \"{Suite}\". Available suites {list(Suites.keys())}")
+            return
+
+        Suites[Suite](Iterations)
+
+    def Report(self, Name, Timings):
+        Timings = sorted(Timings)
+        Median = Timings[len(Timings) // 2]
+        print(f"{Name:<24} median {Median * 1000:10.3f} ms   min {Timings[0] * 1000:10.3f} ms   ({len(Timings)} runs)")
+
+    def Measure(self, Iterations, Setup, Function):
+        Timings = []
+        for _ in range(Iterations):
+            Setup()
+            Start = time.perf_counter()
+            Function()
+            Timings.append(time.perf_counter() - Start)
+        return Timings
+
+    def BenchProjectContext(self, Iterations):
+        ProjectDir = GetProjectDir()
+        CachePath = ProjectContext.GetCachePath(ProjectDir)
+
+        def LegacyWalk():
+            for root, dirs, files in os.walk(ProjectDir):
+                for file in files:
+                    if file.endswith(".uproject"):
+                        return Path(os.path.join(root, file))
+
+        def Resolve():
+            Context = GetProjectContext()
+            try:
+                Context.EngineDir
+            except (SystemExit, TypeError, NotImplementedError):
+                pass
+
+        def Cold():
+            ResetProjectContext()
+            if CachePath.exists():
+                CachePath.unlink()
+
+        def Warm():
+            ResetProjectContext()
+
+        self.Report("legacy os.walk lookup", self.Measure(Iterations, lambda: None, LegacyWalk))
+        self.Report("cold resolution", self.Measure(Iterations, Cold, Resolve))
+        self.Report("warm resolution (disk)", self.Measure(Iterations, Warm, Resolve))
+        self.Report("memoized resolution", self.Measure(Iterations, lambda: None, Resolve))
+
+    # Stand-in for p4. Costs per call and per file approximate a remote server.
+    FakeP4Script = """
+import sys, time
+Args = sys.argv[1:]
+Files = [x for x in sys.stdin.read().splitlines() if x] if "-x" in Args else Args[Args.index("edit") + 1:]
+time.sleep(0.1 + 0.0002 * len(Files))
+sys.stdout.write("".join(f"{x} - opened for edit\\n" for x in Files))
+"""
+
+    # Latency of a trivial command executed directly, through the daemon and the daemon dispatch alone.
+    def BenchDaemon(self, Iterations):
+        if not hasattr(socket, "AF_UNIX"):
+            print("UEDT daemon requires Unix domain sockets, not supported by this Python.")
+            return
+
+        Script = os.path.realpath(__file__)
+        Direct = dict(os.environ, UEDT_NO_DAEMON="1")
+        Command = [sys.executable, Script, "info"]
+
+        self.Report("direct", self.Measure(Iterations, lambda: None, lambda: subprocess.run(Command, env=Direct, capture_output=True, cwd=GetProjectDir())))
+
+        Started = not SendDaemonRequest({"Control": "status"}, Timeout=1)
+        if Started and StartDaemon() is None:
+            print("UEDT daemon did not start, see UEDT.log.")
+            return
+
+        try:
+            self.Report("daemon via UEDT.py", self.Measure(Iterations, lambda: None, lambda: subprocess.run(Command, capture_output=True, cwd=GetProjectDir())))
+            ClientCommand = [sys.executable, str(Daemon.GetClientPath()), "info"]
+            self.Report("daemon thin client", self.Measure(Iterations, lambda: None, lambda: subprocess.run(ClientCommand, capture_output=True, cwd=GetProjectDir())))
+            self.Report("daemon dispatch", self.Measure(Iterations, lambda: None, lambda: SendDaemonRequest({"Args": ["info"]})))
+            self.Report("python startup", self.Measure(Iterations, lambda: None, lambda: subprocess.run([sys.executable, "-c", "pass"])))
+        finally:
+            if Started:
+                SendDaemonRequest({"Control": "stop"}, Timeout=5)
+
+    # Analysis of a synthetic capture, numpy and pure Python.
+    def BenchCsvCapture(self, Iterations):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as TempDir:
+            CsvPath = Path(TempDir) / "Synthetic.csv"
+            CsvCaptureAnalyzer.WriteSyntheticCapture(CsvPath, 20000, Stats=200)
+            print(f"Synthetic capture : 20000 frames, 204 stats, {FormatBytes(CsvPath.stat().st_size)}")
+
+            Analyzer = CsvCaptureAnalyzer()
+            if Analyzer.Numpy is not None:
+                self.Report("numpy", self.Measure(Iterations, lambda: None, lambda: Analyzer.Analyze(CsvPath)))
+            else:
+                print("numpy not installed, skipping vectorized analysis.")
+            Analyzer = CsvCaptureAnalyzer(UseNumpy=False)
+            self.Report("python", self.Measure(Iterations, lambda: None, lambda: Analyzer.Analyze(CsvPath)))
+
+    def BenchPerforceBatch(self, Iterations):
+        import tempfile
+
+        FileCount = 10000
+
+        with tempfile.TemporaryDirectory() as TempDir:
+            ScriptPath = Path(TempDir) / "fake_p4.py"
+            ScriptPath.write_text(self.FakeP4Script)
+
+            if platform.uname().system == "Windows":
+                FakeP4 = Path(TempDir) / "p4.bat"
+                FakeP4.write_text(f'@"{sys.executable}" "{ScriptPath}" %*\n')
+            else:
+                FakeP4 = Path(TempDir) / "p4"
+                FakeP4.write_text(f"#!/bin/sh\nexec '{sys.executable}' '{ScriptPath}' \"$@\"\n")
+                FakeP4.chmod(0o755)
+
+            FilesDir = Path(TempDir) / "Content Folder"
+            FilesDir.mkdir()
+            Files = [FilesDir / f"Asset {i}.uasset" for i in range(FileCount)]
+            for file in Files:
+                file.touch()
+
+            Settings = (c.P4Executable, c.P4ServerAddress, c.P4User, c.P4Ticket, c.P4Workspace, c.P4BatchSize, c.P4Jobs)
+            c.P4Executable, c.P4ServerAddress, c.P4User, c.P4Ticket, c.P4Workspace = str(FakeP4), "", "", "", ""
+
+            def Legacy():
+                try:
+                    HandleCommand([str(FakeP4), "edit"] + [str(x) for x in Files], Timeout=c.P4Timeout)
+                except OSError as e:
+                    print(f"legacy single command line failed: {e}")
+
+            try:
+                self.Report(f"legacy ({FileCount} files)", self.Measure(Iterations, lambda: None, Legacy))
+                for BatchSize, Jobs in [(500, 1), (500, 4), (1000, 8)]:
+                    c.P4BatchSize, c.P4Jobs = BatchSize, Jobs
+                    Result = perforceHandler.EditFiles(-1, Files)
+                    if len(Result.Files) != FileCount or not Result.OK:
+                        print(f"batched edit returned {len(Result.GetFailed())} failures for {len(Result.Files)} files")
+                    self.Report(f"batch {BatchSize} x {Jobs} jobs", self.Measure(Iterations, lambda: None, lambda: perforceHandler.EditFiles(-1, Files)))
+            finally:
+                c.P4Executable, c.P4ServerAddress, c.P4User, c.P4Ticket, c.P4Workspace, c.P4BatchSize, c.P4Jobs = Settings
+
 #endregion
 
 #region Commands
@@ -684,35 +5500,171 @@ class LaunchUnrealInsightsTool(Command):
 commands = [
     ["build", Build, "Build project.",   
         [
-            ["--configuration", "Override default configuration"],
-            ["--c", "Override default configuration"],
+            ["--configuration", "Override default configuration. Comma separated list builds several configurations concurrently, eg. Development,Test,Shipping"],
+            ["--c", "Override default configuration. Comma separated list builds several configurations concurrently, eg. Development,Test,Shipping"],
+            ["--force", "Rebuild even if the staged build is up to date.", {"action": "store_true"}],
+            ["--shards", f"Cook Config.Maps in this many cook processes (default: {c.CookShards}). Single configuration builds only."],
+        ]
+    ],
+    ["store", Store, "Deduplicate staged builds in a content-addressed store.",
+        [
+            ["action", "ingest - store staged builds and link them to the store, gc - remove unreferenced blobs, report - print disk usage and savings.", {"choices": ["ingest", "gc", "report"], "nargs": "?"}],
+            ["--configuration", "Comma separated staged configurations to ingest (default: all staged configurations)."],
+            ["--c", "Comma separated staged configurations to ingest (default: all staged configurations)."],
+            ["--jobs", "Number of hashing threads (default: number of CPU cores)."],
+            ["--dry-run", "Only report what gc would remove.", {"action": "store_true"}],
+        ]
+    ],
+    ["diff", CreatePatch, "Create a patch with changed chunks between two staged builds.",
+        [
+            ["--old", "Old build, staged configuration name or folder."],
+            ["--new", "New build, staged configuration name or folder."],
+            ["--output", "Patch file path (default: <new build folder name>.uedtpatch)."],
+            ["--chunk-size", f"Chunk size in bytes (default: {c.PatchChunkSize})."],
+            ["--jobs", "Number of hashing threads (default: number of CPU cores)."],
+        ]
+    ],
+    ["patch", ApplyPatch, "Apply a patch created by 'diff' to a build in place.",
+        [
+            ["--patch", "Patch file path."],
+            ["--target", "Build to patch, staged configuration name or folder."],
+            ["--jobs", "Number of hashing threads (default: number of CPU cores)."],
+            ["--dry-run", "Only verify the target build.", {"action": "store_true"}],
+        ]
+    ],
+    ["analyzeLog", AnalyzeBuildLog, "Analyze a recorded BuildCookRun log and write a build report.",
+        [
+            ["--log", "Path to the log file."],
+            ["--output", "Path to the report file (default: next to the log)."],
+        ]
+    ],
+    ["clean", Clean, "Clean project by removing Binaries folder, Intermediate folder and some Saved folders.",
+        [
+            ["--mode", "Deletion mode. 'serial' - one folder at a time, 'parallel' - delete files on a thread pool, 'trash' - move folders to .uedt-trash and delete them in background.", {"choices": ["serial", "parallel", "trash"]}],
+            ["--jobs", "Number of deletion threads (default: number of CPU cores)."],
+        ]
+    ],
+    ["emptyTrash", EmptyTrash, "Delete folders moved to .uedt-trash by 'clean --mode trash'.",
+        [
+            ["--batch", "Delete a single trash batch only."],
+            ["--jobs", "Number of deletion threads (default: number of CPU cores)."],
         ]
     ],
-    ["clean", Clean, "Clean project by removing Binaries folder, Intermediate folder and some Saved folders.", []],
     ["compile", Compile, "Compile project using MSBuild tool.", 
         [
             ["--configuration", "Override default configuration (available: Development, Shipping)"],
             ["--c", "Override default configuration (available: Development, Shipping)"],
+            ["--targets", f"Comma separated targets, Editor, Game, Client, Server or full target names (default: {c.CompilationTargets})."],
+            ["--timing", "Collect compile times of modules, translation units and headers.", {"action": "store_true"}],
+            ["--top", "Number of slowest modules, translation units and headers listed (default: 10)."],
         ]
     ],
     ["launch", Launch, "Launch the game. Optionally set an apropriate launch mode.",
         [
             ["--mode", f"Set a launch mode. Available modes {[e.name for e in LaunchMode]}"],
-            ["-m", f"Set a launch mode. Available modes {[e.name for e in LaunchMode]}"]
+            ["-m", f"Set a launch mode. Available modes {[e.name for e in LaunchMode]}"],
+            ["--attach", "Wait for the game and print its log.", {"action": "store_true"}],
+            ["--category", "Attached mode. Comma separated log categories to show, '-Category' hides a category."],
+            ["--verbosity", f"Attached mode. Least severe verbosity to show (available: {', '.join(LogFilter.Verbosities)}).", {"choices": LogFilter.Verbosities}],
+            ["--csvprofile", "Record a CsvProfiler capture, wait for the game and analyze the capture.", {"action": "store_true"}],
+            ["--frames", "CSV profiling. Number of frames to capture (default: until the game exits)."],
+            ["--baseline", "CSV profiling. Capture or report to compare the new capture with."],
         ]
     ],
     ["ui", LaunchUnrealInsightsTool, "Launch UnrealInsights tool.", []],
     ["rebuildlight", RebuildLighting, "Rebuild Lighting", []],
-    ["cook", CookProject, "Cook content (for shipping build testing).", []],
-    ["validate", DataValidator, 'Invoke DataValidation command, data validation plugin enabled required for this to run.', []],
+    ["cook", CookProject, "Cook content (for shipping build testing).",
+        [
+            ["--shards", f"Cook Config.Maps in this many cook processes, merged into Saved/Cooked/{c.CookPlatform} (default: {c.CookShards})."],
+            ["--full", "Cook shards from scratch instead of iteratively.", {"action": "store_true"}],
+        ]
+    ],
+    ["validate", DataValidator, 'Invoke DataValidation command, data validation plugin enabled required for this to run.',
+        [
+            ["--full", "Validate the whole project, not only packages changed since the last successful validation.", {"action": "store_true"}],
+            ["--changelist", "Validate packages opened in a Perforce changelist (number or \"default\")."],
+        ]
+    ],
     ["showChangelist", ShowChangelist, 'Returns changelist number of a registered repository.', []],
     ["gauntlet", GauntletTest, 'Run Gauntlet automation test. Requires \'target\' argument.',
         [
-            ["--target", "Provide a name of a test to execute."]
+            ["--target", "Provide a name of a test to execute. Multiple tests can be separated by comma, eg. \"BootTest,SmokeTest\"."],
+            ["--c", f"Build configuration of the tested build (default: {c.GauntletConfiguration})."],
+            ["--jobs", f"Maximum number of tests running at once, only with Config.GauntletParallelUAT. Otherwise tests run one at a time (default: {c.GauntletMaxJobs})."],
+            ["--report", "JUnit report path (default: Saved/UEDT/Gauntlet/Results.xml)."],
+            ["--skip-build", "Test the existing staged build without checking whether it is up to date.", {"action": "store_true"}],
+            ["--rebuild", "Rebuild even if the staged build is up to date.", {"action": "store_true"}],
+        ]
+    ],
+    ["fixBinaryPermissions", FixBinaryPermissions, 'Set all dll and pdb file permissions to read-write',
+        [
+            ["--full", "Ignore the index of already fixed files and check every file.", {"action": "store_true"}],
         ]
     ],
-    ["fixBinaryPermissions", FixBinaryPermissions, 'Set all dll and pdb file permissions to read-write', []],
     ["test", Test, 'Sandbox test command. Does what you tell it.', []],
+    ["stats", ShowStats, 'Print run time statistics of recorded commands and flag slow runs.',
+        [
+            ["--name", "Show a single command only."],
+            ["--last", "Number of most recent runs to analyze (default: 100)."],
+            ["--threshold", f"Flag runs slower than median * threshold (default: {c.StatsSlowThreshold})."],
+        ]
+    ],
+    ["pipeline", Pipeline, 'Run commands as a dependency graph, independent steps run in parallel.',
+        [
+            ["--file", "Path to a pipeline JSON file."],
+            ["--steps", "Space separated steps \"name[:dependency,dependency]\", eg. \"compile cook:compile validate:cook rebuildlight:compile\". Overrides steps of --file."],
+            ["--set", "Set a step option, eg. gauntlet.target=BootTest. Can be repeated.", {"action": "append"}],
+            ["--jobs", "Maximum number of steps running at once (default: number of steps)."],
+            ["--keep-going", "Keep running independent steps after a step fails.", {"action": "store_true"}],
+        ]
+    ],
+    ["benchmark", PerformanceBenchmark, 'Launch the game several times on a benchmark map and compare frame times with a baseline.',
+        [
+            ["--map", "Benchmark map (default: Config.BenchmarkMap or the first of Config.Maps)."],
+            ["--runs", f"Number of game launches (default: {c.BenchmarkRuns})."],
+            ["--frames", f"Frames captured per run (default: {c.BenchmarkFrames})."],
+            ["--baseline", "Baseline file (default: Saved/UEDT/Benchmarks/<Map>.json)."],
+            ["--save-baseline", "Store results of this benchmark as the baseline.", {"action": "store_true"}],
+        ]
+    ],
+    ["prune", Prune, 'Evict least recently used DerivedDataCache and Intermediate entries until they fit their size budgets.',
+        [
+            ["--dry-run", "Report what would be evicted without deleting anything.", {"action": "store_true"}],
+            ["--tree", "Prune a single tree of Config.PruneTrees, eg. \"DerivedDataCache\"."],
+            ["--budget", "Budget in GB, overrides the budgets of Config.PruneTrees."],
+            ["--top", "Number of largest evicted entries listed in a dry run (default: 10)."],
+            ["--rescan", "Query every file again instead of reusing the usage index of unchanged directories.", {"action": "store_true"}],
+            ["--jobs", f"Number of worker threads, 0 - number of CPU cores (default: {c.PruneJobs})."],
+        ]
+    ],
+    ["assets", QueryAssets, 'Query the asset dependency graph: packages pulled in by maps, largest contributors, unreferenced packages.',
+        [
+            ["--map", "Comma separated maps, package names or short names (default: Config.Maps)."],
+            ["--top", "Number of largest packages listed (default: 20)."],
+            ["--unreferenced", "List packages not reachable from the maps or Config.AssetRoots.", {"action": "store_true"}],
+            ["--referencers", "List packages directly referencing a package, soft references are marked (soft)."],
+            ["--rescan", "Read all package headers again.", {"action": "store_true"}],
+            ["--jobs", "Number of package headers read at once."],
+        ]
+    ],
+    ["csvreport", CsvReport, 'Analyze a CsvProfiler capture, optionally compared with a baseline capture.',
+        [
+            ["--csv", "Capture to analyze (default: newest capture in Saved/Profiling/CSV)."],
+            ["--baseline", "Capture or report (.report.json) to compare with."],
+        ]
+    ],
+    ["info", ShowProjectInfo, 'Print resolved project and engine paths.', []],
+    ["daemon", ControlDaemon, 'Control the UEDT daemon executing commands of this project without starting a new process.',
+        [
+            ["action", "start - start in background, stop, status, run - run in foreground.", {"choices": ["start", "stop", "status", "run"], "nargs": "?"}],
+        ]
+    ],
+    ["bench", Benchmark, 'Measure UEDT internals.',
+        [
+            ["--suite", "Benchmark suite to run (available: context, p4, daemon, csv)."],
+            ["--iterations", "Number of measured runs per case."],
+        ]
+    ],
 ]
 #endregion Commands
 
@@ -722,33 +5674,17 @@ commands = [
 """
 
 if __name__ == '__main__':
-    parser = argparse.ArgumentParser(description="Unreal Engine Development Tool")
+    # Commands go to a running daemon before anything else is set up, see Daemon.
+    if len(sys.argv) > 1 and sys.argv[1] not in ("daemon", "-h", "--help"):
+        ExitCode = RunDaemonClient(sys.argv[1:])
+        if ExitCode is not None:
+            sys.exit(ExitCode)
 
     logging.basicConfig(filename='UEDT.log', encoding='utf-8', level=logging.INFO)
     logging.getLogger().addHandler(logging.StreamHandler(sys.stdout))
 
-    CommandHelp = '\n'.join([f"{command[0]} - {command[2]}" for command in commands])
-
-    subparsers = parser.add_subparsers(dest='command')
-
-    for command in commands:
-        command_paraser = subparsers.add_parser(command[0], help=command[2])
-        subcommands = command[3]
-        if len(subcommands) > 0:
-            for subcommand in subcommands:
-                command_paraser.add_argument(subcommand[0], help=subcommand[1])
-    
+    parser = CreateArgumentParser()
     args = parser.parse_args()
 
-    CommandToExecute = None
-
-    for command in commands:
-        if args.command == command[0]:
-            CommandToExecute = command[1]
-            break
-
-    if CommandToExecute is not None:
-        CommandToExecute(vars(args))
-    else:
-        logging.getLogger().info(f'No such command "{args.command}"')
+    sys.exit(ExecuteCommand(args))
 #endregion Entry
@@ -0,0 +1,40 @@
+import os
+import sys
+import json
+import textwrap
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import UEDT
+
+
+@pytest.fixture
+def Project(tmp_path, monkeypatch):
+    ProjectDir = tmp_path / "Game"
+    EngineDir = tmp_path / "Engine"
+    ProjectDir.mkdir()
+    (ProjectDir / "Game.uproject").write_text(json.dumps({"EngineAssociation": "5.3"}))
+
+    monkeypatch.setattr(UEDT, "GetProjectDir", lambda: ProjectDir)
+    monkeypatch.setattr(UEDT, "GetUProjectPath", lambda: ProjectDir / "Game.uproject")
+    monkeypatch.setattr(UEDT, "GetProjectName", lambda: "Game")
+    monkeypatch.setattr(UEDT, "GetAssociatedEngineDir", lambda: EngineDir)
+    monkeypatch.setattr(UEDT.c, "BuildStagingDir", str(tmp_path / "Staging"))
+    monkeypatch.setenv("UEDT_NO_DAEMON", "1")
+    UEDT.processCache.clear()
+    return ProjectDir
+
+
+# Writes an executable stand-in for an engine tool. Body is Python run with the tool arguments in sys.argv.
+def WriteTool(ToolPath, Body):
+    ToolPath = Path(ToolPath)
+    ToolPath.parent.mkdir(parents=True, exist_ok=True)
+    ToolPath.write_text(f"#!{sys.executable}\n" + textwrap.dedent(Body))
+    ToolPath.chmod(0o755)
+    return ToolPath
+
+
+requires_posix = pytest.mark.skipif(os.name == "nt", reason="Stand-in tools are executable scripts.")
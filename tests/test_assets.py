@@ -0,0 +1,74 @@
+import struct
+
+import pytest
+
+import UEDT
+
+
+def FString(Text):
+    Data = Text.encode("latin-1") + b"\0"
+    return struct.pack("<i", len(Data)) + Data
+
+
+# Editor package header: summary, name table, import table and soft package references, laid out as PackageSummaryReader expects.
+def WritePackage(FilePath, PackageName, Imports=(), SoftReferences=(), UE4Version=522, UE5Version=1012):
+    Names = ["None", "/Script/CoreUObject", "Package", PackageName] + list(Imports) + list(SoftReferences)
+    Index = {x: i for i, x in enumerate(Names)}
+
+    def Summary(NameOffset, ImportOffset, SoftOffset):
+        Data = struct.pack("<Iiiiii", UEDT.PackageSummaryReader.Tag, -8, 864, UE4Version, UE5Version, 0)
+        if UE5Version >= 1016:
+            Data += b"\0" * 20 + struct.pack("<i", 0) # SavedHash, TotalHeaderSize
+        Data += struct.pack("<i", 0) # Custom versions
+        if UE5Version < 1016:
+            Data += struct.pack("<i", 0)
+        Data += FString(PackageName) + struct.pack("<I", 0) + struct.pack("<ii", len(Names), NameOffset)
+        Data += struct.pack("<ii", 0, 0) # Soft object paths
+        Data += FString("") # Localization id
+        Data += struct.pack("<ii", 0, 0) # Gatherable text
+        Data += struct.pack("<iiii", 0, 0, len(Imports), ImportOffset)
+        if UE5Version >= 1015:
+            Data += struct.pack("<iiii", 0, 0, 0, 0)
+        if UE5Version >= 1014:
+            Data += struct.pack("<i", 0)
+        Data += struct.pack("<i", 0) # DependsOffset
+        Data += struct.pack("<ii", len(SoftReferences), SoftOffset)
+        return Data
+
+    NameTable = b"".join(FString(x) + struct.pack("<I", 0) for x in Names)
+    # ClassPackage, ClassName, OuterIndex, ObjectName, PackageName, bImportOptional
+    ImportTable = b"".join(struct.pack("<10i", Index["/Script/CoreUObject"], 0, Index["Package"], 0, 0, Index[x], 0, 0, 0, 0) for x in Imports)
+    SoftTable = b"".join(struct.pack("<ii", Index[x], 0) for x in SoftReferences)
+
+    NameOffset = len(Summary(0, 0, 0))
+    ImportOffset = NameOffset + len(NameTable)
+    SoftOffset = ImportOffset + len(ImportTable)
+    FilePath.parent.mkdir(parents=True, exist_ok=True)
+    FilePath.write_bytes(Summary(NameOffset, ImportOffset, SoftOffset) + NameTable + ImportTable + SoftTable + b"\0" * 64)
+
+
+@pytest.mark.parametrize("UE5Version", [1012, 1017])
+def test_streaming_sublevel_is_cooked_with_its_map(Project, monkeypatch, capsys, UE5Version):
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    monkeypatch.setattr(UEDT.c, "AssetRoots", [])
+    Content = Project / "Content"
+    WritePackage(Content / "Maps/Main.umap", "/Game/Maps/Main", ["/Game/Props/Rock"], ["/Game/Maps/Main_Audio"], UE5Version=UE5Version)
+    WritePackage(Content / "Maps/Main_Audio.umap", "/Game/Maps/Main_Audio", ["/Game/Props/Tree"], UE5Version=UE5Version)
+    WritePackage(Content / "Props/Rock.uasset", "/Game/Props/Rock", UE5Version=UE5Version)
+    WritePackage(Content / "Props/Tree.uasset", "/Game/Props/Tree", UE5Version=UE5Version)
+    WritePackage(Content / "Props/Unused.uasset", "/Game/Props/Unused", UE5Version=UE5Version)
+
+    Graph = UEDT.AssetGraph(Project)
+    Graph.Update()
+    Main = Graph.Packages["/Game/Maps/Main"]
+    assert (Main["Dependencies"], Main["SoftDependencies"], Main["Error"]) == (["/Game/Props/Rock"], ["/Game/Maps/Main_Audio"], None)
+    assert Graph.GetClosure(["/Game/Maps/Main"]) == {"/Game/Maps/Main", "/Game/Maps/Main_Audio", "/Game/Props/Rock", "/Game/Props/Tree"}
+    assert Graph.GetClosure(["/Game/Maps/Main"], Soft=False) == {"/Game/Maps/Main", "/Game/Props/Rock"}
+
+    assert UEDT.QueryAssets({"command": "assets", "map": "Main", "unreferenced": True}).ExitCode == 0
+    Output = capsys.readouterr().out
+    assert "/Game/Props/Unused" in Output
+    assert "/Game/Props/Tree" not in Output and "/Game/Maps/Main_Audio" not in Output
+
+    assert UEDT.QueryAssets({"command": "assets", "referencers": "/Game/Maps/Main_Audio"}).ExitCode == 0
+    assert capsys.readouterr().out.splitlines() == ["/Game/Maps/Main (soft)"]
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+
+def test_incomplete_beta_known_values():
+    assert UEDT.IncompleteBeta(1.0, 1.0, 0.3) == pytest.approx(0.3)
+    assert UEDT.IncompleteBeta(3.0, 1.0, 0.5) == pytest.approx(0.125)
+    assert UEDT.IncompleteBeta(2.0, 2.0, 0.5) == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("DegreesOfFreedom, Quantile", [(1, 12.7062), (4, 2.7764), (9, 2.2622), (30, 2.0423)])
+def test_student_t_quantiles(DegreesOfFreedom, Quantile):
+    assert UEDT.StudentTQuantile(0.975, DegreesOfFreedom) == pytest.approx(Quantile, abs=1e-4)
+    assert UEDT.StudentTCdf(Quantile, DegreesOfFreedom) == pytest.approx(0.975, abs=1e-5)
+    assert UEDT.StudentTCdf(-Quantile, DegreesOfFreedom) == pytest.approx(0.025, abs=1e-5)
+    assert UEDT.StudentTCdf(0.0, DegreesOfFreedom) == pytest.approx(0.5)
+
+
+def test_confidence_interval():
+    Mean, HalfWidth = UEDT.GetConfidenceInterval([1.0, 2.0, 3.0, 4.0, 5.0], 0.95)
+    assert Mean == 3.0
+    assert HalfWidth == pytest.approx(2.7764 * (2.5 / 5) ** 0.5, abs=1e-4)
+    assert UEDT.GetConfidenceInterval([4.0], 0.95) == (4.0, None)
+
+
+def test_welch_test():
+    # t = 2 with 8 degrees of freedom.
+    assert UEDT.WelchTestGreater([1, 2, 3, 4, 5], [3, 4, 5, 6, 7]) == pytest.approx(0.0403, abs=1e-4)
+    assert UEDT.WelchTestGreater([3, 4, 5, 6, 7], [1, 2, 3, 4, 5]) == pytest.approx(0.9597, abs=1e-4)
+    assert UEDT.WelchTestGreater([1.0], [2.0, 3.0]) is None
+
+
+# Stand-in game: writes a synthetic capture of -csvCaptureFrames frames around FAKE_FRAME_TIME ms, then exits.
+GameBody = """
+import os, sys, time
+sys.path.insert(0, os.environ["UEDT_DIR"])
+import UEDT
+Frames = int(next(x for x in sys.argv if x.startswith("-csvCaptureFrames=")).split("=", 1)[1])
+CaptureDir = os.path.join(os.path.dirname(sys.argv[1]), "Saved", "Profiling", "CSV")
+os.makedirs(CaptureDir, exist_ok=True)
+Seed = time.time_ns()
+UEDT.CsvCaptureAnalyzer.WriteSyntheticCapture(os.path.join(CaptureDir, f"Profile({Seed}).csv"), Frames, Stats=2,
+    FrameTime=float(os.environ["FAKE_FRAME_TIME"]), HitchEvery=0, Seed=Seed)
+"""
+
+
+@requires_posix
+def test_benchmark_against_baseline(Project, tmp_path, monkeypatch):
+    WriteTool(tmp_path / "Engine/Engine/Binaries/Win64/UnrealEditor.exe", GameBody)
+    monkeypatch.setenv("UEDT_DIR", str(UEDT.Path(UEDT.__file__).parent))
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    monkeypatch.setattr(UEDT.c, "HistoryRecordChangelist", False)
+
+    def Benchmark(FrameTime, **kwargs):
+        monkeypatch.setenv("FAKE_FRAME_TIME", str(FrameTime))
+        return UEDT.PerformanceBenchmark({"command": "benchmark", "map": "/Game/Maps/Bench", "runs": 5, "frames": 300, **kwargs}).ExitCode
+
+    BaselinePath = Project / "Saved/UEDT/Benchmarks/Bench.json"
+    assert Benchmark(16.6) == 0
+    Baseline = json.loads(BaselinePath.read_text())
+    assert len(Baseline["Runs"]) == 5 and all(x["Frames"] == 300 for x in Baseline["Runs"])
+    assert Baseline["Runs"][0]["Mean"] == pytest.approx(16.6, rel=0.02)
+
+    assert Benchmark(16.6) == 0
+    assert Benchmark(20.0) == 1
+    # The baseline is kept unless it is replaced explicitly.
+    assert json.loads(BaselinePath.read_text()) == Baseline
+    assert Benchmark(20.0, save_baseline=True) == 0
+    assert Benchmark(20.0) == 0
@@ -0,0 +1,136 @@
+import sys
+import time
+import threading
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+# Stand-in tool: records when it ran and with which arguments, then sleeps.
+ToolBody = """
+import sys, time, json, os
+Start = time.time()
+time.sleep(float(os.environ.get("TOOL_SLEEP", "0.3")))
+for Argument in sys.argv:
+    if Argument.startswith("-stagingdirectory="):
+        os.makedirs(Argument.split("=", 1)[1], exist_ok=True)
+with open(os.environ["TOOL_LOG"], "a") as File:
+    File.write(json.dumps([os.path.basename(sys.argv[0]), sys.argv[1:], Start, time.time()]) + "\\n")
+"""
+
+
+def ReadRuns(LogPath):
+    import json
+    Runs = {}
+    for Line in LogPath.read_text().splitlines():
+        Tool, Args, Start, End = json.loads(Line)
+        if Tool == "Build.bat":
+            Name = "compile " + ("Editor" if Args[0] == "GameEditor" else Args[2].replace("Shipping", "Release"))
+        elif Tool == "UnrealEditor-Cmd.exe":
+            Name = "cook " + ("Release" if "-skipeditorcontent" in Args else "Default")
+        else:
+            Name = "stage " + next(x for x in Args if x.startswith("-stagingdirectory=")).rsplit("/", 1)[-1]
+        Runs[Name] = (Start, End)
+    return Runs
+
+
+def Overlap(A, B):
+    return A[0] < B[1] and B[0] < A[1]
+
+
+@requires_posix
+def test_build_configurations_schedule(Project, tmp_path, monkeypatch):
+    EngineDir = UEDT.GetAssociatedEngineDir()
+    for Tool in ["Engine/Build/BatchFiles/Build.bat", "Engine/Build/BatchFiles/RunUAT.bat", "Engine/Binaries/Win64/UnrealEditor-Cmd.exe"]:
+        WriteTool(EngineDir / Tool, ToolBody)
+    LogPath = tmp_path / "tools.log"
+    monkeypatch.setenv("TOOL_LOG", str(LogPath))
+    monkeypatch.setattr(UEDT.c, "Maps", ["Main"])
+    monkeypatch.setattr(UEDT.c, "BuildMaxJobs", 3)
+    monkeypatch.setattr(UEDT.c, "BuildStepResources", {"compile": (0.5, 10), "cook": (0.5, 10), "stage": (0.125, 10)})
+
+    Builder = UEDT.Build.__new__(UEDT.Build)
+    assert Builder.BuildConfigurations(["Development", "Test", "Release"]) == 0
+
+    Runs = ReadRuns(LogPath)
+    assert set(Runs) == {"compile Editor", "compile Development", "compile Test", "compile Release",
+        "cook Default", "cook Release", "stage Development", "stage Test", "stage Release"}
+
+    # Dependencies: cooks after the editor compile, stages after their compile and cook.
+    for Cook in ["cook Default", "cook Release"]:
+        assert Runs[Cook][0] >= Runs["compile Editor"][1]
+    for Configuration, Variant in [("Development", "Default"), ("Test", "Default"), ("Release", "Release")]:
+        assert Runs[f"stage {Configuration}"][0] >= Runs[f"compile {Configuration}"][1]
+        assert Runs[f"stage {Configuration}"][0] >= Runs[f"cook {Variant}"][1]
+
+    # Locks: UBT, cook and AutomationTool runs never overlap.
+    for Prefix in ["compile", "cook", "stage"]:
+        Group = [x for x in Runs if x.startswith(Prefix)]
+        assert not any(Overlap(Runs[a], Runs[b]) for a in Group for b in Group if a < b), Prefix
+
+    # Resource limits: at most BuildMaxJobs steps and a CPU share of 1 at once, but steps do overlap.
+    Cores = {"compile": 0.5, "cook": 0.5, "stage": 0.125}
+    Points = sorted(x[0] + 1e-3 for x in Runs.values())
+    Running = [[x for x in Runs if Runs[x][0] <= Point < Runs[x][1]] for Point in Points]
+    assert max(len(x) for x in Running) <= 3
+    assert max(sum(Cores[x.split()[0]] for x in Group) for Group in Running) <= 1.0 + 1e-6
+    assert max(len(x) for x in Running) > 1
+
+
+def test_scheduler_memory_budget_and_dependencies():
+    Intervals = {}
+    Lock = threading.Lock()
+
+    def Run(Name):
+        def Step():
+            Start = time.perf_counter()
+            time.sleep(0.05)
+            with Lock:
+                Intervals[Name] = (Start, time.perf_counter())
+        return Step
+
+    Scheduler = UEDT.TaskScheduler(MaxJobs=4, FailFast=False, MemoryMB=1000)
+    Scheduler.Add(UEDT.Task("a", Run("a"), MemoryMB=600))
+    Scheduler.Add(UEDT.Task("b", Run("b"), MemoryMB=600))
+    Scheduler.Add(UEDT.Task("c", Run("c"), MemoryMB=100))
+    Scheduler.Add(UEDT.Task("d", Run("d"), Requires=["a", "c"], MemoryMB=100))
+    Scheduler.Run()
+
+    assert all(x.State == "done" for x in Scheduler.Tasks.values())
+    assert not Overlap(Intervals["a"], Intervals["b"])
+    assert Intervals["d"][0] >= max(Intervals["a"][1], Intervals["c"][1])
+
+
+def test_scheduler_skips_dependents_of_failed_task():
+    Scheduler = UEDT.TaskScheduler(MaxJobs=2, FailFast=False)
+    Scheduler.Add(UEDT.Task("a", lambda: 3))
+    Scheduler.Add(UEDT.Task("b", lambda: 0, Requires=["a"]))
+    Scheduler.Add(UEDT.Task("c", lambda: 0, After=["a"]))
+    Scheduler.Run()
+
+    assert Scheduler.Tasks["a"].State == "failed" and Scheduler.Tasks["a"].ExitCode == 3
+    assert Scheduler.Tasks["b"].State == "skipped"
+    assert Scheduler.Tasks["c"].State == "done"
+
+
+@requires_posix
+def test_fail_fast_kills_running_steps(tmp_path):
+    Scheduler = UEDT.TaskScheduler(MaxJobs=3, FailFast=True, MemoryMB=0)
+    Sleep = [sys.executable, "-c", "import time; time.sleep(60)"]
+    Scheduler.Add(UEDT.Task("cook", lambda: UEDT.RunProcess(Sleep).ReturnCode))
+    Scheduler.Add(UEDT.Task("after cook", lambda: 0, Requires=["cook"]))
+
+    # Nested scheduler, eg. build step running its configurations, is cancelled with the outer one.
+    def Nested():
+        Inner = UEDT.TaskScheduler(MaxJobs=1, FailFast=False, MemoryMB=0)
+        Inner.Add(UEDT.Task("inner cook", lambda: UEDT.RunProcess(Sleep).ReturnCode))
+        return 0 if Inner.Run() else 1
+    Scheduler.Add(UEDT.Task("build", Nested))
+    Scheduler.Add(UEDT.Task("validate", lambda: time.sleep(0.5) or 1))
+
+    Start = time.monotonic()
+    assert not Scheduler.Run()
+    assert time.monotonic() - Start < 15
+    assert Scheduler.Tasks["validate"].State == "failed"
+    assert Scheduler.Tasks["cook"].State == "cancelled"
+    assert Scheduler.Tasks["build"].State == "cancelled"
+    assert Scheduler.Tasks["after cook"].State == "skipped"
@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+import UEDT
+
+FixtureLog = Path(__file__).parent / "fixtures" / "BuildCookRun.log"
+
+
+def test_recorded_log_report(tmp_path):
+    ReportPath = tmp_path / "Report.json"
+    assert UEDT.AnalyzeBuildLog({"command": "analyzeLog", "log": str(FixtureLog), "output": str(ReportPath)}).ExitCode == 0
+    Report = json.loads(ReportPath.read_text())
+
+    assert Report["TotalSeconds"] == 61.0
+    assert Report["Lines"] == 15
+    assert [(x["Name"], x["Seconds"], x["Warnings"], x["Errors"]) for x in Report["Phases"]] == [
+        ("compile", 19.0, 3, 0), ("cook", 29.0, 1, 1), ("stage", 4.0, 0, 0), ("pak", 5.0, 0, 0)]
+
+    Warnings = Report["Warnings"]
+    assert (Warnings["Count"], Warnings["Unique"]) == (4, 3)
+    assert Warnings["ByCategory"]["C4996"] == {"Count": 2, "Messages": [{"Message": "'strcpy': This function may be unsafe.", "Count": 2}]}
+    assert Warnings["ByCategory"]["-Wunused-variable"]["Messages"][0]["Message"] == "unused variable 'Ammo'"
+    assert Warnings["ByCategory"]["LogCook"]["Count"] == 1
+    assert Report["Errors"]["ByCategory"] == {"LogBlueprint": {"Count": 1, "Messages": [{"Message": "Node is not connected", "Count": 1}]}}
+
+
+def test_merge_of_split_build():
+    Lines = FixtureLog.read_text().splitlines()
+    Split = next(i for i, x in enumerate(Lines) if "COOK COMMAND STARTED" in x)
+    First, Second = UEDT.BuildLogAnalyzer(), UEDT.BuildLogAnalyzer()
+    for Line in Lines[:Split]:
+        First.AnalyzeLine(Line)
+    for Line in Lines[Split:]:
+        Second.AnalyzeLine(Line)
+    First.Merge(Second)
+
+    Whole = UEDT.BuildLogAnalyzer()
+    for Line in Lines:
+        Whole.AnalyzeLine(Line)
+    assert First.GetReport() == Whole.GetReport()
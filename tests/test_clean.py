@@ -0,0 +1,71 @@
+import os
+
+import UEDT
+from conftest import requires_posix
+
+
+def MakeTree(Root, Depth=3, Width=3):
+    Files = 0
+    for Index in range(Width):
+        (Root / f"{Index}.bin").parent.mkdir(parents=True, exist_ok=True)
+        (Root / f"{Index}.bin").write_bytes(b"x" * 100)
+        Files += 1
+        if Depth > 1:
+            Files += MakeTree(Root / f"Dir{Index}", Depth - 1, Width)
+    return Files
+
+
+def MakeBuildOutputs(ProjectDir):
+    for Root in (ProjectDir, ProjectDir / "Plugins/Tool"):
+        MakeTree(Root / "Binaries", 2)
+        MakeTree(Root / "Intermediate", 2)
+        MakeTree(Root / "Saved/Autosaves", 1)
+        (Root / "Content").mkdir(parents=True)
+        (Root / "Content/Map.umap").write_text("map")
+    (ProjectDir / "Game.sln").write_text("sln")
+
+
+@requires_posix
+def test_remove_trees_parallel_does_not_follow_links(tmp_path):
+    Files = MakeTree(tmp_path / "Tree")
+    MakeTree(tmp_path / "Outside", 1)
+    os.symlink(tmp_path / "Outside", tmp_path / "Tree/Dir0/Link")
+    LinkSize = os.lstat(tmp_path / "Tree/Dir0/Link").st_size
+    # Read-only files are removed as well.
+    os.chmod(tmp_path / "Tree/Dir1/0.bin", 0o444)
+
+    Stats = UEDT.RemoveTreesParallel([tmp_path / "Tree"], Jobs=4)
+    assert not (tmp_path / "Tree").exists()
+    assert len(os.listdir(tmp_path / "Outside")) == 3
+    assert (Stats.Files, Stats.Bytes, Stats.Errors) == (Files + 1, Files * 100 + LinkSize, 0)
+    assert Stats.Dirs == 1 + 3 + 9
+
+
+def test_clean_parallel(Project, monkeypatch):
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    MakeBuildOutputs(Project)
+
+    assert UEDT.Clean({"command": "clean", "mode": "parallel", "jobs": 2}).ExitCode == 0
+    for Root in (Project, Project / "Plugins/Tool"):
+        assert not (Root / "Binaries").exists() and not (Root / "Intermediate").exists() and not (Root / "Saved/Autosaves").exists()
+        assert (Root / "Content/Map.umap").exists()
+    assert not (Project / "Game.sln").exists()
+
+
+def test_clean_trash_moves_folders_and_empties_them_later(Project, monkeypatch):
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    MakeBuildOutputs(Project)
+    Started = []
+    monkeypatch.setattr(UEDT, "FireAndForgetProcess", lambda Args: Started.append(Args))
+
+    assert UEDT.Clean({"command": "clean", "mode": "trash"}).ExitCode == 0
+    assert not (Project / "Binaries").exists() and not (Project / "Plugins/Tool/Intermediate").exists()
+    Batches = os.listdir(UEDT.GetTrashDir())
+    assert len(Batches) == 1 and len(os.listdir(UEDT.GetTrashDir() / Batches[0])) == 6
+
+    # Detached process emptying the batch.
+    Args = Started[0]
+    assert Args[2:5] == ["emptyTrash", "--batch", Batches[0]]
+    assert UEDT.EmptyTrash({"command": "emptyTrash", "batch": Batches[0], "jobs": 2}).ExitCode == 0
+    assert not UEDT.GetTrashDir().exists()
+    assert (Project / "Content/Map.umap").exists()
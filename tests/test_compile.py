@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+# Stand-in Build.bat: records its arguments, prints MSVC /Bt+ and /d1reportTime lines for every unit in units.json
+# and writes clang time traces listed in traces.json.
+BuildBody = """
+    import sys, json, pathlib
+    Dir = pathlib.Path(sys.argv[0]).parent
+    with open(Dir / "calls.txt", "a") as f:
+        f.write(json.dumps(sys.argv[1:]) + "\\n")
+    for Unit, Seconds in json.loads((Dir / "units.json").read_text()).items():
+        print(f"time(C:\\\\VS\\\\c1xx.dll)={Seconds}s < 5446953462 - 5448373766 > BB [{Unit}]")
+        print("Include Headers:")
+        print(f"\\t\\tC:\\\\Engine\\\\Source\\\\Runtime\\\\Core\\\\Public\\\\CoreMinimal.h: 0.5s")
+    for Trace, Total in json.loads((Dir / "traces.json").read_text()).items():
+        pathlib.Path(Trace).parent.mkdir(parents=True, exist_ok=True)
+        pathlib.Path(Trace).write_text(json.dumps({"traceEvents": [
+            {"name": "Source", "dur": 250000, "args": {"detail": "/Engine/Source/Runtime/Engine/Classes/Engine/World.h"}},
+            {"name": "Total ExecuteCompiler", "dur": int(Total * 1e6)}]}))
+    sys.exit(int((Dir / "exit.txt").read_text()))
+"""
+
+
+@pytest.fixture
+def Build(Project, tmp_path, monkeypatch):
+    ToolDir = tmp_path / "Engine/Engine/Build/BatchFiles"
+    WriteTool(ToolDir / "Build.bat", BuildBody)
+    monkeypatch.setattr(UEDT, "GetRegistryData", lambda RegistryPath: "C:/MSBuild")
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    monkeypatch.setattr(UEDT.c, "CompilationTargets", "Editor")
+    monkeypatch.setattr(UEDT.c, "CompilationConfiguration", "Development")
+
+    def Run(Units=None, Traces=None, ExitCode=0, **Args):
+        (ToolDir / "units.json").write_text(json.dumps(Units or {}))
+        (ToolDir / "traces.json").write_text(json.dumps(Traces or {}))
+        (ToolDir / "exit.txt").write_text(str(ExitCode))
+        return UEDT.Compile({"command": "compile", **Args}).ExitCode
+
+    def Calls():
+        return [json.loads(x) for x in (ToolDir / "calls.txt").read_text().splitlines()]
+
+    Run.Calls = Calls
+    return Run
+
+
+def Unit(Project, Module, Index, Target="GameEditor"):
+    return f"{Project}/Intermediate/Build/Win64/{Target}/Development/{Module}/Module.{Module}.{Index}.cpp"
+
+
+@requires_posix
+def test_compile_single_target(Project, Build):
+    assert Build() == 0
+    assert Build.Calls() == [["GameEditor", "Win64", "Development", str(Project / "Game.uproject"), "-WaitMutex"]]
+
+
+@requires_posix
+def test_compile_targets_in_one_run(Project, Build):
+    assert Build(targets="Editor,Game,GameBenchmark", c="Shipping") == 0
+    Calls = Build.Calls()
+    assert len(Calls) == 1
+    Project = str(Project / "Game.uproject")
+    assert Calls[0] == [f'-Target={x} Win64 Shipping -Project="{Project}"' for x in ("GameEditor", "Game", "GameBenchmark")] + ["-WaitMutex"]
+
+
+@requires_posix
+def test_compile_timing_reports_modules(Project, Build, capsys):
+    Units = {Unit(Project, "Game", 1): 4.0, Unit(Project, "Game", 2): 2.0, Unit(Project, "GameUI", 1): 1.5}
+    Traces = {f"{Project}/Plugins/Tool/Intermediate/Build/Linux/GameEditor/Development/Tool/Module.Tool.cpp.json": 3.0}
+    assert Build(Units, Traces, timing=True) == 0
+    assert Build.Calls()[0][-1] == "-Timing"
+
+    Report = json.loads((Project / "Saved/UEDT/CompileTiming.json").read_text())
+    assert Report["Targets"] == ["GameEditor"]
+    assert Report["Modules"] == {"Game": {"Seconds": 6.0, "Units": 2}, "Tool": {"Seconds": 3.0, "Units": 1}, "GameUI": {"Seconds": 1.5, "Units": 1}}
+    assert list(Report["Modules"]) == ["Game", "Tool", "GameUI"]
+    assert Report["Headers"]["C:/Engine/Source/Runtime/Core/Public/CoreMinimal.h"] == [3, 1.5]
+    assert Report["Headers"]["/Engine/Source/Runtime/Engine/Classes/Engine/World.h"] == [1, 0.25]
+    assert "Slowest modules (3 compiled):" in capsys.readouterr().out
+
+    History = UEDT.RunHistory()
+    assert [x["Seconds"] for x in History.GetModuleTimes("Game", "GameEditor", "Development", 2)] == [6.0]
+    History.Close()
+
+
+@requires_posix
+def test_compile_timing_flags_regressions(Project, Build, monkeypatch, capsys):
+    monkeypatch.setattr(UEDT.c, "CompileRegressionThreshold", 1.25)
+    monkeypatch.setattr(UEDT.c, "CompileRegressionMinSeconds", 5.0)
+    History = UEDT.RunHistory()
+    for Started, Seconds in enumerate([10.0, 11.0, 12.0]):
+        History.AddModuleTimes(Started, "GameEditor", "Development", {"Game": {"Seconds": Seconds, "Units": 1}, "GameUI": {"Seconds": 10.0, "Units": 1}})
+    # Different number of units, not comparable.
+    History.AddModuleTimes(5, "GameEditor", "Development", {"GameCore": {"Seconds": 1.0, "Units": 3}})
+    History.Close()
+
+    Units = {Unit(Project, "Game", 1): 20.0, Unit(Project, "GameUI", 1): 14.0, Unit(Project, "GameCore", 1): 20.0}
+    assert Build(Units, timing=True) == 0
+    Lines = capsys.readouterr().out.splitlines()
+    assert [x.split()[-4] for x in Lines if "REGRESSION" in x] == ["Game"]
+    assert any(x.endswith("Game  REGRESSION, median 11.00s") for x in Lines)
+
+
+@requires_posix
+def test_compile_timing_failed_build_is_not_recorded(Project, Build):
+    assert Build({Unit(Project, "Game", 1): 1.0}, ExitCode=3, timing=True) == 3
+    assert json.loads((Project / "Saved/UEDT/CompileTiming.json").read_text())["Modules"]["Game"]["Units"] == 1
+    History = UEDT.RunHistory()
+    assert History.GetModuleTimes("Game") == []
+    History.Close()
+
+
+def test_module_of_translation_units():
+    GetModule = UEDT.CompileTimingAnalyzer.GetModule
+    assert GetModule("C:/Game/Intermediate/Build/Win64/GameEditor/Development/GameUI/Module.GameUI.cpp") == "GameUI"
+    assert GetModule("C:/Game/Source/Game/Private/Actor.cpp") == "Game"
+    assert GetModule("C:/Engine/Source/Runtime/Core/Private/String.cpp") == "Core"
+    assert GetModule("C:/Other/File.cpp") == "Unknown"
@@ -0,0 +1,78 @@
+import os
+import json
+
+import pytest
+
+import UEDT
+
+
+@pytest.fixture
+def ProjectDir(tmp_path, monkeypatch):
+    (tmp_path / "Game.uproject").write_text(json.dumps({"EngineAssociation": "5.3"}))
+    monkeypatch.setattr(UEDT, "GetProjectDir", lambda: tmp_path)
+    monkeypatch.setattr(UEDT, "projectContext", None)
+    monkeypatch.setattr(UEDT.c, "EngineDir", "")
+    return tmp_path
+
+
+def CountCalls(monkeypatch, Name, Result=None):
+    Calls = []
+    Original = getattr(UEDT, Name)
+    def Counted(*Args):
+        Calls.append(Args)
+        return Result if Result is not None else Original(*Args)
+    monkeypatch.setattr(UEDT, Name, Counted)
+    return Calls
+
+
+def test_context_is_memoized_and_cached_on_disk(ProjectDir, monkeypatch):
+    Reads = CountCalls(monkeypatch, "ReadUProjectFile")
+
+    Context = UEDT.GetProjectContext()
+    assert UEDT.GetProjectContext() is Context
+    assert (Context.ProjectName, Context.EngineAssociation) == ("Game", "5.3")
+    assert UEDT.ProjectContext.GetCachePath(ProjectDir).is_file()
+
+    # A new invocation loads the cache instead of reading the uproject file.
+    UEDT.ResetProjectContext()
+    assert UEDT.GetProjectContext() is not Context
+    assert UEDT.GetProjectName() == "Game"
+    assert len(Reads) == 1
+
+    # A modified uproject file invalidates the cache.
+    UProject = ProjectDir / "Game.uproject"
+    UProject.write_text(json.dumps({"EngineAssociation": "5.4"}))
+    os.utime(UProject, ns=(os.stat(UProject).st_atime_ns, os.stat(UProject).st_mtime_ns + 10 ** 9))
+    UEDT.ResetProjectContext()
+    assert UEDT.GetProjectContext().EngineAssociation == "5.4"
+    assert len(Reads) == 2
+
+
+def test_engine_dir_is_resolved_lazily_once(ProjectDir, monkeypatch):
+    Lookups = CountCalls(monkeypatch, "ResolveEngineDir", Result=ProjectDir / "Engine")
+
+    Context = UEDT.ProjectContext.Resolve(ProjectDir)
+    assert Lookups == []
+    assert Context.EngineDir == ProjectDir / "Engine"
+    assert Context.EngineDir == ProjectDir / "Engine"
+    assert Lookups == [("5.3",)]
+
+    # Resolved engine dir is persisted with the context.
+    assert UEDT.ProjectContext.Resolve(ProjectDir).EngineDir == ProjectDir / "Engine"
+    assert len(Lookups) == 1
+
+    monkeypatch.setattr(UEDT.c, "EngineDir", str(ProjectDir / "Override"))
+    assert UEDT.ProjectContext.Resolve(ProjectDir).EngineDir == ProjectDir / "Override"
+    assert len(Lookups) == 1
+
+
+def test_only_top_level_uproject_is_found(tmp_path):
+    (tmp_path / "Plugins/Tool").mkdir(parents=True)
+    (tmp_path / "Plugins/Tool/Tool.uproject").write_text("{}")
+    assert UEDT.FindUProjectFile(tmp_path) is None
+    with pytest.raises(SystemExit):
+        UEDT.ProjectContext.Resolve(tmp_path)
+
+    (tmp_path / "B.uproject").write_text("{}")
+    (tmp_path / "A.uproject").write_text("{}")
+    assert UEDT.FindUProjectFile(tmp_path) == tmp_path / "A.uproject"
@@ -0,0 +1,96 @@
+import os
+import json
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+# Stand-in cook commandlet: writes a package per map and build-wide files listing the maps it cooked.
+CookBody = """
+import os, sys, json
+Args = sys.argv[1:]
+Maps = next(x for x in Args if x.startswith("-map=")).split("=", 1)[1].split("+")
+OutputDir = next((x.split("=", 1)[1] for x in Args if x.startswith("-OutputDir=")), None)
+with open(os.environ["TOOL_LOG"], "a") as File:
+    File.write(json.dumps(Args) + "\\n")
+for Map in Maps:
+    os.makedirs(os.path.join(OutputDir, "Game/Content/Maps"), exist_ok=True)
+    with open(os.path.join(OutputDir, "Game/Content/Maps", Map + ".umap"), "w") as File:
+        File.write(Map)
+os.makedirs(os.path.join(OutputDir, "Game/Metadata"), exist_ok=True)
+for RelPath in ("Game/AssetRegistry.bin", "Game/Metadata/DevelopmentAssetRegistry.bin"):
+    with open(os.path.join(OutputDir, RelPath), "w") as File:
+        File.write("+".join(sorted(Maps)))
+"""
+
+
+def WriteFile(Path, Text):
+    Path.parent.mkdir(parents=True, exist_ok=True)
+    Path.write_text(Text)
+
+
+def test_merge_refuses_differing_build_wide_files(tmp_path, monkeypatch):
+    for Index, Map in enumerate(("A", "B")):
+        WriteFile(tmp_path / f"Shard{Index}/Game/Content/Maps/{Map}.umap", Map)
+        WriteFile(tmp_path / f"Shard{Index}/Game/AssetRegistry.bin", Map)
+        WriteFile(tmp_path / f"Shard{Index}/Game/Content/ShaderArchive-Game-PCD3D_SM5.ushaderbytecode", "same")
+    Shards = [str(tmp_path / "Shard0"), str(tmp_path / "Shard1")]
+    Cooked = tmp_path / "Cooked"
+
+    Files, Updated, Duplicates, Conflicts = UEDT.MergeCookedShards(Shards, str(Cooked))
+    assert Conflicts == [os.path.join("Game", "AssetRegistry.bin")]
+    assert (Files, Updated) == (0, 0)
+    assert not Cooked.exists()
+
+    Files, Updated, Duplicates, Conflicts = UEDT.MergeCookedShards(Shards, str(Cooked), Strict=False)
+    assert (Files, Updated) == (3, 3)
+    assert (Cooked / "Game/Content/Maps/B.umap").read_text() == "B"
+    # Copies, later cooks write into the cooked tree in place.
+    assert not os.path.samefile(Cooked / "Game/Content/Maps/B.umap", tmp_path / "Shard1/Game/Content/Maps/B.umap")
+    assert UEDT.MergeCookedShards(Shards, str(Cooked), Strict=False)[:2] == (3, 0)
+
+    # Links left by merges of earlier versions are replaced.
+    os.unlink(Cooked / "Game/Content/Maps/A.umap")
+    os.link(tmp_path / "Shard0/Game/Content/Maps/A.umap", Cooked / "Game/Content/Maps/A.umap")
+    assert UEDT.MergeCookedShards(Shards, str(Cooked), Strict=False)[:2] == (3, 1)
+    assert not os.path.samefile(Cooked / "Game/Content/Maps/A.umap", tmp_path / "Shard0/Game/Content/Maps/A.umap")
+    assert (Cooked / "Game/Content/ShaderArchive-Game-PCD3D_SM5.ushaderbytecode").read_text() == "same"
+    assert not (Cooked / "Game/AssetRegistry.bin").exists()
+
+
+@requires_posix
+def test_cook_sharded_fails_on_registries_without_final_pass(Project, tmp_path, monkeypatch):
+    WriteTool(tmp_path / "Engine/Engine/Binaries/Win64/UnrealEditor-Cmd.exe", CookBody)
+    monkeypatch.setenv("TOOL_LOG", str(tmp_path / "tool.log"))
+    monkeypatch.setattr(UEDT.c, "Maps", ["A", "B"])
+
+    assert UEDT.CookSharded(2) == 1
+    assert len((tmp_path / "tool.log").read_text().splitlines()) == 2
+    assert not UEDT.GetCookedDir().exists()
+
+
+@requires_posix
+def test_cook_sharded_release(Project, tmp_path, monkeypatch):
+    WriteTool(tmp_path / "Engine/Engine/Binaries/Win64/UnrealEditor-Cmd.exe", CookBody)
+    monkeypatch.setenv("TOOL_LOG", str(tmp_path / "tool.log"))
+    monkeypatch.setattr(UEDT.c, "Maps", ["A", "B", "C"])
+    monkeypatch.setattr(UEDT.c, "CookShardFinalPass", True)
+
+    # Left over by an earlier run with more shards, cooked by shard 0 now.
+    WriteFile(Project / f"Saved/UEDT/CookShards/Shard3/{UEDT.c.CookPlatform}/Game/Content/Maps/A.umap", "stale")
+
+    assert UEDT.CookSharded(2, "Release", Iterative=False) == 0
+
+    Runs = [json.loads(x) for x in (tmp_path / "tool.log").read_text().splitlines()]
+    assert len(Runs) == 3
+    assert all("-skipeditorcontent" in x for x in Runs)
+    assert all("-iterate" not in x for x in Runs[:2])
+    Final = Runs[2]
+    assert "-map=A+B+C" in Final and "-iterate" in Final
+    assert f"-OutputDir={UEDT.GetCookedDir()}" in Final
+
+    Cooked = UEDT.GetCookedDir()
+    assert (Cooked / "Game/Content/Maps/A.umap").read_text() == "A"
+    assert (Cooked / "Game/AssetRegistry.bin").read_text() == "A+B+C"
+    # The final pass must not write through links into shard outputs.
+    Shard0 = Project / f"Saved/UEDT/CookShards/Shard0/{UEDT.c.CookPlatform}/Game/AssetRegistry.bin"
+    assert Shard0.read_text() != "A+B+C"
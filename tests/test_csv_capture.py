@@ -0,0 +1,63 @@
+import pytest
+
+import UEDT
+
+Header = "FrameTime,GameThreadTime,EVENTS"
+Footer = "[HasHeaderRowAtEnd],1,[platform],Windows,[config],Development"
+
+
+def WriteCapture(CsvPath, Rows):
+    CsvPath.write_text("\n".join([Header] + Rows + [Header, Footer]) + "\n")
+    return CsvPath
+
+
+@pytest.mark.parametrize("UseNumpy", [True, False])
+def test_known_values(tmp_path, UseNumpy):
+    # Frame times 10..100 ms, game thread at half, a missing value and an event column.
+    Rows = [f"{x * 10},{x * 5}," + ("Hitch" if x == 10 else "") for x in range(1, 11)]
+    Rows[2] = "30,,"
+    CsvPath = WriteCapture(tmp_path / "Known.csv", Rows)
+
+    Analyzer = UEDT.CsvCaptureAnalyzer(ChunkRows=3, UseNumpy=UseNumpy)
+    Report = Analyzer.Analyze(CsvPath)
+
+    assert Report["Frames"] == 10
+    assert Report["Metadata"] == {"HasHeaderRowAtEnd": "1", "platform": "Windows", "config": "Development"}
+    assert Report["Stats"]["FrameTime"] == {"Mean": 55.0, "Max": 100.0}
+    assert Report["Stats"]["GameThreadTime"]["Mean"] == pytest.approx((275 - 15) / 9)
+    assert "EVENTS" not in Report["Stats"]
+
+    FrameTime = Report["FrameTime"]
+    assert (FrameTime["Mean"], FrameTime["Max"]) == (55.0, 100.0)
+    assert FrameTime["P50"] == pytest.approx(55.0)
+    assert FrameTime["P90"] == pytest.approx(91.0)
+    assert FrameTime["P99"] == pytest.approx(99.1)
+    assert FrameTime["Hitches"] == {"33.3": 7, "50.0": 5, "100.0": 0}
+
+
+def test_numpy_and_python_agree_on_synthetic_capture(tmp_path):
+    pytest.importorskip("numpy")
+    CsvPath = tmp_path / "Synthetic.csv"
+    UEDT.CsvCaptureAnalyzer.WriteSyntheticCapture(CsvPath, 2000, Stats=10, FrameTime=16.6, HitchEvery=500)
+
+    Vectorized = UEDT.CsvCaptureAnalyzer(ChunkRows=256).Analyze(CsvPath)
+    Python = UEDT.CsvCaptureAnalyzer(ChunkRows=256, UseNumpy=False).Analyze(CsvPath)
+
+    assert Vectorized["Frames"] == Python["Frames"] == 2000
+    assert Vectorized["FrameTime"]["Hitches"] == Python["FrameTime"]["Hitches"]
+    assert Python["FrameTime"]["Hitches"]["50.0"] == 4
+    for Key in ("Mean", "Max", "P50", "P95", "P99"):
+        assert Vectorized["FrameTime"][Key] == pytest.approx(Python["FrameTime"][Key], rel=1e-4)
+    assert Vectorized["FrameTime"]["P50"] == pytest.approx(16.6, rel=0.02)
+    for Name, Stat in Python["Stats"].items():
+        assert Vectorized["Stats"][Name]["Mean"] == pytest.approx(Stat["Mean"], rel=1e-6)
+
+
+def test_comparison_report(tmp_path, capsys):
+    Base = UEDT.CsvCaptureAnalyzer(UseNumpy=False).Analyze(WriteCapture(tmp_path / "Base.csv", [f"{x},{x}," for x in (10, 10, 10, 10)]))
+    New = UEDT.CsvCaptureAnalyzer(UseNumpy=False).Analyze(WriteCapture(tmp_path / "New.csv", [f"{x},{x}," for x in (10, 10, 10, 70)]))
+    UEDT.CsvCaptureAnalyzer.PrintComparison(Base, New)
+    Lines = capsys.readouterr().out.splitlines()
+
+    assert next(x for x in Lines if x.startswith("FrameTime Mean")).split() == ["FrameTime", "Mean", "10.00", "25.00", "150.0%"]
+    assert next(x for x in Lines if x.startswith("Hitches > 50.0 ms")).split()[-2:] == ["0", "1"]
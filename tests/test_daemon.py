@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import subprocess
+
+import pytest
+
+import UEDT
+from conftest import requires_posix
+
+pytestmark = [requires_posix, pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Daemon requires Unix domain sockets.")]
+
+
+class ProbeContext(UEDT.Command):
+    def _Execute(self, args):
+        UEDT.processCache.setdefault("Probe.exe", []).append(None)
+        print(json.dumps({"Cwd": os.getcwd(), "P4CLIENT": os.environ.get("P4CLIENT"), "Cached": len(UEDT.processCache["Probe.exe"])}))
+
+
+class ProbeHang(UEDT.Command):
+    def _Execute(self, args):
+        Script = f"import os, time; open({args.get('pid_file')!r}, 'w').write(str(os.getpid())); print('started', flush=True); time.sleep(60)"
+        return UEDT.RunProcess([sys.executable, "-c", Script]).ReturnCode
+
+
+class ProbeRaise(UEDT.Command):
+    Runs = 0
+
+    def _Execute(self, args):
+        ProbeRaise.Runs += 1
+        raise RuntimeError("probe failure")
+
+
+@pytest.fixture
+def RunningDaemon(Project, monkeypatch):
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    monkeypatch.setattr(UEDT, "commands", UEDT.commands + [
+        ["probe", ProbeContext, "", []],
+        ["hang", ProbeHang, "", [["--pid-file", ""]]],
+        ["raise", ProbeRaise, "", []],
+    ])
+    ProbeRaise.Runs = 0
+    monkeypatch.delenv("UEDT_NO_DAEMON")
+    Server = UEDT.Daemon(UEDT.GetDaemonSocketPath())
+    Thread = threading.Thread(target=Server.Serve, daemon=True)
+    Thread.start()
+    Deadline = time.monotonic() + 10
+    while not UEDT.SendDaemonRequest({"Control": "status"}, Timeout=1) and time.monotonic() < Deadline:
+        time.sleep(0.02)
+    yield Server
+    UEDT.SendDaemonRequest({"Control": "stop"}, Timeout=5)
+    Thread.join(10)
+
+
+# Stand-in for UEDTClient.py: sends a request with its own context and collects the output.
+def SendCommand(Argv, Cwd, Env):
+    Messages = UEDT.SendDaemonRequest({"Args": Argv, "Cwd": str(Cwd), "Env": Env}, Timeout=30)
+    Output = "".join(x.get("Output", "") for x in Messages)
+    return next(x["Exit"] for x in Messages if "Exit" in x), Output
+
+
+def test_commands_run_in_client_context(RunningDaemon, tmp_path):
+    DaemonCwd = os.getcwd()
+    for Client in ("first", "second"):
+        (tmp_path / Client).mkdir()
+        ExitCode, Output = SendCommand(["probe"], tmp_path / Client, dict(os.environ, P4CLIENT=Client))
+        Probe = json.loads(Output.strip().splitlines()[-1])
+        assert ExitCode == 0
+        assert Probe == {"Cwd": str(tmp_path / Client), "P4CLIENT": Client, "Cached": 1}
+
+    assert os.getcwd() == DaemonCwd
+    assert "P4CLIENT" not in os.environ or os.environ["P4CLIENT"] not in ("first", "second")
+
+
+def test_client_hangup_kills_command(RunningDaemon, tmp_path):
+    PidFile = tmp_path / "hang.pid"
+    Client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    Client.connect(str(UEDT.GetDaemonSocketPath()))
+    Client.sendall((json.dumps({"Args": ["hang", "--pid-file", str(PidFile)], "Cwd": str(tmp_path), "Env": dict(os.environ)}) + "\n").encode())
+    Deadline = time.monotonic() + 10
+    # Created before the pid is written.
+    while not (PidFile.exists() and PidFile.read_text()) and time.monotonic() < Deadline:
+        time.sleep(0.02)
+    Pid = int(PidFile.read_text())
+    Client.close() # Ctrl-C of the client.
+
+    Deadline = time.monotonic() + 10
+    while RunningDaemon.Lock.locked() and time.monotonic() < Deadline:
+        time.sleep(0.05)
+    assert not RunningDaemon.Lock.locked()
+    with pytest.raises(ProcessLookupError):
+        os.kill(Pid, 0)
+
+
+def test_failed_command_is_not_run_again(RunningDaemon, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert UEDT.RunDaemonClient(["raise"]) == 1
+    assert ProbeRaise.Runs == 1
+
+    # Generated thin client, falling back would run UEDT.py locally and fail with a usage error instead.
+    Client = subprocess.run([sys.executable, str(UEDT.Daemon.GetClientPath()), "raise"], cwd=tmp_path, capture_output=True, timeout=60)
+    assert Client.returncode == 1
+    assert ProbeRaise.Runs == 2
+    assert RunningDaemon.Served == 2
+
+
+def test_busy_daemon_runs_command_locally(RunningDaemon, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with RunningDaemon.Lock:
+        assert UEDT.RunDaemonClient(["probe"]) is None
+    assert RunningDaemon.Served == 0
+
+
+# Latency benchmark: dispatch of a trivial command by a socket client against starting an interpreter.
+def test_dispatch_latency(RunningDaemon, tmp_path):
+    Env = dict(os.environ)
+    Daemon = []
+    for _ in range(20):
+        Start = time.perf_counter()
+        ExitCode, _ = SendCommand(["probe"], tmp_path, Env)
+        Daemon.append(time.perf_counter() - Start)
+        assert ExitCode == 0
+
+    Startup = []
+    for _ in range(5):
+        Start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        Startup.append(time.perf_counter() - Start)
+
+    Daemon.sort()
+    Startup.sort()
+    print(f"daemon dispatch median {Daemon[len(Daemon) // 2] * 1000:.3f} ms, python startup median {Startup[len(Startup) // 2] * 1000:.3f} ms")
+    assert Daemon[len(Daemon) // 2] < Startup[len(Startup) // 2]
@@ -0,0 +1,78 @@
+import os
+import json
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+# Stand-in RunUAT: records its arguments and creates the staged build.
+UATBody = """
+import os, sys, json
+with open(os.environ["TOOL_LOG"], "a") as File:
+    File.write(json.dumps(sys.argv[1:]) + "\\n")
+os.makedirs(next(x for x in sys.argv if x.startswith("-stagingdirectory=")).split("=", 1)[1], exist_ok=True)
+"""
+
+
+def WriteFile(FilePath, Text):
+    FilePath.parent.mkdir(parents=True, exist_ok=True)
+    FilePath.write_text(Text)
+
+
+def test_hash_files_reuses_unchanged_entries(tmp_path):
+    WriteFile(tmp_path / "Source/Game.cpp", "code")
+    WriteFile(tmp_path / "Source/Intermediate/Generated.h", "generated")
+    Files = UEDT.HashFiles(tmp_path, [tmp_path / "Source"], SkipDirs={"Intermediate"})
+    assert list(Files) == ["Source/Game.cpp"]
+
+    # Size and mtime match, the recorded hash is trusted without reading the file.
+    Previous = {"Source/Game.cpp": Files["Source/Game.cpp"][:2] + ["recorded"]}
+    assert UEDT.HashFiles(tmp_path, [tmp_path / "Source"], Previous)["Source/Game.cpp"][2] == "recorded"
+    os.utime(tmp_path / "Source/Game.cpp", (1, 1))
+    assert UEDT.HashFiles(tmp_path, [tmp_path / "Source"], Previous)["Source/Game.cpp"] == [4, 10**9, Files["Source/Game.cpp"][2]]
+
+    # Fingerprints depend on paths and content only.
+    assert UEDT.GetFingerprint(Files) == UEDT.GetFingerprint(UEDT.HashFiles(tmp_path, [tmp_path / "Source"], SkipDirs={"Intermediate"}))
+
+
+@requires_posix
+def test_build_mode_follows_changed_inputs(Project, tmp_path, monkeypatch):
+    WriteTool(tmp_path / "Engine/Engine/Build/BatchFiles/RunUAT.bat", UATBody)
+    LogPath = tmp_path / "uat.log"
+    monkeypatch.setenv("TOOL_LOG", str(LogPath))
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    monkeypatch.setattr(UEDT.c, "StoreAutoIngest", False)
+    monkeypatch.setattr(UEDT.c, "Maps", ["Main"])
+    WriteFile(Project / "Source/Game/Game.cpp", "code")
+    WriteFile(Project / "Content/Maps/Main.umap", "map")
+    WriteFile(Project / "Plugins/Tool/Source/Tool.cpp", "tool")
+
+    def Build(**kwargs):
+        if LogPath.exists():
+            LogPath.unlink()
+        assert UEDT.Build({"command": "build", "c": "Development", **kwargs}).ExitCode == 0
+        Runs = [json.loads(x) for x in LogPath.read_text().splitlines()] if LogPath.exists() else []
+        if len(Runs) == 0:
+            return "uptodate"
+        return "content" if "-iterativecooking" in Runs[0] else "full" if "-fullrebuild" in Runs[0] else "?"
+
+    assert Build() == "full"
+    assert Build() == "uptodate"
+
+    os.utime(Project / "Content/Maps/Main.umap", (1, 1)) # Touched, not changed.
+    assert Build() == "uptodate"
+    WriteFile(Project / "Content/Maps/Main.umap", "map v2")
+    assert Build() == "content"
+    monkeypatch.setattr(UEDT.c, "Maps", ["Main", "Arena"])
+    assert Build() == "content"
+
+    WriteFile(Project / "Plugins/Tool/Source/Tool.cpp", "tool v2")
+    assert Build() == "full"
+    WriteFile(Project / "Config/DefaultGame.ini", "[/Script/EngineSettings.GeneralProjectSettings]")
+    assert Build() == "full"
+    # Build outputs of plugins are not inputs.
+    WriteFile(Project / "Plugins/Tool/Binaries/Win64/Tool.dll", "binary")
+    assert Build() == "uptodate"
+
+    assert Build(force=True) == "full"
+    UEDT.shutil.rmtree(UEDT.GetBuildStagingDir("Development"))
+    assert Build() == "full"
@@ -0,0 +1,42 @@
+import json
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+# Stand-in RunUAT: records its run, arguments and mutex mode, then sleeps.
+UATBody = """
+import os, sys, time, json
+Start = time.time()
+time.sleep(0.5)
+with open(os.environ["TOOL_LOG"], "a") as File:
+    File.write(json.dumps([sys.argv[1:], os.environ.get("uebp_UATMutexNoWait"), Start, time.time()]) + "\\n")
+"""
+
+
+def RunGauntlet(Project, tmp_path, monkeypatch, Parallel):
+    WriteTool(tmp_path / "Engine/Engine/Build/BatchFiles/RunUAT.bat", UATBody)
+    monkeypatch.setenv("TOOL_LOG", str(tmp_path / "uat.log"))
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    monkeypatch.setattr(UEDT.c, "GauntletParallelUAT", Parallel)
+    UEDT.GetBuildStagingDir("Development").mkdir(parents=True)
+
+    ExitCode = UEDT.GauntletTest({"command": "gauntlet", "target": "BootTest,SmokeTest", "skip_build": True, "jobs": 2}).ExitCode
+    assert ExitCode == 0
+    return [json.loads(x) for x in (tmp_path / "uat.log").read_text().splitlines()]
+
+
+@requires_posix
+def test_gauntlet_waits_for_uat_mutex(Project, tmp_path, monkeypatch):
+    Runs = RunGauntlet(Project, tmp_path, monkeypatch, False)
+    assert len(Runs) == 2
+    assert all("-WaitForUATMutex" in Args and NoWait is None for Args, NoWait, Start, End in Runs)
+    (_, _, StartA, EndA), (_, _, StartB, EndB) = Runs
+    assert EndA <= StartB or EndB <= StartA
+
+
+@requires_posix
+def test_gauntlet_parallel_uat(Project, tmp_path, monkeypatch):
+    Runs = RunGauntlet(Project, tmp_path, monkeypatch, True)
+    assert all("-WaitForUATMutex" not in Args and NoWait == "1" for Args, NoWait, Start, End in Runs)
+    (_, _, StartA, EndA), (_, _, StartB, EndB) = Runs
+    assert StartA < EndB and StartB < EndA
@@ -0,0 +1,64 @@
+import sys
+import argparse
+import importlib.util
+
+import pytest
+
+import UEDT
+
+
+class ProbeWork(UEDT.Command):
+    def _Execute(self, args):
+        # Child holding ~64 MB for a while, so the sampler sees it.
+        Script = "import time\nData = bytearray(64 * 2**20)\nData[::4096] = b'x' * len(Data[::4096])\nEnd = time.time() + 0.6\nwhile time.time() < End: pass"
+        UEDT.RunProcess([sys.executable, "-c", Script])
+        return 2
+
+
+@pytest.fixture
+def History(Project, monkeypatch):
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", True)
+    monkeypatch.setattr(UEDT.c, "HistoryRecordChangelist", False)
+    monkeypatch.setattr(UEDT.c, "HistorySampleInterval", 0.05)
+    monkeypatch.setattr(UEDT, "commands", UEDT.commands + [["probe", ProbeWork, "", []]])
+    return Project
+
+
+def test_percentile():
+    assert UEDT.Percentile([], 50) is None
+    assert UEDT.Percentile([3, 1, 2], 50) == 2
+    assert UEDT.Percentile([1, 2, 3, 4], 50) == 2.5
+    assert UEDT.Percentile(list(range(1, 11)), 90) == pytest.approx(9.1)
+    assert UEDT.Percentile([5], 95) == 5
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux") and importlib.util.find_spec("psutil") is None, reason="Process tree sampling needs /proc or psutil.")
+def test_runs_are_recorded_with_resources(History):
+    assert UEDT.ExecuteCommand(argparse.Namespace(command="probe", c="Test")) == 2
+    assert UEDT.ExecuteCommand(argparse.Namespace(command="stats", name=None, last=None, threshold=None)) == 0
+
+    Database = UEDT.RunHistory()
+    assert Database.GetCommands() == ["probe"]
+    Run = Database.GetRuns("probe")[0]
+    Database.Close()
+    assert (Run["ExitCode"], Run["Configuration"], Run["Changelist"]) == (2, "Test", None)
+    assert Run["Wall"] >= 0.6
+    assert Run["CPU"] >= 0.3
+    assert Run["PeakRSS"] >= 64 * 2**20
+
+
+def test_stats_flags_slow_runs(History, capsys):
+    Database = UEDT.RunHistory()
+    for Index in range(12):
+        Wall = 25.0 if Index == 11 else 10.0 + Index % 2
+        Database.Add("build", 1700000000 + Index * 3600, Wall, Wall * 4, 2**30, 0 if Index != 3 else 1, "Development", "1234", {})
+    Database.Close()
+
+    assert UEDT.ShowStats({"command": "stats", "name": "build", "last": "12"}).ExitCode == 0
+    Output = capsys.readouterr().out
+    assert "build - 12 runs, 1 failed" in Output
+    assert "memory p50 1024 MB" in Output
+    assert "trend  last 5 runs" in Output
+    Slow = [x for x in Output.splitlines() if "SLOW" in x]
+    # Median of successful runs only.
+    assert len(Slow) == 1 and "2.50x median" in Slow[0] and "CL 1234" in Slow[0]
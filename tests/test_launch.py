@@ -0,0 +1,165 @@
+import sys
+import time
+import socket
+import threading
+import subprocess
+
+import pytest
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+
+def FreePort():
+    with socket.socket() as Probe:
+        Probe.bind(("127.0.0.1", 0))
+        return Probe.getsockname()[1]
+
+
+# Stand-in trace server, starts listening after Delay seconds.
+def ListenLater(Port, Delay, Stop):
+    def Serve():
+        time.sleep(Delay)
+        with socket.socket() as Server:
+            Server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            Server.bind(("127.0.0.1", Port))
+            Server.listen()
+            Server.settimeout(0.05)
+            while not Stop.is_set():
+                try:
+                    Server.accept()[0].close()
+                except socket.timeout:
+                    pass
+    Thread = threading.Thread(target=Serve, daemon=True)
+    Thread.start()
+    return Thread
+
+
+def test_wait_for_port_returns_once_server_listens():
+    Port, Stop = FreePort(), threading.Event()
+    ListenLater(Port, 0.3, Stop)
+    try:
+        Start = time.monotonic()
+        assert UEDT.WaitForPort("127.0.0.1", Port, 5)
+        assert 0.3 <= time.monotonic() - Start < 1.5
+    finally:
+        Stop.set()
+
+
+def test_wait_for_port_timeout():
+    Start = time.monotonic()
+    assert not UEDT.WaitForPort("127.0.0.1", FreePort(), 0.5)
+    assert time.monotonic() - Start < 1.5
+
+
+def test_wait_for_port_stops_when_process_exits():
+    Process = subprocess.Popen([sys.executable, "-c", "pass"])
+    Start = time.monotonic()
+    assert not UEDT.WaitForPort("127.0.0.1", FreePort(), 10, Process)
+    assert time.monotonic() - Start < 5
+
+
+@requires_posix
+@pytest.mark.skipif(sys.platform != "linux", reason="Reads /proc.")
+def test_find_processes_reads_proc(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None) # Without the optional psutil.
+    UEDT.processCache.clear()
+    Tool = WriteTool(tmp_path / "UnrealInsights.exe", "import time\ntime.sleep(30)\n")
+    Process = subprocess.Popen([str(Tool)])
+    try:
+        Deadline = time.monotonic() + 5
+        while not UEDT.FindProcesses("UnrealInsights.exe", Refresh=True) and time.monotonic() < Deadline:
+            time.sleep(0.05)
+        assert [x.Pid for x in UEDT.FindProcesses("UnrealInsights.exe")] == [Process.pid]
+    finally:
+        Process.kill()
+        Process.wait()
+
+    # Cached within a run, found again only on refresh.
+    assert UEDT.IsProcessRunning("UnrealInsights.exe")
+    assert UEDT.FindProcesses("UnrealInsights.exe", Refresh=True) == []
+    UEDT.processCache.clear()
+
+
+def test_log_filter_by_category_and_verbosity():
+    Lines = [
+        "[2024.01.01-12.00.00:000][  0]LogGame: Display: Started",
+        "[2024.01.01-12.00.00:001][  1]LogGame: Warning: Missing texture",
+        "LogNet: Error: Connection lost",
+        "LogStreaming: Display: Hitch detected, 120 ms",
+        "LogGame: Ticking",
+        "    continuation of a message",
+    ]
+
+    Filter = UEDT.LogFilter(Verbosity="Warning")
+    assert Filter.Filter(Lines).splitlines() == [Lines[1], Lines[2], Lines[3]]
+    assert Filter.Counts == {"Lines": 6, "Shown": 3, "Warning": 1, "Error": 1, "Hitch": 1}
+
+    Filter = UEDT.LogFilter(["LogGame", " -LogNet"])
+    assert Filter.Filter(Lines).splitlines() == [Lines[0], Lines[1], Lines[4], Lines[5]]
+    assert UEDT.LogFilter(["-LogNet", "-LogStreaming"]).Filter(Lines).splitlines() == [Lines[0], Lines[1], Lines[4], Lines[5]]
+
+    Colored = UEDT.LogFilter(Color=True).Filter(Lines[1:3]).splitlines()
+    assert Colored == [f"\033[93m{Lines[1]}\033[0m", f"\033[91m{Lines[2]}\033[0m"]
+    assert UEDT.LogFilter().Filter([]) == ""
+
+
+@pytest.mark.parametrize("Notify", [True, False])
+def test_log_follower_reads_new_lines(tmp_path, Notify):
+    LogPath = tmp_path / "Logs/Game.log"
+    LogPath.parent.mkdir()
+    LogPath.write_bytes(b"old run\n")
+    Follower = UEDT.LogFollower(LogPath, PollInterval=0.01)
+    if not Notify and Follower.Notify is not None:
+        UEDT.os.close(Follower.Notify)
+        Follower.Notify = None
+
+    try:
+        assert Follower.Read() == [] # Present before following started.
+        with open(LogPath, "ab") as File:
+            File.write(b"first\nsecond\npart")
+        Follower.Wait(1.0)
+        assert Follower.Read() == ["first", "second"]
+        with open(LogPath, "ab") as File:
+            File.write(b"ial\r\n")
+        assert Follower.Read() == ["partial"]
+
+        # Game start backs up the old log and writes a new one.
+        UEDT.os.rename(LogPath, tmp_path / "Logs/Game-backup.log")
+        LogPath.write_bytes(b"new run\nunterminated")
+        Follower.Wait(1.0)
+        assert Follower.Read() == ["new run"]
+        assert Follower.Read(Final=True) == ["unterminated"]
+
+        # Truncated in place.
+        LogPath.write_bytes(b"again\n")
+        assert Follower.Read() == ["again"]
+    finally:
+        Follower.Close()
+
+
+# Stand-in game: writes its log over a while, prints to stdout as well and exits with code 3.
+GameBody = """
+import os, sys, time
+LogPath = os.path.join(os.path.dirname(sys.argv[1]), "Saved", "Logs", "Game.log")
+os.makedirs(os.path.dirname(LogPath), exist_ok=True)
+with open(LogPath, "w") as Log:
+    for Line in ["LogInit: Display: Engine started", "LogGame: Warning: Missing texture", "LogGame: Ticking", "LogGame: Error: Crashed"]:
+        Log.write(Line + "\\n")
+        Log.flush()
+        print(Line, flush=True)
+        time.sleep(0.1)
+sys.exit(3)
+"""
+
+
+@requires_posix
+def test_attached_launch_follows_game_log(Project, tmp_path, monkeypatch, capsys):
+    Game = WriteTool(tmp_path / "Game.exe", GameBody)
+    (Project / "Saved/Logs").mkdir(parents=True)
+    (Project / "Saved/Logs/Game.log").write_text("LogGame: Error: previous run\n")
+
+    Launcher = UEDT.Launch.__new__(UEDT.Launch)
+    ExitCode = Launcher.RunAttached([Game, UEDT.GetUProjectPath()], {"verbosity": "Warning", "category": "LogGame"})
+    assert ExitCode == 3
+    assert capsys.readouterr().out.splitlines() == ["LogGame: Warning: Missing texture", "LogGame: Error: Crashed"]
@@ -0,0 +1,39 @@
+import UEDT
+
+
+def WriteBuild(BuildDir, Files):
+    for RelPath, Data in Files.items():
+        (BuildDir / RelPath).parent.mkdir(parents=True, exist_ok=True)
+        (BuildDir / RelPath).write_bytes(Data)
+
+
+# Patched file reads back different from the patch, eg. a failing disk.
+class FailingVerification(UEDT.BuildPatch):
+    def GetTargetHash(self, FilePath, Executor):
+        Hash = super().GetTargetHash(FilePath, Executor)
+        return "corrupted" if Hash == self.NewHash else Hash
+
+
+def CreatePatch(tmp_path):
+    WriteBuild(tmp_path / "Old", {"Game.pak": b"a" * 5000, "Old.pak": b"old"})
+    WriteBuild(tmp_path / "New", {"Game.pak": b"a" * 4000 + b"b" * 2000})
+    Header = UEDT.BuildPatch(ChunkSize=1024).Create(tmp_path / "Old", tmp_path / "New", tmp_path / "Game.patch")
+    WriteBuild(tmp_path / "Target", {"Game.pak": b"a" * 5000, "Old.pak": b"old"})
+    return Header
+
+
+def test_apply_removes_files_after_verification(tmp_path):
+    CreatePatch(tmp_path)
+    Patched, UpToDate, Errors = UEDT.BuildPatch().Apply(tmp_path / "Game.patch", tmp_path / "Target")
+    assert (Patched, UpToDate, Errors) == (1, 0, [])
+    assert (tmp_path / "Target/Game.pak").read_bytes() == (tmp_path / "New/Game.pak").read_bytes()
+    assert not (tmp_path / "Target/Old.pak").exists()
+
+
+def test_apply_keeps_removed_files_when_verification_fails(tmp_path):
+    Header = CreatePatch(tmp_path)
+    Patch = FailingVerification()
+    Patch.NewHash = Header["Files"][0]["NewHash"]
+    Patched, UpToDate, Errors = Patch.Apply(tmp_path / "Game.patch", tmp_path / "Target")
+    assert Errors[0] == "Game.pak verification failed after patching."
+    assert (tmp_path / "Target/Old.pak").read_bytes() == b"old"
@@ -0,0 +1,219 @@
+import json
+
+import pytest
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+pytestmark = requires_posix
+
+# Stand-in p4 in text mode. Files named *Missing* are not on the client, *Opened* are opened in another change.
+# P4_DOWN fails the whole call the way a lost server connection does. fstat prints P4_OPENED, tagged opened files.
+P4TextBody = """
+import os, sys, json
+Args = sys.argv[1:]
+Files = [x for x in sys.stdin.read().splitlines() if x] if "-x" in Args else []
+Command = next(x for x in Args if x in ("edit", "reopen", "revert", "fstat"))
+with open(os.environ["P4_LOG"], "a") as File:
+    File.write(json.dumps([Command, Args, Files]) + "\\n")
+if Command == "fstat":
+    sys.stdout.write(open(os.environ["P4_OPENED"]).read())
+    sys.exit(0)
+if os.environ.get("P4_DOWN"):
+    sys.stderr.write("Perforce client error:\\n\\tConnect to server failed; check $P4PORT.\\n")
+    sys.exit(1)
+Failed = False
+for x in Files:
+    if "Missing" in x:
+        sys.stderr.write(f"{x} - file(s) not on client.\\n")
+        Failed = True
+    elif "Opened" in x and Command == "edit":
+        sys.stdout.write(f"{x} - can't change from default change - use 'reopen'\\n")
+    else:
+        sys.stdout.write(f"{x}#1 - opened for {Command}\\n")
+sys.exit(1 if Failed else 0)
+"""
+
+
+@pytest.fixture
+def Workspace(tmp_path, monkeypatch):
+    monkeypatch.setattr(UEDT, "GetProjectDir", lambda: tmp_path)
+    monkeypatch.setattr(UEDT.c, "P4Executable", str(WriteTool(tmp_path / "p4", P4TextBody)))
+    monkeypatch.setattr(UEDT.c, "P4OpenedCacheTTL", 0)
+    monkeypatch.setattr(UEDT.c, "P4UseMarshal", False)
+    monkeypatch.setattr(UEDT.c, "P4BatchSize", 3)
+    monkeypatch.setattr(UEDT.c, "P4Jobs", 2)
+    monkeypatch.setenv("P4_LOG", str(tmp_path / "p4.log"))
+    (tmp_path / "Content").mkdir()
+    return tmp_path
+
+
+def MakeFiles(Workspace, Names):
+    Files = []
+    for Name in Names:
+        (Workspace / "Content" / Name).write_text(Name)
+        Files.append(str(Workspace / "Content" / Name))
+    return Files
+
+
+def ReadCalls(Workspace):
+    LogPath = Workspace / "p4.log"
+    return [json.loads(x) for x in LogPath.read_text().splitlines()] if LogPath.exists() else []
+
+
+def test_files_are_batched_through_stdin(Workspace):
+    Files = MakeFiles(Workspace, [f"Prop {x}.uasset" for x in range(7)])
+    Result = UEDT.PerforceHandler().EditFiles(12, Files + [str(Workspace / "Content/Deleted.uasset")])
+
+    assert Result and Result.OK
+    assert sorted(Result.Files) == sorted(Files)
+    Calls = ReadCalls(Workspace)
+    assert [len(x[2]) for x in Calls] == [3, 3, 1]
+    assert all(x[1][-5:] == ["-x", "-", "edit", "-c", "12"] for x in Calls)
+    # Paths with spaces reach p4 intact, files missing locally are not sent.
+    assert sorted(sum((x[2] for x in Calls), [])) == sorted(Files)
+
+
+def test_failures_are_mapped_to_files(Workspace):
+    Files = MakeFiles(Workspace, ["A.uasset", "Missing.uasset", "B.uasset", "C.uasset"])
+    Result = UEDT.PerforceHandler().EditFiles(-1, Files)
+
+    assert not Result
+    assert [x.Path for x in Result.GetFailed()] == [Files[1]]
+    assert Result.Files[Files[1]].Message.endswith("file(s) not on client.")
+    # Other chunks and other files of the failing chunk succeed.
+    assert all(Result.Files[x].OK for x in Files if x != Files[1])
+
+
+def test_failed_call_fails_every_file_of_its_chunk(Workspace, monkeypatch):
+    Files = MakeFiles(Workspace, ["A.uasset", "B.uasset"])
+    monkeypatch.setenv("P4_DOWN", "1")
+    Result = UEDT.PerforceHandler().EditFiles(-1, Files)
+    assert len(Result.GetFailed()) == 2
+    assert all("Connect to server failed" in x.Message for x in Result.GetFailed())
+
+    with pytest.raises(ConnectionError):
+        UEDT.PerforceHandler().RevertFiles(Files)
+
+
+def test_chunks_asking_for_reopen_are_reopened(Workspace):
+    Files = MakeFiles(Workspace, ["A.uasset", "B.uasset", "C.uasset", "D.uasset", "Opened.uasset"])
+    assert UEDT.PerforceHandler().EditFiles(12, Files)
+
+    Calls = ReadCalls(Workspace)
+    assert [x[0] for x in Calls] == ["edit", "edit", "reopen"]
+    # Text output cannot be attributed to files, the whole chunk is reopened.
+    assert Calls[2][2] == Files[3:]
+    assert Calls[2][1][-5:] == ["-x", "-", "reopen", "-c", "12"]
+
+
+# Stand-in p4 -G, writes marshalled records. Files named *Depot* get records naming the depot path only.
+P4MarshalBody = """
+import os, sys, json, time, marshal
+Args = sys.argv[1:]
+Command = next(x for x in Args if x in ("edit", "reopen", "revert", "change", "changes"))
+Files = [x for x in sys.stdin.read().splitlines() if x] if "-x" in Args else []
+Spec = {k.decode(): v.decode() for k, v in marshal.load(sys.stdin.buffer).items()} if Command == "change" and "-i" in Args else None
+with open(os.environ["P4_LOG"], "a") as File:
+    File.write(json.dumps([Command, Args, Files, Spec]) + "\\n")
+time.sleep(float(os.environ.get("P4_SLEEP", "0")))
+def Write(**Fields):
+    marshal.dump({k.encode(): str(v).encode() for k, v in Fields.items()}, sys.stdout.buffer, 0)
+Change = Args[Args.index("-c") + 1] if "-c" in Args[1:] else "default"
+if Command == "change" and "-o" in Args:
+    Form = {"Change": "new", "Client": "Workspace", "Description": "<enter description here>"}
+    Form.update(Args[i + 1].split("=", 1) for i, x in enumerate(Args) if x == "--field")
+    Write(code="stat", **Form)
+elif Command == "change":
+    Write(code="info", data="Change 1234 created.", level=0)
+elif Command == "changes":
+    Write(code="stat", change="987", desc="Latest")
+for x in Files:
+    if "Missing" in x:
+        Write(code="error", data=f"{x} - file(s) not on client.", severity=2)
+    elif "Opened" in x and Command == "edit":
+        Write(code="info", data=f"{x} - can't change from default change - use 'reopen'", level=0)
+    elif "Depot" in x:
+        Write(code="stat", depotFile="//depot/Content/" + os.path.basename(x), action=Command, change=Change)
+    else:
+        Write(code="stat", clientFile=x, depotFile="//depot/Content/" + os.path.basename(x), action=Command, change=Change)
+"""
+
+
+@pytest.fixture
+def MarshalWorkspace(Workspace, monkeypatch):
+    monkeypatch.setattr(UEDT.c, "P4Executable", str(WriteTool(Workspace / "p4", P4MarshalBody)))
+    monkeypatch.setattr(UEDT.c, "P4UseMarshal", True)
+    monkeypatch.setattr(UEDT.c, "P4BatchSize", 10)
+    return Workspace
+
+
+def test_marshal_records_are_matched_to_files(MarshalWorkspace):
+    Files = MakeFiles(MarshalWorkspace, ["A.uasset", "Missing.uasset", "Opened.uasset", "Depot.uasset"])
+    Result = UEDT.PerforceHandler().EditFiles(12, Files)
+
+    assert [x.Path for x in Result.GetFailed()] == [Files[1]]
+    assert Result.Files[Files[1]].Message == f"{Files[1]} - file(s) not on client."
+    assert Result.Files[Files[0]].Record.Action == "edit"
+    # Records naming only the depot path are matched by order.
+    assert Result.Files[Files[3]].Record.DepotFile == "//depot/Content/Depot.uasset"
+
+    Calls = ReadCalls(MarshalWorkspace)
+    assert all(x[1][0] == "-G" for x in Calls)
+    # Only the file whose record asks for it is reopened.
+    assert [(x[0], x[2]) for x in Calls] == [("edit", Files), ("reopen", [Files[2]])]
+    assert Result.Files[Files[2]].OK and Result.Files[Files[2]].Record.Action == "reopen"
+
+
+def test_marshal_changelists(MarshalWorkspace):
+    Handler = UEDT.PerforceHandler()
+    assert Handler.CreateNewChangelist("Automated changes") == 1234
+    assert Handler.GetHaveChangelist() == "987"
+
+    Calls = ReadCalls(MarshalWorkspace)
+    assert Calls[1][0] == "change" and Calls[1][3]["Description"] == "Automated changes"
+    assert "Files" in Calls[1][3] and Calls[1][3]["Client"] == "Workspace"
+
+
+def test_marshal_timeout(MarshalWorkspace, monkeypatch):
+    monkeypatch.setenv("P4_SLEEP", "30")
+    monkeypatch.setattr(UEDT.c, "P4Timeout", 0.5)
+    Start = UEDT.time.monotonic()
+    assert UEDT.PerforceHandler().GetHaveChangelist() is None
+    assert UEDT.time.monotonic() - Start < 10
+
+
+def test_opened_files_skip_server_calls(Workspace, monkeypatch):
+    monkeypatch.setattr(UEDT.c, "P4OpenedCacheTTL", 60)
+    monkeypatch.setenv("P4CLIENT", "Workspace")
+    Files = MakeFiles(Workspace, ["InChange.uasset", "InDefault.uasset", "Closed.uasset"])
+    # Opened for edit and not on disk (eg. moved by the editor), does not need the local file.
+    Files.append(str(Workspace / "Content/Moved.uasset"))
+    Opened = Workspace / "opened.txt"
+    Opened.write_text("".join(f"... clientFile {Path}\n... action edit\n... change {Change}\n\n" for Path, Change in [
+        (Files[0], "12"), (Files[1], "default"), (Files[3], "default")]))
+    monkeypatch.setenv("P4_OPENED", str(Opened))
+
+    Handler = UEDT.PerforceHandler()
+    Result = Handler.EditFiles(12, Files)
+    assert Result.OK and Result.Files[Files[0]].Message == "Already opened in change 12."
+    assert [(x[0], x[2]) for x in ReadCalls(Workspace)] == [("fstat", []), ("edit", [Files[2]]), ("reopen", [Files[1], Files[3]])]
+
+    # Every file is in change 12 now, within the TTL the server is not asked again, also by a later invocation.
+    (Workspace / "p4.log").unlink()
+    assert Handler.EditFiles(12, Files).OK
+    assert UEDT.PerforceHandler().EditFiles(12, Files).OK
+    assert ReadCalls(Workspace) == []
+
+    # Reverted files are forgotten.
+    Handler.RevertFiles([Files[0]])
+    Handler.EditFiles(12, Files)
+    assert [(x[0], x[2]) for x in ReadCalls(Workspace)] == [("revert", [Files[0]]), ("edit", [Files[0]])]
+
+    # Expired cache and a different workspace query the server again, it does not list the file as opened.
+    (Workspace / "p4.log").unlink()
+    Handler.OpenedFiles.Time = 0
+    Handler.EditFiles(12, [Files[2]])
+    monkeypatch.setenv("P4CLIENT", "Other")
+    Handler.EditFiles(12, [Files[2]])
+    assert [x[0] for x in ReadCalls(Workspace)] == ["fstat", "edit", "fstat", "edit"]
@@ -0,0 +1,53 @@
+import os
+import stat
+
+import UEDT
+
+
+def WriteReadOnly(FilePath, Mode=0o444):
+    FilePath.parent.mkdir(parents=True, exist_ok=True)
+    FilePath.write_text("binary")
+    FilePath.chmod(Mode)
+    return FilePath
+
+
+def IsWritable(FilePath):
+    return bool(os.stat(FilePath).st_mode & stat.S_IWUSR)
+
+
+def test_fix_binary_permissions(Project, monkeypatch, capsys):
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    Fixed = [
+        WriteReadOnly(Project / "Binaries/Win64/Game.dll", 0o555),
+        WriteReadOnly(Project / "Binaries/Win64/Game.pdb"),
+        WriteReadOnly(Project / "Intermediate/Build/Game.target"),
+        WriteReadOnly(Project / "Plugins/Tool/Binaries/Win64/Tool.dll"),
+    ]
+    Kept = [
+        WriteReadOnly(Project / "Binaries/Win64/Notes.txt"),
+        WriteReadOnly(Project / "Content/Movies/Codec.dll"),
+        WriteReadOnly(Project / "Intermediate/ShaderAutogen/Shader.dll"),
+        WriteReadOnly(Project / "Plugins/Tool/Content/Tool.dll"),
+    ]
+    (Project / "Game.uproject").chmod(0o444)
+    Fixed.append(Project / "Game.uproject")
+
+    assert UEDT.FixBinaryPermissions({"command": "fixBinaryPermissions"}).ExitCode == 0
+    assert all(IsWritable(x) for x in Fixed)
+    assert not any(IsWritable(x) for x in Kept)
+    # Only the owner write bit is added.
+    assert stat.S_IMODE(os.stat(Project / "Binaries/Win64/Game.dll").st_mode) == 0o755
+    assert "Checked 5 files, fixed 5, skipped 0" in capsys.readouterr().out
+
+    # Files in the index with unchanged inode and mtime are not checked again.
+    UEDT.FixBinaryPermissions({"command": "fixBinaryPermissions"})
+    assert "Checked 0 files, fixed 0, skipped 5" in capsys.readouterr().out
+
+    Replaced = WriteReadOnly(Project / "Binaries/Win64/Game.pdb.tmp")
+    os.replace(Replaced, Project / "Binaries/Win64/Game.pdb")
+    UEDT.FixBinaryPermissions({"command": "fixBinaryPermissions"})
+    assert "Checked 1 files, fixed 1, skipped 4" in capsys.readouterr().out
+    assert IsWritable(Project / "Binaries/Win64/Game.pdb")
+
+    UEDT.FixBinaryPermissions({"command": "fixBinaryPermissions", "full": True})
+    assert "Checked 5 files, fixed 0, skipped 0" in capsys.readouterr().out
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import logging
+
+import pytest
+
+import UEDT
+from conftest import requires_posix
+
+
+def Python(Script):
+    return [sys.executable, "-c", Script]
+
+
+def test_output_is_streamed_with_a_bounded_tail(monkeypatch, caplog):
+    monkeypatch.setattr(UEDT.c, "ProcessTailLines", 50)
+    Lines = []
+    Script = "import sys\nfor i in range(1000):\n    print(f'line {i}')\nprint('problem', file=sys.stderr)"
+    with caplog.at_level(logging.INFO, logger="UEDT.Process"):
+        Result = UEDT.RunProcess(Python(Script), OnLine=Lines.append, LogPrefix="[probe] ")
+
+    assert Result.OK and Result.TimedOut is None
+    # stdout and stderr are read concurrently, their lines interleave.
+    assert len(Lines) == 1001 and [x for x in Lines if x.startswith("line")] == [f"line {x}" for x in range(1000)]
+    assert Result.Tail == Lines[-50:]
+    Records = [x for x in caplog.records if x.name == "UEDT.Process"]
+    assert len(Records) == 1001 and all(x.getMessage().startswith("[probe] ") for x in Records)
+    assert next(x for x in Records if x.getMessage() == "[probe] problem").levelno == logging.WARNING
+
+
+def test_failure_reports_tail(caplog):
+    Result = UEDT.RunProcess(Python("import sys\nprint('last words')\nsys.exit(3)"))
+    assert (Result.ReturnCode, Result.OK) == (3, False)
+    assert "failed with code 3" in caplog.text and "last words" in caplog.text
+
+    assert UEDT.RunProcess([os.path.join(os.sep, "missing", "tool")]).ReturnCode == -1
+
+
+@requires_posix
+@pytest.mark.parametrize("Timeouts, Expected", [((1, 0), "idle"), ((0, 1), "total")])
+def test_timeouts_kill_the_process_tree(tmp_path, monkeypatch, Timeouts, Expected):
+    monkeypatch.setattr(UEDT.c, "CommandTimeouts", {"probe": Timeouts})
+    PidFile = tmp_path / "child.pid"
+    # Total timeout is hit by a process that keeps printing, idle timeout by one that went silent. Both wait on a grandchild.
+    Script = f"""
+import subprocess, sys, time
+Child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+open({str(PidFile)!r}, "w").write(str(Child.pid))
+print("started", flush=True)
+for _ in range(600):
+    if {Expected == "total"}:
+        print("working", flush=True)
+    time.sleep(0.1)
+"""
+    Start = time.monotonic()
+    Result = UEDT.RunProcess(Python(Script), "probe")
+    assert time.monotonic() - Start < 10
+    assert Result.TimedOut == Expected and not Result.OK
+
+    Deadline = time.monotonic() + 5
+    while time.monotonic() < Deadline:
+        try:
+            os.kill(int(PidFile.read_text()), 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(PidFile.read_text()), 0)
@@ -0,0 +1,114 @@
+import os
+import time
+
+import pytest
+
+import UEDT
+
+Day = 24 * 3600 * 10**9
+
+
+# Writes Size bytes to FilePath, last used DaysAgo days ago.
+def WriteUsed(FilePath, DaysAgo, Size=100):
+    FilePath.parent.mkdir(parents=True, exist_ok=True)
+    FilePath.write_bytes(b"x" * Size)
+    Used = time.time_ns() - DaysAgo * Day
+    os.utime(FilePath, ns=(Used, Used))
+
+
+@pytest.fixture
+def Prune(Project, monkeypatch):
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    monkeypatch.setattr(UEDT.c, "PruneJobs", 4)
+    def Run(**Args):
+        return UEDT.Prune({"command": "prune", **Args}).ExitCode
+    return Run
+
+
+def test_prune_evicts_least_recently_used_files(Project, Prune, monkeypatch, capsys):
+    for DaysAgo in range(1, 6):
+        WriteUsed(Project / f"DerivedDataCache/{DaysAgo % 2}/{DaysAgo}.udd", DaysAgo)
+    monkeypatch.setattr(UEDT.c, "PruneTrees", {"DerivedDataCache": (250, 0)})
+
+    assert Prune(dry_run=True) == 0
+    assert "Would evict 3 entries" in capsys.readouterr().out
+    assert len(list((Project / "DerivedDataCache").rglob("*.udd"))) == 5
+
+    assert Prune() == 0
+    Left = sorted(x.name for x in (Project / "DerivedDataCache").rglob("*.udd"))
+    assert Left == ["1.udd", "2.udd"]
+    assert (Project / "Saved/UEDT/UsageIndex.json").is_file()
+
+
+def test_prune_uses_access_time(Project, Prune, monkeypatch):
+    # Written long ago but read yesterday, so it outlives a file written two days ago.
+    WriteUsed(Project / "DerivedDataCache/Read.udd", 30)
+    Read = time.time_ns() - Day
+    os.utime(Project / "DerivedDataCache/Read.udd", ns=(Read, Read - 29 * Day))
+    WriteUsed(Project / "DerivedDataCache/Written.udd", 2)
+    monkeypatch.setattr(UEDT.c, "PruneTrees", {"DerivedDataCache": (100, 0)})
+
+    assert Prune() == 0
+    assert sorted(os.listdir(Project / "DerivedDataCache")) == ["Read.udd"]
+
+
+def test_prune_evicts_directories_at_depth(Project, Prune, monkeypatch):
+    Root = Project / "Intermediate/Build/Linux"
+    for Target, DaysAgo in (("Game", 1), ("GameEditor", 10), ("GameServer", 5)):
+        WriteUsed(Root / f"{Target}/Development/Module.o", DaysAgo)
+        WriteUsed(Root / f"{Target}/Development/Deep/Module.d", DaysAgo)
+    WriteUsed(Project / "Intermediate/ProjectFiles/Game.vcxproj", 20)
+    monkeypatch.setattr(UEDT.c, "PruneTrees", {"Intermediate": (400, 3)})
+
+    assert Prune() == 0
+    # Files above the entry depth are evicted one by one, directories at the depth as a whole.
+    assert not (Project / "Intermediate/ProjectFiles/Game.vcxproj").exists()
+    assert not (Root / "GameEditor").exists()
+    assert sorted(os.listdir(Root)) == ["Game", "GameServer"]
+    assert (Root / "GameServer/Development/Deep/Module.d").is_file()
+
+
+def test_prune_budget_argument_and_tree_filter(Project, Prune, monkeypatch):
+    WriteUsed(Project / "DerivedDataCache/Old.udd", 3)
+    WriteUsed(Project / "Intermediate/Old.o", 3)
+    monkeypatch.setattr(UEDT.c, "PruneTrees", {"DerivedDataCache": (2**30, 0), "Intermediate": (2**30, 0)})
+
+    assert Prune(tree="DerivedDataCache", budget="0") == 0
+    assert not (Project / "DerivedDataCache/Old.udd").exists()
+    assert (Project / "Intermediate/Old.o").is_file()
+
+
+def test_prune_skips_entries_used_since_indexed(Project, Prune, monkeypatch):
+    WriteUsed(Project / "DerivedDataCache/A.udd", 3)
+    WriteUsed(Project / "DerivedDataCache/B.udd", 2)
+    monkeypatch.setattr(UEDT.c, "PruneTrees", {"DerivedDataCache": (100, 0)})
+    assert Prune(dry_run=True) == 0
+
+    # Reading a file does not change the directory, the cached listing still holds the old last use.
+    Now = time.time_ns()
+    os.utime(Project / "DerivedDataCache/A.udd", ns=(Now, Now - 3 * Day))
+    assert Prune() == 0
+    assert sorted(os.listdir(Project / "DerivedDataCache")) == ["A.udd"]
+
+
+def test_usage_index_reuses_unchanged_directories(tmp_path):
+    for Name in ("A", "B", "C"):
+        WriteUsed(tmp_path / f"Tree/{Name}/File.bin", 1)
+    Index = UEDT.UsageIndex(tmp_path / "Index.json")
+    assert Index.Update([tmp_path / "Tree"], Jobs=2) == 4
+    Index.Save()
+
+    Index = UEDT.UsageIndex(tmp_path / "Index.json")
+    Index.Load()
+    assert Index.Update([tmp_path / "Tree"], Jobs=2) == 0
+    WriteUsed(tmp_path / "Tree/B/New.bin", 1, Size=50)
+    assert Index.Update([tmp_path / "Tree"], Jobs=2) == 1
+    assert Index.Update([tmp_path / "Tree"], Jobs=2, Full=True) == 4
+
+    os.remove(tmp_path / "Tree/C/File.bin")
+    os.rmdir(tmp_path / "Tree/C")
+    Index.Update([tmp_path / "Tree"], Jobs=2)
+    assert str(tmp_path / "Tree/C") not in Index.Dirs
+    Entries = Index.GetEntries(tmp_path / "Tree", 1)
+    assert {os.path.basename(x): Entry[0] for x, Entry in Entries.items()} == {"A": 100, "B": 150}
+    assert all(Entry[2] for Entry in Entries.values())
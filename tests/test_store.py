@@ -0,0 +1,90 @@
+import os
+import stat
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+
+def IsWritable(FilePath):
+    return bool(os.stat(FilePath).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def StageBuilds(StagingDir, Configurations, Content=b"pak" * 1000):
+    for Configuration in Configurations:
+        (StagingDir / Configuration).mkdir(parents=True)
+        (StagingDir / Configuration / "Game.pak").write_bytes(Content)
+        (StagingDir / Configuration / "Game.sh").write_text("#!/bin/sh\n")
+        (StagingDir / Configuration / "Game.sh").chmod(0o755)
+
+
+def test_hardlinked_blobs_are_read_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(UEDT.c, "StoreLinkMode", "hardlink")
+    Store = UEDT.StagingStore(tmp_path / "Store")
+    StageBuilds(tmp_path, ("Development", "Test"))
+
+    Store.Ingest(tmp_path / "Development")
+    Files, Linked, Saved = Store.Ingest(tmp_path / "Test")
+    assert (Files, Linked) == (2, 2)
+
+    Development = tmp_path / "Development/Game.pak"
+    Test = tmp_path / "Test/Game.pak"
+    assert os.stat(Development).st_ino == os.stat(Test).st_ino
+    assert not IsWritable(Development) and not IsWritable(Test)
+    assert not IsWritable(Store.GetBlobPath(Store.LoadJson(Store.GetIndexPath(tmp_path / "Test"), {})["Files"]["Game.pak"][2]))
+    assert stat.S_IMODE(os.stat(tmp_path / "Test/Game.sh").st_mode) == 0o555
+
+    # Writable files left by earlier versions are made read-only.
+    os.chmod(Test, 0o644)
+    Store.Ingest(tmp_path / "Test")
+    assert not IsWritable(Development)
+
+
+def test_detach_removes_links_before_staging_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(UEDT.c, "StoreLinkMode", "hardlink")
+    Store = UEDT.StagingStore(tmp_path / "Store")
+    StageBuilds(tmp_path, ("Development", "Test"))
+    Store.Ingest(tmp_path / "Development")
+    Store.Ingest(tmp_path / "Test")
+
+    Removed, Failed = Store.Detach(tmp_path / "Test")
+    assert (Removed, Failed) == (2, [])
+    assert not (tmp_path / "Test/Game.pak").exists()
+    assert (tmp_path / "Development/Game.pak").read_bytes() == b"pak" * 1000
+    assert not IsWritable(tmp_path / "Development/Game.pak")
+    assert Store.LoadJson(Store.GetIndexPath(tmp_path / "Test"), {})["Files"] == {}
+
+    # Staged again with the same content, the next ingest links it again.
+    (tmp_path / "Test/Game.pak").write_bytes(b"pak" * 1000)
+    (tmp_path / "Test/Game.sh").write_text("#!/bin/sh\n")
+    Files, Linked, Saved = Store.Ingest(tmp_path / "Test")
+    assert Linked == 2
+    assert os.stat(tmp_path / "Test/Game.pak").st_ino == os.stat(tmp_path / "Development/Game.pak").st_ino
+
+
+# Stand-in RunUAT staging in place: overwrites files of the staged build without replacing them.
+StageBody = """
+import os, sys
+StagingDir = next(x for x in sys.argv if x.startswith("-stagingdirectory=")).split("=", 1)[1]
+os.makedirs(StagingDir, exist_ok=True)
+for Name in ("Game.pak", "Game.sh"):
+    with open(os.path.join(StagingDir, Name), "w") as File:
+        File.write("restaged")
+"""
+
+
+@requires_posix
+def test_build_does_not_stage_through_store_links(Project, tmp_path, monkeypatch):
+    WriteTool(tmp_path / "Engine/Engine/Build/BatchFiles/RunUAT.bat", StageBody)
+    monkeypatch.setattr(UEDT.c, "StoreLinkMode", "hardlink")
+    monkeypatch.setattr(UEDT.c, "StoreAutoIngest", False)
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+    StagingDir = UEDT.GetBuildStagingDir("Development").parent
+    StageBuilds(StagingDir, ("Development", "Test"))
+    UEDT.IngestStagedBuilds(["Development", "Test"])
+
+    assert UEDT.Build({"command": "build", "c": "Development", "force": True}).ExitCode == 0
+    assert (StagingDir / "Development/Game.pak").read_text() == "restaged"
+    # Other builds and the store keep their content.
+    assert (StagingDir / "Test/Game.pak").read_bytes() == b"pak" * 1000
+    for _, BlobPath, _ in UEDT.StagingStore().GetBlobs():
+        assert open(BlobPath, "rb").read() != b"restaged"
@@ -0,0 +1,70 @@
+import os
+import json
+
+import UEDT
+from conftest import WriteTool, requires_posix
+
+# Stand-in DataValidation commandlet, reports as validated the packages it was given or FAKE_CHECKED.
+EditorBody = """
+import os, sys, json
+Packages = next((x.split("=", 1)[1].split("+") for x in sys.argv[1:] if x.startswith("-Packages=")), [])
+with open(os.environ["TOOL_LOG"], "a") as File:
+    File.write(json.dumps(Packages) + "\\n")
+print("LogContentValidation: Display: Files Checked: %s, Passed: 0, Failed: 0" % os.environ.get("FAKE_CHECKED", len(Packages)))
+"""
+
+# Stand-in p4 answering fstat of opened files with tagged output.
+P4Body = """
+import os, sys
+sys.stdout.write(open(os.environ["P4_OPENED"]).read())
+"""
+
+
+def SetUp(Project, tmp_path, monkeypatch):
+    for RelPath in ("Content/Maps/Main.umap", "Content/Props/Rock.uasset"):
+        (Project / RelPath).parent.mkdir(parents=True, exist_ok=True)
+        (Project / RelPath).write_bytes(RelPath.encode())
+    WriteTool(tmp_path / "Engine/Engine/Binaries/Win64/UnrealEditor-Cmd.exe", EditorBody)
+    monkeypatch.setenv("TOOL_LOG", str(tmp_path / "tool.log"))
+    monkeypatch.setattr(UEDT.c, "HistoryEnabled", False)
+
+
+def ReadRuns(tmp_path):
+    LogPath = tmp_path / "tool.log"
+    return [json.loads(x) for x in LogPath.read_text().splitlines()] if LogPath.exists() else []
+
+
+@requires_posix
+def test_changelist_with_case_insensitive_paths(Project, tmp_path, monkeypatch):
+    SetUp(Project, tmp_path, monkeypatch)
+    Opened = tmp_path / "opened.txt"
+    Opened.write_text("".join(f"... clientFile {Project}/{RelPath}\n... action edit\n... change {Change}\n\n" for RelPath, Change in [
+        ("Content/Maps/Main.umap", "12"), ("Content/Props/Rock.uasset", "13"), ("Config/DefaultGame.ini", "12")]))
+    monkeypatch.setenv("P4_OPENED", str(Opened))
+    monkeypatch.setattr(UEDT.c, "P4Executable", str(WriteTool(tmp_path / "p4", P4Body)))
+    # Normalized paths are lowercase on Windows, package names keep their case.
+    monkeypatch.setattr(os.path, "normcase", lambda x: os.fspath(x).lower())
+
+    assert UEDT.DataValidator({"command": "validate", "changelist": "12"}).ExitCode == 0
+    assert ReadRuns(tmp_path) == [["/Game/Maps/Main"]]
+
+
+@requires_posix
+def test_incremental_validation(Project, tmp_path, monkeypatch):
+    SetUp(Project, tmp_path, monkeypatch)
+    assert UEDT.DataValidator({"command": "validate"}).ExitCode == 0
+    assert ReadRuns(tmp_path) == [[]]
+
+    # Touched without changes.
+    os.utime(Project / "Content/Props/Rock.uasset", (1, 1))
+    assert UEDT.DataValidator({"command": "validate"}).ExitCode == 0
+    assert len(ReadRuns(tmp_path)) == 1
+
+    (Project / "Content/Props/Rock.uasset").write_bytes(b"changed")
+    assert UEDT.DataValidator({"command": "validate"}).ExitCode == 0
+    assert ReadRuns(tmp_path)[-1] == ["/Game/Props/Rock"]
+
+    # Commandlet that ignores the packages argument validates the whole project.
+    (Project / "Content/Props/Rock.uasset").write_bytes(b"changed again")
+    monkeypatch.setenv("FAKE_CHECKED", "2")
+    assert UEDT.DataValidator({"command": "validate"}).ExitCode == 1